@@ -34,7 +34,7 @@ from sqlalchemy import pool
 
 from alembic import context
 from workout_api.generic.models import BaseModel
-from workout_api.generic.repository.models import AtheleteModel, CategoryModel, TrainingCenterModel
+from workout_api.generic.repository.models import AthleteModel, CategoryModel, TrainingCenterModel
 
 config = context.config
 
@@ -0,0 +1,73 @@
+"""numeric_body_metrics
+
+Revision ID: 3f7a9c2e1b84
+Revises: 8d41f6b2c9e7
+Create Date: 2026-10-18 14:22:41.508317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7a9c2e1b84'
+down_revision: Union[str, None] = '8d41f6b2c9e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The view as of this revision. The application may change its own copy in
+# workout_api/athlete/stats.py, this one must stay as it is.
+CREATE_VIEW = """
+CREATE MATERIALIZED VIEW athlete_stats AS
+SELECT
+    category_id,
+    training_center_id,
+    count(*) AS athletes,
+    sum(age) AS age_sum,
+    sum(weight) AS weight_sum,
+    sum(height) AS height_sum,
+    count(*) FILTER (WHERE bmi < 18.5) AS bmi_underweight,
+    count(*) FILTER (WHERE bmi >= 18.5 AND bmi < 25) AS bmi_normal,
+    count(*) FILTER (WHERE bmi >= 25 AND bmi < 30) AS bmi_overweight,
+    count(*) FILTER (WHERE bmi >= 30) AS bmi_obese
+FROM (
+    SELECT category_id, training_center_id, age, weight, height, weight / NULLIF(height * height, 0) AS bmi
+    FROM athlete
+) AS athlete
+GROUP BY category_id, training_center_id
+"""
+CREATE_VIEW_INDEX = 'CREATE UNIQUE INDEX ix_athlete_stats_group ON athlete_stats (category_id, training_center_id)'
+DROP_VIEW = 'DROP MATERIALIZED VIEW IF EXISTS athlete_stats'
+
+
+def upgrade() -> None:
+    # Rewrites the table, values that aren't numbers or are out of range make
+    # the migration fail rather than being lost
+    op.alter_column('athlete', 'weight',
+               existing_type=sa.String(length=11),
+               type_=sa.Numeric(precision=5, scale=2),
+               existing_nullable=False,
+               postgresql_using='weight::numeric(5, 2)')
+    op.alter_column('athlete', 'height',
+               existing_type=sa.String(length=11),
+               type_=sa.Numeric(precision=3, scale=2),
+               existing_nullable=False,
+               postgresql_using='height::numeric(3, 2)')
+
+    op.execute(CREATE_VIEW)
+    op.execute(CREATE_VIEW_INDEX)
+
+
+def downgrade() -> None:
+    op.execute(DROP_VIEW)
+
+    op.alter_column('athlete', 'height',
+               existing_type=sa.Numeric(precision=3, scale=2),
+               type_=sa.String(length=11),
+               existing_nullable=False)
+    op.alter_column('athlete', 'weight',
+               existing_type=sa.Numeric(precision=5, scale=2),
+               type_=sa.String(length=11),
+               existing_nullable=False)
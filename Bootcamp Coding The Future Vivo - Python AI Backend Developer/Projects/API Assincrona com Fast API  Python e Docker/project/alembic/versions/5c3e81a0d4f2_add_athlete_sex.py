@@ -0,0 +1,29 @@
+"""add_athlete_sex
+
+Revision ID: 5c3e81a0d4f2
+Revises: b9e17de7c72b
+Create Date: 2026-10-18 09:12:40.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c3e81a0d4f2'
+down_revision: Union[str, None] = 'b9e17de7c72b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # athletes registered before this revision are backfilled as unknown ('U'),
+    # the default is dropped once they are so new athletes must state it
+    op.add_column('athlete', sa.Column('sex', sa.String(length=1), nullable=False, server_default='U'))
+    op.alter_column('athlete', 'sex', server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column('athlete', 'sex')
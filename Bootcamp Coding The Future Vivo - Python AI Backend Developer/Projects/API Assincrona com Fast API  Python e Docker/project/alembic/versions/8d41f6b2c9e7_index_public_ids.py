@@ -0,0 +1,39 @@
+"""index_public_ids
+
+Revision ID: 8d41f6b2c9e7
+Revises: 5c3e81a0d4f2
+Create Date: 2026-10-18 10:03:17.264915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41f6b2c9e7'
+down_revision: Union[str, None] = '5c3e81a0d4f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY doesn't lock the tables against writes, but can't run in
+    # the migration transaction. A failed build leaves an invalid index that
+    # must be dropped before retrying.
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_category_id'), 'category', ['id'], unique=True, postgresql_concurrently=True)
+        op.create_index(op.f('ix_training_center_id'), 'training_center', ['id'], unique=True, postgresql_concurrently=True)
+        op.create_index(op.f('ix_athlete_id'), 'athlete', ['id'], unique=True, postgresql_concurrently=True)
+        op.create_index(op.f('ix_athlete_category_id'), 'athlete', ['category_id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_athlete_training_center_id'), 'athlete', ['training_center_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_athlete_training_center_id'), table_name='athlete', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_athlete_category_id'), table_name='athlete', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_athlete_id'), table_name='athlete', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_training_center_id'), table_name='training_center', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_category_id'), table_name='category', postgresql_concurrently=True)
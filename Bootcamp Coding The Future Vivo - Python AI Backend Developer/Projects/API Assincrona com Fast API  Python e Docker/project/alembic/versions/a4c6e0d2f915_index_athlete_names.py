@@ -0,0 +1,35 @@
+"""index_athlete_names
+
+Revision ID: a4c6e0d2f915
+Revises: 3f7a9c2e1b84
+Create Date: 2026-10-18 16:47:09.731254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c6e0d2f915'
+down_revision: Union[str, None] = '3f7a9c2e1b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # needs a superuser before PostgreSQL 13, the database owner after
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # built like the indexes of 8d41f6b2c9e7, without locking writes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_athlete_name_pattern', 'athlete', ['name'], unique=False, postgresql_ops={'name': 'text_pattern_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_athlete_name_trgm', 'athlete', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    # pg_trgm is left installed, it may have been installed before this revision
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_athlete_name_trgm', table_name='athlete', postgresql_using='gin', postgresql_concurrently=True)
+        op.drop_index('ix_athlete_name_pattern', table_name='athlete', postgresql_concurrently=True)
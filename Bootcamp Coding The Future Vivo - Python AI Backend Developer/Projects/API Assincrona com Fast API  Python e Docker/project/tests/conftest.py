@@ -0,0 +1,89 @@
+from typing import Any, AsyncGenerator
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+
+from workout_api.generic.cache import reference_caches
+from workout_api.generic.models import BaseModel
+from workout_api.main import app
+from workout_api.settings.database import get_session, get_session_factory
+from workout_api.settings.settings import settings
+
+
+class QueryCounter:
+    """
+    Records the statements sent to the database, leaving out the savepoints
+    the test session uses in place of transactions.
+    """
+
+    def __init__(self) -> None:
+        self.executions: list[tuple[str, Any]] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if not statement.startswith(('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')):
+            self.executions.append((statement, parameters))
+
+    def __len__(self) -> int:
+        return len(self.executions)
+
+    @property
+    def statements(self) -> list[str]:
+        return [statement for statement, _ in self.executions]
+
+    def clear(self) -> None:
+        self.executions.clear()
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return 'asyncio'
+
+
+@pytest.fixture
+async def connection() -> AsyncGenerator[AsyncConnection, None]:
+    """
+    A connection to the database of BD_URL, whose changes are rolled back
+    after the test, tables included.
+    """
+    engine = create_async_engine(settings.BD_URL)
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        await connection.run_sync(BaseModel.metadata.create_all)
+        yield connection
+        await transaction.rollback()
+    await engine.dispose()
+
+
+@pytest.fixture
+async def queries(connection: AsyncConnection) -> AsyncGenerator[QueryCounter, None]:
+    counter = QueryCounter()
+    event.listen(connection.sync_engine, 'before_cursor_execute', counter)
+    yield counter
+    event.remove(connection.sync_engine, 'before_cursor_execute', counter)
+
+
+@pytest.fixture
+async def client(connection: AsyncConnection) -> AsyncGenerator[AsyncClient, None]:
+    def test_session(**kw) -> AsyncSession:
+        return AsyncSession(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode='create_savepoint',
+            **kw,
+        )
+
+    async def get_test_session() -> AsyncGenerator[AsyncSession, None]:
+        async with test_session() as session:
+            yield session
+
+    # the cached reference data belongs to the rolled back transactions
+    for cache in reference_caches.values():
+        cache.invalidate()
+
+    app.dependency_overrides[get_session] = get_test_session
+    app.dependency_overrides[get_session_factory] = lambda: test_session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        yield client
+    app.dependency_overrides.clear()
@@ -0,0 +1,365 @@
+import asyncio
+import csv
+import io
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.exc import DataError, OperationalError
+
+from workout_api.athlete.stats import StatsRefresher
+from workout_api.settings.settings import settings
+
+pytestmark = pytest.mark.anyio
+
+
+def athlete(name: str, cpf: str, category: str = 'Bodybuild', training_center: str = 'BodyTech') -> dict:
+    return {
+        'name': name,
+        'cpf': cpf,
+        'age': 26,
+        'weight': 80.7,
+        'height': 1.76,
+        'sex': 'M',
+        'category': {'name': category},
+        'training_center': {'name': training_center},
+    }
+
+
+@pytest.fixture
+async def references(client):
+    for name in ('Bodybuild', 'Crossfit'):
+        await client.post('/category/', json={'name': name})
+    for name in ('BodyTech', 'SmartFit'):
+        await client.post('/training_center/', json={'name': name, 'address': 'Rua do Pinho', 'owner': 'Ribeiro'})
+    # load the reference caches
+    await client.get('/category/')
+    await client.get('/training_center/')
+
+
+@pytest.fixture
+async def athletes(client, references):
+    created = []
+    for index, (category, training_center) in enumerate([
+        ('Bodybuild', 'BodyTech'),
+        ('Crossfit', 'BodyTech'),
+        ('Bodybuild', 'SmartFit'),
+        ('Crossfit', 'SmartFit'),
+        ('Bodybuild', 'BodyTech'),
+    ]):
+        response = await client.post('/athletes/', json=athlete(f'Athlete {index}', f'{index:011}', category, training_center))
+        created.append(response.json())
+    return created
+
+
+async def test_post_athlete(client, references, queries):
+    queries.clear()
+    response = await client.post('/athletes/', json=athlete('Matias', '13087536784', 'Crossfit', 'SmartFit'))
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body['category'] == {'name': 'Crossfit'}
+    assert body['training_center'] == {'name': 'SmartFit'}
+    assert body['weight'] == 80.7
+    # the category and training center come from the reference caches
+    assert len(queries) == 1
+
+
+async def test_post_athlete_unknown_category(client, references):
+    response = await client.post('/athletes/', json=athlete('Matias', '13087536784', 'Yoga'))
+
+    assert response.status_code == 400
+
+
+async def test_post_athlete_duplicate_cpf(client, references):
+    await client.post('/athletes/', json=athlete('Matias', '13087536784'))
+    response = await client.post('/athletes/', json=athlete('Other', '13087536784'))
+
+    assert response.status_code == 409
+
+
+# rounded to the scale of their column, these would not fit it or would be 0
+@pytest.mark.parametrize('metrics', [{'weight': 999.996}, {'height': 9.996}, {'height': 0.004}, {'weight': 0}])
+async def test_post_athlete_body_metrics_out_of_range(client, references, metrics):
+    response = await client.post('/athletes/', json={**athlete('Matias', '13087536784'), **metrics})
+
+    assert response.status_code == 422
+
+
+async def test_get_athlete(client, athletes, queries):
+    queries.clear()
+    response = await client.get(f"/athletes/{athletes[1]['id']}")
+
+    assert response.status_code == 200
+    assert response.json() == athletes[1]
+    assert len(queries) == 1
+
+
+async def test_get_athlete_not_found(client, references):
+    response = await client.get('/athletes/3fa85f64-5717-4562-b3fc-2c963f66afa6')
+
+    assert response.status_code == 404
+
+
+async def test_get_all_athletes_in_one_query(client, athletes, queries):
+    queries.clear()
+    response = await client.get('/athletes/')
+
+    assert response.status_code == 200
+    assert response.json() == athletes
+    assert 'X-Next-Cursor' not in response.headers
+    assert len(queries) == 1
+
+
+async def test_get_all_athletes_keyset_pages(client, athletes, queries):
+    pages, after = [], None
+    queries.clear()
+    while True:
+        params = {'limit': 2} if after is None else {'limit': 2, 'after': after}
+        response = await client.get('/athletes/', params=params)
+        pages.append([item['id'] for item in response.json()])
+        after = response.headers.get('X-Next-Cursor')
+        if after is None:
+            break
+
+    assert pages == [
+        [athletes[0]['id'], athletes[1]['id']],
+        [athletes[2]['id'], athletes[3]['id']],
+        [athletes[4]['id']],
+    ]
+    assert len(queries) == len(pages)
+
+
+async def test_get_all_athletes_filters(client, athletes, queries):
+    queries.clear()
+    response = await client.get('/athletes/', params={'category': 'Bodybuild', 'training_center': 'BodyTech'})
+
+    assert [item['id'] for item in response.json()] == [athletes[0]['id'], athletes[4]['id']]
+    assert len(queries) == 1
+
+
+@pytest.fixture
+def copy_support(connection):
+    if connection.dialect.driver != 'asyncpg':
+        pytest.skip('Bulk imports copy through asyncpg')
+
+
+async def test_bulk_athletes(client, references, copy_support):
+    await client.post('/athletes/', json=athlete('Matias', '00000000001'))
+    items = [
+        athlete('Athlete 0', '00000000000'),
+        athlete('Athlete 1', '00000000001'),
+        athlete('Athlete 2', '00000000002', 'Yoga'),
+        {**athlete('Athlete 3', '00000000003'), 'age': 'x'},
+        athlete('Athlete 4', '00000000000'),
+        athlete('Athlete 5', '00000000005', 'Crossfit', 'SmartFit'),
+    ]
+
+    response = await client.post('/athletes/bulk', json=items)
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [result['status'] for result in results] == ['created', 'conflict', 'invalid', 'invalid', 'conflict', 'created']
+    assert [result['index'] for result in results] == list(range(len(items)))
+
+    created = (await client.get(f"/athletes/{results[5]['id']}")).json()
+    assert created['category'] == {'name': 'Crossfit'}
+    assert created['training_center'] == {'name': 'SmartFit'}
+
+
+async def test_bulk_athletes_csv(client, references, copy_support):
+    content = (
+        'name,cpf,age,weight,height,sex,category,training_center\n'
+        'Matias,13087536784,26,80.7,1.76,M,Bodybuild,BodyTech\n'
+        'Joana,13087536785,,60.1,1.62,F,Bodybuild,BodyTech\n'
+    )
+
+    response = await client.post('/athletes/bulk', content=content, headers={'content-type': 'text/csv'})
+
+    assert [result['status'] for result in response.json()] == ['created', 'invalid']
+
+
+async def test_bulk_athletes_statements_do_not_grow(client, references, copy_support, queries):
+    counts = []
+    for start, size in ((0, 10), (10, 200)):
+        queries.clear()
+        items = [athlete(f'Athlete {index}', f'{index:011}') for index in range(start, start + size)]
+        response = await client.post('/athletes/bulk', json=items)
+        assert {result['status'] for result in response.json()} == {'created'}
+        counts.append(len(queries))
+
+    assert counts[0] == counts[1]
+
+
+async def test_bulk_athletes_rejects_other_content(client):
+    response = await client.post('/athletes/bulk', content='x', headers={'content-type': 'text/plain'})
+
+    assert response.status_code == 415
+
+
+async def test_bulk_athletes_rejects_large_uploads(client, monkeypatch):
+    monkeypatch.setattr(settings, 'ATHLETE_BULK_MAX_BYTES', 100)
+    items = [athlete(f'Athlete {index}', f'{index:011}') for index in range(2)]
+
+    response = await client.post('/athletes/bulk', json=items)
+
+    assert response.status_code == 413
+    assert response.json() == {'detail': 'Uploads are limited to 100 bytes'}
+
+
+async def test_bulk_athletes_caps_uploads_streamed_without_length(client, monkeypatch):
+    monkeypatch.setattr(settings, 'ATHLETE_BULK_MAX_BYTES', 100)
+    chunks = []
+
+    async def content():
+        for index in range(100):
+            chunks.append(index)
+            yield f'Athlete {index},{index:011},26,80.7,1.76,M,Bodybuild,BodyTech\n'.encode()
+
+    response = await client.post('/athletes/bulk', content=content(), headers={'content-type': 'text/csv'})
+
+    assert response.status_code == 413
+    # the upload is refused once the limit is crossed, not after reading it all
+    assert len(chunks) < 100
+
+
+async def test_export_athletes_ndjson(client, athletes, monkeypatch):
+    monkeypatch.setattr(settings, 'ATHLETE_EXPORT_BATCH_SIZE', 2)
+
+    response = await client.get('/athletes/export')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row['id'] for row in rows] == [item['id'] for item in athletes]
+    assert rows[1]['category'] == 'Crossfit'
+    assert rows[1]['training_center'] == 'BodyTech'
+    assert rows[1]['weight'] == 80.7
+
+
+async def test_export_athletes_csv(client, athletes, monkeypatch):
+    monkeypatch.setattr(settings, 'ATHLETE_EXPORT_BATCH_SIZE', 2)
+
+    response = await client.get('/athletes/export', params={'format': 'csv'})
+
+    assert response.headers['content-type'].startswith('text/csv')
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row['id'] for row in rows] == [item['id'] for item in athletes]
+    assert rows[2]['category'] == 'Bodybuild'
+    assert rows[2]['training_center'] == 'SmartFit'
+
+
+async def test_athlete_stats(client, connection, athletes):
+    response = await client.post('/athletes/', json={
+        **athlete('Athlete 5', '00000000005', 'Crossfit', 'SmartFit'), 'age': 30, 'weight': 50, 'height': 1.8})
+    assert response.status_code == 201
+    await connection.exec_driver_sql('REFRESH MATERIALIZED VIEW CONCURRENTLY athlete_stats')
+
+    response = await client.get('/athletes/stats')
+
+    assert response.status_code == 200
+    bodybuild, crossfit = response.json()
+    assert bodybuild == {
+        'group': 'Bodybuild',
+        'athletes': 3,
+        'average_age': 26,
+        'average_weight': 80.7,
+        'average_height': 1.76,
+        'bmi': {'underweight': 0, 'normal': 0, 'overweight': 3, 'obese': 0},
+    }
+    assert crossfit['athletes'] == 3
+    assert crossfit['average_age'] == pytest.approx(82 / 3)
+    assert crossfit['bmi'] == {'underweight': 1, 'normal': 0, 'overweight': 2, 'obese': 0}
+
+
+async def test_athlete_stats_by_training_center(client, connection, athletes):
+    await connection.exec_driver_sql('REFRESH MATERIALIZED VIEW CONCURRENTLY athlete_stats')
+
+    response = await client.get('/athletes/stats', params={'group_by': 'training_center'})
+
+    assert [(row['group'], row['athletes']) for row in response.json()] == [('BodyTech', 3), ('SmartFit', 2)]
+
+
+async def test_athlete_stats_are_stale_until_refreshed(client, athletes):
+    response = await client.get('/athletes/stats')
+
+    assert response.json() == []
+
+
+async def test_athlete_stats_leave_out_athletes_without_height(client, connection, athletes):
+    # stored before the height was bounded
+    await connection.exec_driver_sql("UPDATE athlete SET height = 0 WHERE cpf = '00000000000'")
+    await connection.exec_driver_sql('REFRESH MATERIALIZED VIEW CONCURRENTLY athlete_stats')
+
+    bodybuild, _ = (await client.get('/athletes/stats')).json()
+
+    assert bodybuild['athletes'] == 3
+    assert bodybuild['bmi'] == {'underweight': 0, 'normal': 0, 'overweight': 2, 'obese': 0}
+
+
+@pytest.mark.parametrize(('error', 'retried'), [
+    (OperationalError('REFRESH', {}, ConnectionError('connection lost')), True),
+    (DataError('REFRESH', {}, ArithmeticError('division by zero')), False),
+])
+async def test_stats_refresher_retries_lost_connections_only(error, retried):
+    attempts = []
+
+    @asynccontextmanager
+    async def session_factory():
+        attempts.append(error)
+        raise error
+        yield
+
+    refresher = StatsRefresher(interval=0)
+    refresher.request()
+    refresher.start(session_factory)
+    for _ in range(10):
+        await asyncio.sleep(0)
+    await refresher.stop()
+
+    assert (len(attempts) > 1) == retried
+
+
+async def test_search_athletes_by_cpf(client, athletes, queries):
+    queries.clear()
+    response = await client.get('/athletes/search', params={'q': '000.000.000-03'})
+
+    assert response.status_code == 200
+    assert [item['id'] for item in response.json()] == [athletes[3]['id']]
+    assert len(queries) == 1
+
+
+async def test_search_athletes_by_name_prefix(client, athletes):
+    await client.post('/athletes/', json=athlete('Atleta 5', '00000000005'))
+
+    response = await client.get('/athletes/search', params={'q': 'Athlete', 'limit': 3})
+    assert [item['id'] for item in response.json()] == [item['id'] for item in athletes[:3]]
+
+    response = await client.get('/athletes/search', params={
+        'q': 'Athlete', 'limit': 3, 'after': response.headers['X-Next-Cursor']})
+    assert [item['id'] for item in response.json()] == [item['id'] for item in athletes[3:]]
+    assert 'X-Next-Cursor' not in response.headers
+
+    response = await client.get('/athletes/search', params={'q': 'athlete'})
+    assert response.json() == []
+
+
+async def test_search_athletes_by_similar_name(client, references):
+    for index, name in enumerate(['Joana Prado', 'Joana Pardo', 'Mariana Prado', 'Pedro Lima']):
+        await client.post('/athletes/', json=athlete(name, f'{index:011}'))
+
+    response = await client.get('/athletes/search', params={'q': 'Joana Prado', 'match': 'similar', 'limit': 2})
+    first_page = [item['name'] for item in response.json()]
+
+    response = await client.get('/athletes/search', params={
+        'q': 'Joana Prado', 'match': 'similar', 'limit': 2, 'after': response.headers['X-Next-Cursor']})
+    second_page = [item['name'] for item in response.json()]
+
+    assert first_page[0] == 'Joana Prado'
+    assert sorted(first_page + second_page) == ['Joana Pardo', 'Joana Prado', 'Mariana Prado']
+
+
+async def test_search_athletes_invalid_cursor(client, references):
+    response = await client.get('/athletes/search', params={'q': 'Joana', 'match': 'similar', 'after': 'next'})
+
+    assert response.status_code == 400
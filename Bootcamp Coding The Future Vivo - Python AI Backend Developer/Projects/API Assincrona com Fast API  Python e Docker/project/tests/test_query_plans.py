@@ -0,0 +1,186 @@
+import json
+from datetime import datetime
+from typing import Any, Iterator
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import insert, select
+
+from workout_api.athlete.model import AthleteModel
+from workout_api.category.model import CategoryModel
+from workout_api.training_center.model import TrainingCenterModel
+
+pytestmark = pytest.mark.anyio
+
+# Tables above this number of rows must be read through an index
+SEQ_SCAN_MAX_ROWS = 1000
+
+CATEGORIES = 2000
+TRAINING_CENTERS = 2000
+ATHLETES = 20000
+
+
+@pytest.fixture
+async def seeded(connection) -> dict[str, Any]:
+    """
+    Fills the tables above SEQ_SCAN_MAX_ROWS and analyzes them, so the planner
+    picks the plans it would on a production database.
+    """
+    if connection.dialect.name != 'postgresql':
+        pytest.skip('Query plans are checked on PostgreSQL')
+
+    await connection.execute(insert(CategoryModel), [
+        {'id': uuid, 'name': f'c{index}'}
+        for index, uuid in enumerate(_uuids(CATEGORIES))
+    ])
+    await connection.execute(insert(TrainingCenterModel), [
+        {'id': uuid, 'name': f'tc{index}', 'address': 'Rua do Pinho', 'owner': 'Ribeiro'}
+        for index, uuid in enumerate(_uuids(TRAINING_CENTERS))
+    ])
+    category_ids = (await connection.execute(select(CategoryModel.pk_id))).scalars().all()
+    training_center_ids = (await connection.execute(select(TrainingCenterModel.pk_id))).scalars().all()
+    await connection.execute(insert(AthleteModel), [
+        {
+            'id': uuid,
+            # random names, sharing few trigrams as real ones do
+            'name': uuid.hex[:12],
+            'cpf': f'{index:011}',
+            'age': 26,
+            'weight': 80.7,
+            'height': 1.76,
+            'sex': 'M',
+            'created_at': datetime(2024, 5, 18, 14, 36),
+            'category_id': category_ids[index % CATEGORIES],
+            'training_center_id': training_center_ids[index * 7 % TRAINING_CENTERS],
+        }
+        for index, uuid in enumerate(_uuids(ATHLETES))
+    ])
+    # rows inserted after a GIN index is built wait in its pending list until
+    # a vacuum, which can't run in the test transaction
+    await connection.exec_driver_sql("SELECT gin_clean_pending_list('ix_athlete_name_trgm')")
+    await connection.exec_driver_sql('ANALYZE category, training_center, athlete')
+
+    category = (await connection.execute(select(CategoryModel).limit(1))).first()
+    training_center = (await connection.execute(select(TrainingCenterModel).limit(1))).first()
+    athlete = (await connection.execute(
+        select(AthleteModel).order_by(AthleteModel.pk_id).offset(ATHLETES // 2).limit(1))).first()
+    return {
+        'category_id': category.id,
+        'category_name': category.name,
+        'training_center_id': training_center.id,
+        'training_center_name': training_center.name,
+        'athlete_id': athlete.id,
+        'athlete_pk_id': athlete.pk_id,
+        'athlete_name': athlete.name,
+        'athlete_cpf': athlete.cpf,
+    }
+
+
+def _uuids(count: int) -> Iterator[UUID]:
+    return (uuid4() for _ in range(count))
+
+
+def _nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from _nodes(child)
+
+
+async def _plan(connection, statement: str, parameters: Any) -> dict[str, Any]:
+    result = await connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters)
+    explained = result.scalar()
+    if isinstance(explained, str):
+        explained = json.loads(explained)
+    return explained[0]['Plan']
+
+
+def _literal(value: Any) -> str:
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(value)
+
+
+async def _seq_scans(connection, statement: str, parameters: Any) -> set[str]:
+    return {
+        node['Relation Name']
+        for node in _nodes(await _plan(connection, statement, parameters))
+        if node['Node Type'] == 'Seq Scan'
+    }
+
+
+async def _table_rows(connection) -> dict[str, float]:
+    result = await connection.exec_driver_sql(
+        "SELECT relname, reltuples FROM pg_class "
+        "WHERE relname IN ('category', 'training_center', 'athlete')"
+    )
+    return dict(result.all())
+
+
+@pytest.mark.parametrize('path, full_scans', [
+    # categories and training centers are served by the reference caches,
+    # loaded by reading the whole tables
+    ('/category/', {'category'}),
+    ('/category/{category_id}', {'category'}),
+    ('/training_center/', {'training_center'}),
+    ('/training_center/{training_center_id}', {'training_center'}),
+    ('/athletes/', set()),
+    ('/athletes/?after={athlete_pk_id}', set()),
+    ('/athletes/?category={category_name}', set()),
+    ('/athletes/?training_center={training_center_name}', set()),
+    ('/athletes/?category={category_name}&training_center={training_center_name}', set()),
+    ('/athletes/{athlete_id}', set()),
+    ('/athletes/search?q={athlete_cpf}', set()),
+    ('/athletes/search?q={athlete_name}', set()),
+    ('/athletes/search?q={athlete_name}&match=similar', set()),
+    # the stats are read from the materialized view, every group is listed
+    ('/athletes/stats', {'category'}),
+    ('/athletes/stats?group_by=training_center', {'training_center'}),
+])
+async def test_no_seq_scan_on_large_tables(client, connection, queries, seeded, path, full_scans):
+    queries.clear()
+    response = await client.get(path.format(**seeded))
+    assert response.status_code == 200, response.text
+
+    rows = await _table_rows(connection)
+    executions = [
+        (statement, parameters)
+        for statement, parameters in queries.executions
+        if statement.lstrip().upper().startswith('SELECT')
+    ]
+    assert executions
+
+    for statement, parameters in executions:
+        seq_scans = await _seq_scans(connection, statement, parameters)
+        large = {table for table in seq_scans - full_scans if rows.get(table, 0) > SEQ_SCAN_MAX_ROWS}
+        assert not large, f'Seq scan on {", ".join(sorted(large))} for:\n{statement}'
+
+
+@pytest.mark.parametrize('path, index', [
+    ('/athletes/search?q={athlete_cpf}', 'athlete_cpf_key'),
+    ('/athletes/search?q={athlete_name}', 'ix_athlete_name_pattern'),
+    ('/athletes/search?q={athlete_name_prefix}', 'ix_athlete_name_pattern'),
+    ('/athletes/search?q={athlete_name}&match=similar', 'ix_athlete_name_trgm'),
+    ('/athletes/search?q={athlete_name_typo}&match=similar', 'ix_athlete_name_trgm'),
+])
+async def test_search_uses_index(client, connection, queries, seeded, path, index):
+    seeded = {
+        **seeded,
+        'athlete_name_prefix': seeded['athlete_name'][:4],
+        'athlete_name_typo': seeded['athlete_name'][:-1],
+    }
+    queries.clear()
+    response = await client.get(path.format(**seeded))
+    assert response.status_code == 200, response.text
+    assert response.json()
+
+    [(statement, parameters)] = queries.executions
+    # the server plans the first executions of a prepared statement with the
+    # values of the parameters, then may settle on a generic plan
+    arguments = ', '.join(map(_literal, parameters))
+    await connection.exec_driver_sql(f'PREPARE search AS {statement}')
+    for _ in range(5):
+        await connection.exec_driver_sql(f'EXECUTE search({arguments})')
+    plan = await _plan(connection, f'EXECUTE search({arguments})', ())
+    await connection.exec_driver_sql('DEALLOCATE search')
+
+    assert index in {node.get('Index Name') for node in _nodes(plan)}, f'{index} unused for:\n{statement}'
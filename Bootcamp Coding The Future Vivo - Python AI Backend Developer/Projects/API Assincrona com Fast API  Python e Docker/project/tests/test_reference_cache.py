@@ -0,0 +1,148 @@
+import asyncio
+from uuid import uuid4
+
+import asyncpg
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.engine import make_url
+
+from workout_api.category.cache import category_cache
+from workout_api.category.model import CategoryModel
+from workout_api.generic.cache import CHANNEL, ReferenceListener
+from workout_api.settings.database import PRIMARY
+from workout_api.settings.settings import settings
+from tests.test_athlete import athlete
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def postgresql(connection):
+    if connection.dialect.name != 'postgresql':
+        pytest.skip('Reference data changes are notified by PostgreSQL')
+
+
+async def test_category_list_served_from_cache(client, postgresql, queries):
+    await client.post('/category/', json={'name': 'Bodybuild'})
+    await client.get('/category/')
+
+    queries.clear()
+    response = await client.get('/category/')
+    category = (await client.get(f"/category/{response.json()[0]['id']}")).json()
+
+    assert [item['name'] for item in response.json()] == ['Bodybuild']
+    assert category['name'] == 'Bodybuild'
+    assert len(queries) == 0
+
+
+async def test_category_list_etag(client, postgresql):
+    await client.post('/category/', json={'name': 'Bodybuild'})
+    response = await client.get('/category/')
+    etag = response.headers['ETag']
+
+    not_modified = await client.get('/category/', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers['ETag'] == etag
+
+    await client.post('/category/', json={'name': 'Crossfit'})
+    modified = await client.get('/category/', headers={'If-None-Match': etag})
+    assert modified.status_code == 200
+    assert modified.headers['ETag'] != etag
+    assert [item['name'] for item in modified.json()] == ['Bodybuild', 'Crossfit']
+
+
+@pytest.mark.parametrize('if_none_match', ['W/{etag}', '"other", {etag}', '*'])
+async def test_category_list_etag_weak_comparison(client, postgresql, if_none_match):
+    await client.post('/category/', json={'name': 'Bodybuild'})
+    etag = (await client.get('/category/')).headers['ETag']
+
+    response = await client.get('/category/', headers={'If-None-Match': if_none_match.format(etag=etag)})
+
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+
+
+async def test_listener_invalidates_on_notify(postgresql):
+    listener = ReferenceListener(settings.BD_URL)
+    listener.start()
+    connection = await asyncpg.connect(
+        make_url(settings.BD_URL).set(drivername='postgresql').render_as_string(hide_password=False))
+    try:
+        version = category_cache.version
+        for _ in range(50):
+            # the listener may not be listening yet
+            await connection.execute('SELECT pg_notify($1, $2)', CHANNEL, 'category')
+            await asyncio.sleep(0.1)
+            if category_cache.version != version:
+                break
+
+        assert category_cache.version > version
+    finally:
+        await connection.close()
+        await listener.stop()
+
+
+@pytest.fixture
+async def references(client):
+    await client.post('/category/', json={'name': 'Bodybuild'})
+    await client.post('/training_center/', json={'name': 'BodyTech', 'address': 'Rua do Pinho', 'owner': 'Ribeiro'})
+    await client.get('/category/')
+    await client.get('/training_center/')
+
+
+async def test_unknown_names_do_not_reload_the_cache(client, postgresql, references, queries):
+    version = category_cache.version
+
+    queries.clear()
+    for cpf in ('13087536784', '13087536785'):
+        response = await client.post('/athletes/', json=athlete('Matias', cpf, 'Yoga'))
+        assert response.status_code == 400
+
+    # only the unknown name is looked up, the table isn't read again
+    assert category_cache.version == version
+    assert len(queries) == 2
+    assert all(' IN ' in statement for statement in queries.statements)
+
+
+async def test_names_created_since_the_load_are_found(client, postgresql, references, connection):
+    # a category the cache wasn't told about yet
+    await connection.execute(insert(CategoryModel).values(name='Crossfit', id=uuid4()))
+
+    response = await client.post('/athletes/', json=athlete('Matias', '13087536784', 'Crossfit'))
+
+    assert response.status_code == 201
+    assert response.json()['category'] == {'name': 'Crossfit'}
+
+
+class _RecordingSession:
+    """
+    A session answering every query with no rows, recording how it was bound.
+    """
+
+    def __init__(self) -> None:
+        self.bind_arguments: list = []
+
+    async def execute(self, statement, bind_arguments=None):
+        self.bind_arguments.append(bind_arguments)
+        return self
+
+    def scalars(self):
+        return self
+
+    def all(self) -> list:
+        return []
+
+    def __iter__(self):
+        return iter(())
+
+
+async def test_cache_reads_from_the_primary():
+    session = _RecordingSession()
+    category_cache.invalidate()
+    try:
+        await category_cache.get_pk_ids(session, {'Bodybuild'})
+    finally:
+        category_cache.invalidate()
+
+    # the load and the lookup of the unknown name
+    assert session.bind_arguments == [PRIMARY, PRIMARY]
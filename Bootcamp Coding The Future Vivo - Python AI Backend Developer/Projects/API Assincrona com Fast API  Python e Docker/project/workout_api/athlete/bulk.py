@@ -0,0 +1,139 @@
+import csv
+import io
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID, uuid4
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from workout_api.athlete.schema import AthleteBulkResult, AthleteIn
+from workout_api.category.cache import category_cache
+from workout_api.training_center.cache import training_center_cache
+
+CSV_COLUMNS = ('name', 'cpf', 'age', 'weight', 'height', 'sex', 'category', 'training_center')
+
+# columns copied into the staging table, in the order of the records
+COPY_COLUMNS = (
+    'id', 'name', 'cpf', 'age', 'weight', 'height', 'sex',
+    'created_at', 'category_id', 'training_center_id',
+)
+
+
+def csv_items(content: bytes) -> list[dict[str, Any]]:
+    """
+    Reads the athletes of a CSV file with a header row holding CSV_COLUMNS,
+    the category and training center given by name.
+
+    Raises:
+        ValueError: If the file isn't UTF-8 or misses columns.
+    """
+    reader = csv.DictReader(io.StringIO(content.decode('utf-8-sig'), newline=''))
+    missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f'Missing CSV columns: {", ".join(missing)}')
+
+    return [
+        {
+            'name': row['name'],
+            'cpf': row['cpf'],
+            'age': row['age'],
+            'weight': row['weight'],
+            'height': row['height'],
+            'sex': row['sex'],
+            'category': {'name': row['category']},
+            'training_center': {'name': row['training_center']},
+        }
+        for row in reader
+    ]
+
+
+async def import_athletes(db_session: AsyncSession, items: list[Any]) -> list[AthleteBulkResult]:
+    """
+    Registers many athletes at once. Categories and training centers are
+    resolved from the reference caches, and the athletes are copied into a
+    staging table then inserted with a single statement, skipping the CPFs
+    already registered.
+
+    Returns one result per item, in the same order. The results are built
+    without validation, they are already valid.
+    """
+    results: list[Optional[AthleteBulkResult]] = [None] * len(items)
+
+    athletes: list[tuple[int, AthleteIn]] = []
+    for index, item in enumerate(items):
+        try:
+            athletes.append((index, AthleteIn.model_validate(item)))
+        except ValidationError as exc:
+            results[index] = AthleteBulkResult.model_construct(
+                index=index, status='invalid', detail=exc.errors(include_url=False, include_context=False))
+
+    categories = await category_cache.get_pk_ids(
+        db_session, {athlete.category.name for _, athlete in athletes})
+    training_centers = await training_center_cache.get_pk_ids(
+        db_session, {athlete.training_center.name for _, athlete in athletes})
+
+    created_at = datetime.utcnow()
+    records: list[tuple] = []
+    pending: list[tuple[int, str, UUID]] = []
+    cpfs: set[str] = set()
+
+    for index, athlete in athletes:
+        category_id = categories.get(athlete.category.name)
+        training_center_id = training_centers.get(athlete.training_center.name)
+        if category_id is None:
+            results[index] = AthleteBulkResult.model_construct(
+                index=index, status='invalid', detail=f'There is no category named: {athlete.category.name}')
+        elif training_center_id is None:
+            results[index] = AthleteBulkResult.model_construct(
+                index=index, status='invalid',
+                detail=f'There is no training center named: {athlete.training_center.name}')
+        elif athlete.cpf in cpfs:
+            results[index] = AthleteBulkResult.model_construct(
+                index=index, status='conflict', detail=f'CPF already in the upload: {athlete.cpf}')
+        else:
+            cpfs.add(athlete.cpf)
+            id = uuid4()
+            records.append((
+                id, athlete.name, athlete.cpf, athlete.age, athlete.weight, athlete.height,
+                athlete.sex, created_at, category_id, training_center_id,
+            ))
+            pending.append((index, athlete.cpf, id))
+
+    inserted = await _copy_athletes(db_session, records) if records else set()
+    await db_session.commit()
+
+    for index, cpf, id in pending:
+        if cpf in inserted:
+            results[index] = AthleteBulkResult.model_construct(index=index, status='created', id=id)
+        else:
+            results[index] = AthleteBulkResult.model_construct(
+                index=index, status='conflict', detail=f'There is already an athlete with CPF: {cpf}')
+
+    return results
+
+
+async def _copy_athletes(db_session: AsyncSession, records: list[tuple]) -> set[str]:
+    """
+    Loads the records with COPY into a staging table, then inserts them into
+    `athlete` in one statement.
+
+    Returns the CPFs of the inserted athletes.
+    """
+    connection = await db_session.connection()
+    columns = ', '.join(COPY_COLUMNS)
+
+    await connection.exec_driver_sql(
+        f'CREATE TEMPORARY TABLE athlete_import ON COMMIT DROP AS '
+        f'SELECT {columns} FROM athlete WITH NO DATA'
+    )
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        'athlete_import', records=records, columns=COPY_COLUMNS)
+    inserted = await connection.exec_driver_sql(
+        f'INSERT INTO athlete ({columns}) SELECT {columns} FROM athlete_import '
+        f'ON CONFLICT (cpf) DO NOTHING RETURNING cpf'
+    )
+    cpfs = set(inserted.scalars().all())
+    await connection.exec_driver_sql('DROP TABLE athlete_import')
+    return cpfs
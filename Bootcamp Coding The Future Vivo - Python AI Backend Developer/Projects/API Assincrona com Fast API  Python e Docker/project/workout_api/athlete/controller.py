@@ -1,14 +1,331 @@
-from fastapi import APIRouter, status, Body
+import json
+from datetime import datetime
+from typing import Annotated, AsyncIterator, Literal, Optional
+from uuid import uuid4
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import UUID4, TypeAdapter
+from sqlalchemy import Select, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import contains_eager
 
-from workout_api.generic.dependencies import DatabaseDependencies
-from workout_api.athlete.schema import AthleteIn
+from workout_api.generic.dependencies import DatabaseDependencies, SessionFactoryDependencies
+from workout_api.athlete.bulk import CSV_COLUMNS, csv_items, import_athletes
+from workout_api.athlete.export import csv_chunk, csv_header, ndjson_chunk, select_export
+from workout_api.athlete.schema import AthleteBulkResult, AthleteIn, AthleteOut, AthleteStats
+from workout_api.athlete.model import AthleteModel
+from workout_api.athlete.search import after_similarity, name_similar_to, name_starts_with, search_cpf, similarity
+from workout_api.athlete.stats import BMI_CLASSES, select_stats, stats_refresher
+from workout_api.category.cache import category_cache
+from workout_api.category.model import CategoryModel
+from workout_api.settings.settings import settings
+from workout_api.training_center.cache import training_center_cache
+from workout_api.training_center.model import TrainingCenterModel
 
 router = APIRouter()
 
-@router.post(path='/',
+bulk_results = TypeAdapter(list[AthleteBulkResult])
+
+
+def select_athletes() -> Select[tuple[AthleteModel]]:
+    """
+    Selects the athletes joined with their category and training center, so
+    the relationships are loaded by the same query whatever the number of
+    athletes. Filters on the category and training center use the joined
+    tables.
+    """
+    return (
+        select(AthleteModel)
+        .join(AthleteModel.category)
+        .join(AthleteModel.training_center)
+        .options(
+            contains_eager(AthleteModel.category),
+            contains_eager(AthleteModel.training_center),
+        )
+    )
+
+
+@router.get(
+        path='/',
+        summary="Consult all athletes",
+        status_code=status.HTTP_200_OK,
+        response_model=list[AthleteOut])
+async def get_all(
+    db_session: DatabaseDependencies,
+    response: Response,
+    category: Annotated[Optional[str], Query(description='Category Name')] = None,
+    training_center: Annotated[Optional[str], Query(description='Training Center Name')] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    after: Annotated[Optional[int], Query(description='Cursor of the page to consult')] = None,
+) -> list[AthleteOut]:
+    """
+    Pages through the athletes in registration order. When there are more
+    athletes, the cursor of the next page is returned in the `X-Next-Cursor`
+    header, to be sent back as `after`.
+    """
+    query = select_athletes().order_by(AthleteModel.pk_id).limit(limit + 1)
+    if category:
+        query = query.where(CategoryModel.name == category)
+    if training_center:
+        query = query.where(TrainingCenterModel.name == training_center)
+    if after is not None:
+        query = query.where(AthleteModel.pk_id > after)
+
+    athletes: list[AthleteModel] = list((await db_session.execute(query)).scalars().all())
+
+    if len(athletes) > limit:
+        athletes = athletes[:limit]
+        response.headers['X-Next-Cursor'] = str(athletes[-1].pk_id)
+
+    return athletes
+
+@router.get(
+        path='/search',
+        summary="Search athletes",
+        status_code=status.HTTP_200_OK,
+        response_model=list[AthleteOut])
+async def search(
+    db_session: DatabaseDependencies,
+    response: Response,
+    q: Annotated[str, Query(min_length=1, max_length=50, description='CPF or Name')],
+    match: Annotated[Literal['prefix', 'similar'], Query(description='How names are matched')] = 'prefix',
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    after: Annotated[Optional[str], Query(description='Cursor of the page to consult')] = None,
+) -> list[AthleteOut]:
+    """
+    Looks an athlete up by CPF, or athletes up by the beginning of their
+    name, in registration order, or by names similar to `q`, best matches
+    first. Pages like the listing of athletes, through the `X-Next-Cursor`
+    header and `after`.
+    """
+    query = select_athletes().limit(limit + 1)
+
+    cpf = search_cpf(q)
+    if cpf is not None:
+        return (await db_session.execute(query.where(AthleteModel.cpf == cpf))).scalars().all()
+
+    try:
+        if match == 'prefix':
+            query = query.where(name_starts_with(q)).order_by(AthleteModel.pk_id)
+            if after is not None:
+                query = query.where(AthleteModel.pk_id > int(after))
+        else:
+            query = (
+                query.add_columns(similarity(q))
+                .where(name_similar_to(q))
+                .order_by(similarity(q).desc(), AthleteModel.pk_id)
+            )
+            if after is not None:
+                query = query.where(after_similarity(q, after))
+    except ValueError:
+        raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f'Invalid cursor: {after}'
+        )
+
+    rows = (await db_session.execute(query)).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers['X-Next-Cursor'] = (
+            str(last[0].pk_id) if match == 'prefix' else f'{last[1]}:{last[0].pk_id}')
+
+    return [row[0] for row in rows]
+
+@router.get(
+        path='/export',
+        summary="Export all athletes",
+        status_code=status.HTTP_200_OK,
+        response_class=StreamingResponse)
+async def export(
+    session_factory: SessionFactoryDependencies,
+    format: Annotated[Literal['ndjson', 'csv'], Query(description='Export Format')] = 'ndjson',
+) -> StreamingResponse:
+    """
+    Streams every athlete with the names of its category and training center,
+    as NDJSON or CSV. The rows are read through a server-side cursor and
+    encoded a batch at a time, so the memory used doesn't grow with the
+    number of athletes.
+    """
+    encode = csv_chunk if format == 'csv' else ndjson_chunk
+
+    async def chunks() -> AsyncIterator[bytes]:
+        if format == 'csv':
+            yield csv_header()
+        # the request session is closed before the response is streamed
+        async with session_factory(info={'read_only': True}) as db_session:
+            result = await db_session.stream(
+                select_export().execution_options(yield_per=settings.ATHLETE_EXPORT_BATCH_SIZE))
+            async for rows in result.mappings().partitions():
+                yield encode(rows)
+
+    if format == 'csv':
+        return StreamingResponse(chunks(), media_type='text/csv',
+                                 headers={'Content-Disposition': 'attachment; filename="athletes.csv"'})
+    return StreamingResponse(chunks(), media_type='application/x-ndjson')
+
+@router.get(
+        path='/stats',
+        summary="Consult athlete statistics",
+        status_code=status.HTTP_200_OK,
+        response_model=list[AthleteStats])
+async def stats(
+    db_session: DatabaseDependencies,
+    group_by: Annotated[Literal['category', 'training_center'], Query(description='Grouping')] = 'category',
+) -> list[AthleteStats]:
+    """
+    Counts the athletes of each category or training center, with their
+    average age, weight and height and how many fall in each BMI class.
+
+    The figures come from the athlete_stats materialized view, refreshed
+    shortly after athletes are registered.
+    """
+    rows = (await db_session.execute(select_stats(group_by))).mappings().all()
+
+    return [
+        AthleteStats(
+            group=row['group'],
+            athletes=row['athletes'],
+            average_age=row['average_age'],
+            average_weight=row['average_weight'],
+            average_height=row['average_height'],
+            bmi={name: row[name] for name in BMI_CLASSES},
+        )
+        for row in rows
+    ]
+
+@router.get(
+        path='/{id}',
+        summary="Consult athlete",
+        status_code=status.HTTP_200_OK,
+        response_model=AthleteOut)
+async def get(id: UUID4, db_session: DatabaseDependencies) -> AthleteOut:
+    athlete: AthleteOut = (await db_session.execute(
+        select_athletes().where(AthleteModel.id == id))).scalars().first()
+
+    if not athlete:
+        raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f'There is no athlete of ID: {id}'
+        )
+
+    return athlete
+
+
+@router.post(
+        path='/',
         summary="Register a new athlete",
         status_code=status.HTTP_201_CREATED)
 async def post(
     db_session: DatabaseDependencies,
-    athlete_in: AthleteIn = Body(...) ):
-    pass
+    athlete_in: AthleteIn = Body(...)
+    ) -> AthleteOut:
+
+    category_name = athlete_in.category.name
+    category_id = (await category_cache.get_pk_ids(db_session, {category_name})).get(category_name)
+
+    if not category_id:
+        raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f'There is no category named: {category_name}'
+        )
+
+    training_center_name = athlete_in.training_center.name
+    training_center_id = (await training_center_cache.get_pk_ids(
+        db_session, {training_center_name})).get(training_center_name)
+
+    if not training_center_id:
+        raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f'There is no training center named: {training_center_name}'
+        )
+
+    athlete_out = AthleteOut(id=uuid4(), created_at=datetime.utcnow(), **athlete_in.model_dump())
+    athlete_model = AthleteModel(
+        category_id=category_id,
+        training_center_id=training_center_id,
+        **athlete_out.model_dump(exclude={'category', 'training_center'}),
+    )
+
+    db_session.add(athlete_model)
+    try:
+        await db_session.commit()
+    except IntegrityError:
+        await db_session.rollback()
+        raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f'There is already an athlete with CPF: {athlete_in.cpf}'
+        )
+
+    stats_refresher.request()
+    return athlete_out
+
+
+async def read_body(request: Request, limit: int) -> bytes:
+    """
+    Reads the request body, refusing it as soon as it is known to be larger
+    than `limit` bytes: from its Content-Length when sent, otherwise while it
+    is streamed, so an oversized upload is never held in memory whole.
+    """
+    too_large = HTTPException(
+    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    detail=f'Uploads are limited to {limit} bytes'
+    )
+    length = request.headers.get('content-length', '')
+    if length.isdigit() and int(length) > limit:
+        raise too_large
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise too_large
+    return bytes(body)
+
+
+@router.post(
+        path='/bulk',
+        summary="Register many athletes",
+        status_code=status.HTTP_200_OK,
+        response_model=list[AthleteBulkResult],
+        openapi_extra={'requestBody': {'required': True, 'content': {
+            'application/json': {'schema': {'type': 'array', 'items': AthleteIn.model_json_schema()}},
+            'text/csv': {'schema': {'type': 'string', 'description': f"Columns: {', '.join(CSV_COLUMNS)}"}},
+        }}})
+async def bulk(db_session: DatabaseDependencies, request: Request) -> Response:
+    """
+    Registers the athletes of a JSON array or a CSV file, answering with the
+    result of each one in the upload order. Athletes whose CPF is already
+    registered are reported as conflicts, the others are still created.
+
+    The results are serialized directly rather than validated again against
+    the response model, which would cost more than the import itself.
+    """
+    content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    if content_type not in ('application/json', 'text/csv'):
+        raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail='Send the athletes as application/json or text/csv'
+        )
+    content = await read_body(request, settings.ATHLETE_BULK_MAX_BYTES)
+
+    try:
+        if content_type == 'application/json':
+            items = json.loads(content)
+            if not isinstance(items, list):
+                raise ValueError('Expected an array of athletes')
+        else:
+            items = csv_items(content)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    if len(items) > settings.ATHLETE_BULK_MAX_ROWS:
+        raise HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f'At most {settings.ATHLETE_BULK_MAX_ROWS} athletes can be imported at once'
+        )
+
+    results = await import_athletes(db_session, items)
+    stats_refresher.request()
+    return Response(content=bulk_results.dump_json(results), media_type='application/json')
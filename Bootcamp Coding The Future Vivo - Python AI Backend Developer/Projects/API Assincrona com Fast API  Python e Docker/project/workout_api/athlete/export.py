@@ -0,0 +1,59 @@
+import csv
+import io
+from typing import Any, Mapping, Sequence
+
+import orjson
+from sqlalchemy import Select, select
+
+from workout_api.athlete.model import AthleteModel
+from workout_api.category.model import CategoryModel
+from workout_api.training_center.model import TrainingCenterModel
+
+EXPORT_COLUMNS = (
+    'id', 'created_at', 'name', 'cpf', 'age', 'weight', 'height', 'sex', 'category', 'training_center',
+)
+
+
+def select_export() -> Select:
+    """
+    Selects the exported columns of every athlete as plain rows, with the
+    names of their category and training center, in registration order.
+    """
+    return (
+        select(
+            AthleteModel.id,
+            AthleteModel.created_at,
+            AthleteModel.name,
+            AthleteModel.cpf,
+            AthleteModel.age,
+            AthleteModel.weight,
+            AthleteModel.height,
+            AthleteModel.sex,
+            CategoryModel.name.label('category'),
+            TrainingCenterModel.name.label('training_center'),
+        )
+        .join(AthleteModel.category)
+        .join(AthleteModel.training_center)
+        .order_by(AthleteModel.pk_id)
+    )
+
+
+def ndjson_chunk(rows: Sequence[Mapping[str, Any]]) -> bytes:
+    # asyncpg returns its own UUID type, which orjson doesn't know
+    return b''.join(orjson.dumps(dict(row), default=str) + b'\n' for row in rows)
+
+
+def csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_COLUMNS)
+    return buffer.getvalue().encode()
+
+
+def csv_chunk(rows: Sequence[Mapping[str, Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = dict(row)
+        values['created_at'] = values['created_at'].isoformat()
+        writer.writerow([values[column] for column in EXPORT_COLUMNS])
+    return buffer.getvalue().encode()
@@ -1,23 +1,38 @@
 from datetime import datetime
-from sqlalchemy import Integer, String, DateTime, ForeignKey
+from sqlalchemy import DDL, Integer, Index, Numeric, String, DateTime, ForeignKey, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from workout_api.generic.models import BaseModel
 
 class AthleteModel(BaseModel):
     __tablename__ = "athlete"
+    __table_args__ = (
+        # name prefixes, compared byte by byte whatever the collation
+        Index('ix_athlete_name_pattern', 'name', postgresql_ops={'name': 'text_pattern_ops'}),
+        # names similar to a search, by their trigrams
+        Index('ix_athlete_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
 
     pk_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(50), nullable=False)
     cpf: Mapped[str] = mapped_column(String(11), unique=True, nullable=False)
     age: Mapped[int] = mapped_column(Integer, nullable=False)
-    weight: Mapped[str] = mapped_column(String(11), nullable=False)
-    height: Mapped[str] = mapped_column(String(11), nullable=False)
+    # kilograms and meters, read back as floats like the schema declares them
+    weight: Mapped[float] = mapped_column(Numeric(5, 2, asdecimal=False), nullable=False)
+    height: Mapped[float] = mapped_column(Numeric(3, 2, asdecimal=False), nullable=False)
+    sex: Mapped[str] = mapped_column(String(1), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
 
+    # Relationships are loaded along with the athletes, lazy loads would
+    # query once per athlete and can't run on the async session.
+
     # Category relationship
-    category: Mapped['CategoryModel'] = relationship(back_populates='athlete')
-    category_id: Mapped[int] = mapped_column(ForeignKey('category.pk_id'))
+    category: Mapped['CategoryModel'] = relationship(back_populates='athlete', lazy='raise')
+    category_id: Mapped[int] = mapped_column(ForeignKey('category.pk_id'), index=True)
 
     # TrainingCenter relationship
-    training_center: Mapped['TrainingCenterModel'] = relationship(back_populates='athlete')
-    training_center_id: Mapped[int] = mapped_column(ForeignKey('training_center.pk_id'))
+    training_center: Mapped['TrainingCenterModel'] = relationship(back_populates='athlete', lazy='raise')
+    training_center_id: Mapped[int] = mapped_column(ForeignKey('training_center.pk_id'), index=True)
+
+
+# gin_trgm_ops comes with pg_trgm, migrations create it in their own revision
+event.listen(AthleteModel.__table__, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
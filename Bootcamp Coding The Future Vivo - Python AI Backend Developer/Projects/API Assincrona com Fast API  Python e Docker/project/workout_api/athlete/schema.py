@@ -1,15 +1,19 @@
-from typing import Annotated
-from pydantic import Field, PositiveFloat
+from typing import Annotated, Any, Literal, Optional
+from pydantic import UUID4, BaseModel, Field, PositiveFloat
+from workout_api.category.schema import CategoryIn
 from workout_api.generic.schemas import BaseSchema
 from workout_api.generic.schemas import BaseSchemaOut
+from workout_api.training_center.schema import TrainingCenter
 
 class Athlete(BaseSchema):
     name: Annotated[str, Field(description='Athlete Name', example='Matias', max_length=50)]
     cpf: Annotated[str, Field(description='Athlete CPF', example='13087536784', max_length=11)]
     age: Annotated[int, Field(description='Athlete Age', example=26)]
-    weight: Annotated[PositiveFloat, Field(description='Athlete Weight', example=80.7)]
-    height: Annotated[PositiveFloat, Field(description='Athlete Height', example=1.76)]
+    weight: Annotated[PositiveFloat, Field(description='Athlete Weight in kilograms', example=80.7, le=999.99)]
+    height: Annotated[PositiveFloat, Field(description='Athlete Height in meters', example=1.76, ge=0.5, le=3)]
     sex: Annotated[str, Field(description='Athlete Sext', example='M', max_length=1)]
+    category: Annotated[CategoryIn, Field(description='Athlete Category')]
+    training_center: Annotated[TrainingCenter, Field(description='Athlete Training Center')]
 
 class AthleteIn(Athlete):
     pass
@@ -17,6 +21,26 @@ class AthleteOut(Athlete, BaseSchemaOut):
     name: Annotated[str, Field(description='Athlete Name', example='Matias', max_length=50)]
     cpf: Annotated[str, Field(description='Athlete CPF', example='13087536784', max_length=11)]
     age: Annotated[int, Field(description='Athlete Age', example=26)]
-    weight: Annotated[PositiveFloat, Field(description='Athlete Weight', example=80.7)]
-    height: Annotated[PositiveFloat, Field(description='Athlete Height', example=1.76)]
+    weight: Annotated[PositiveFloat, Field(description='Athlete Weight in kilograms', example=80.7, le=999.99)]
+    height: Annotated[PositiveFloat, Field(description='Athlete Height in meters', example=1.76, ge=0.5, le=3)]
     sex: Annotated[str, Field(description='Athlete Sext', example='M', max_length=1)]
+
+class AthleteBulkResult(BaseModel):
+    index: Annotated[int, Field(description='Position of the athlete in the upload')]
+    status: Annotated[Literal['created', 'conflict', 'invalid'], Field(description='Import Status')]
+    id: Annotated[Optional[UUID4], Field(description='Identifier of the created athlete')] = None
+    detail: Annotated[Any, Field(description='Reason the athlete was not created')] = None
+
+class BmiDistribution(BaseModel):
+    underweight: Annotated[int, Field(description='Athletes with a BMI under 18.5')]
+    normal: Annotated[int, Field(description='Athletes with a BMI from 18.5 to 25')]
+    overweight: Annotated[int, Field(description='Athletes with a BMI from 25 to 30')]
+    obese: Annotated[int, Field(description='Athletes with a BMI of 30 or more')]
+
+class AthleteStats(BaseModel):
+    group: Annotated[str, Field(description='Category or Training Center Name', example='Bodybuild')]
+    athletes: Annotated[int, Field(description='Number of Athletes', example=12)]
+    average_age: Annotated[float, Field(description='Average Age', example=27.5)]
+    average_weight: Annotated[float, Field(description='Average Weight in kilograms', example=76.3)]
+    average_height: Annotated[float, Field(description='Average Height in meters', example=1.74)]
+    bmi: Annotated[BmiDistribution, Field(description='Athletes per BMI class')]
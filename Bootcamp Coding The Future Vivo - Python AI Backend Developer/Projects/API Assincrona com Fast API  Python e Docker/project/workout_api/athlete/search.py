@@ -0,0 +1,64 @@
+import re
+from typing import Optional
+
+from sqlalchemy import ColumnElement, Float, and_, func, or_
+
+from workout_api.athlete.model import AthleteModel
+
+# with or without the dots and dash of 130.875.367-84
+CPF_PATTERN = re.compile(r'\d{3}\.?\d{3}\.?\d{3}-?\d{2}')
+
+
+def search_cpf(q: str) -> Optional[str]:
+    """
+    The CPF searched for, when `q` is one.
+    """
+    if CPF_PATTERN.fullmatch(q):
+        return re.sub(r'\D', '', q)
+    return None
+
+
+def name_starts_with(prefix: str) -> ColumnElement[bool]:
+    """
+    Matches the names starting with `prefix`, as the range of names from the
+    prefix up to the prefix with its last character incremented.
+
+    A bound LIKE pattern can only use ix_athlete_name_pattern in plans made
+    with its value, planned again on every search. The range uses the
+    operators of text_pattern_ops, which the generic plan of the prepared
+    statement can use as well.
+    """
+    condition = AthleteModel.name.op('~>=~', is_comparison=True)(prefix)
+    if ord(prefix[-1]) < 0x10FFFF:
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        condition = and_(condition, AthleteModel.name.op('~<~', is_comparison=True)(upper))
+    return condition
+
+
+def name_similar_to(q: str) -> ColumnElement[bool]:
+    """
+    Matches the names sharing enough trigrams with `q`, as set by the
+    pg_trgm.similarity_threshold of the server, 0.3 by default. Uses
+    ix_athlete_name_trgm.
+    """
+    return AthleteModel.name.op('%', is_comparison=True)(q)
+
+
+def similarity(q: str) -> ColumnElement[float]:
+    return func.similarity(AthleteModel.name, q, type_=Float)
+
+
+def after_similarity(q: str, cursor: str) -> ColumnElement[bool]:
+    """
+    Keeps the athletes ranked after the cursor of a similarity search, made
+    of the similarity and the pk_id of the last athlete of the page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    score, _, pk_id = cursor.partition(':')
+    score, pk_id = float(score), int(pk_id)
+    return or_(
+        similarity(q) < score,
+        and_(similarity(q) == score, AthleteModel.pk_id > pk_id),
+    )
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from typing import Callable, Literal, Optional
+
+from sqlalchemy import DDL, Select, column, event, func, select, table, text
+from sqlalchemy.exc import InterfaceError, OperationalError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from workout_api.athlete.model import AthleteModel
+from workout_api.category.model import CategoryModel
+from workout_api.settings.settings import settings
+from workout_api.training_center.model import TrainingCenterModel
+
+logger = logging.getLogger(__name__)
+
+BMI_CLASSES = ('underweight', 'normal', 'overweight', 'obese')
+
+# The athletes aggregated per category and training center. Sums rather than
+# averages are kept, so the rows can be added up again by category or by
+# training center. BMI classes follow the WHO cut-offs, athletes without a
+# height are left out of them rather than failing the refresh.
+CREATE_VIEW = """
+CREATE MATERIALIZED VIEW athlete_stats AS
+SELECT
+    category_id,
+    training_center_id,
+    count(*) AS athletes,
+    sum(age) AS age_sum,
+    sum(weight) AS weight_sum,
+    sum(height) AS height_sum,
+    count(*) FILTER (WHERE bmi < 18.5) AS bmi_underweight,
+    count(*) FILTER (WHERE bmi >= 18.5 AND bmi < 25) AS bmi_normal,
+    count(*) FILTER (WHERE bmi >= 25 AND bmi < 30) AS bmi_overweight,
+    count(*) FILTER (WHERE bmi >= 30) AS bmi_obese
+FROM (
+    SELECT category_id, training_center_id, age, weight, height, weight / NULLIF(height * height, 0) AS bmi
+    FROM athlete
+) AS athlete
+GROUP BY category_id, training_center_id
+"""
+# REFRESH ... CONCURRENTLY needs a unique index covering every row
+CREATE_VIEW_INDEX = 'CREATE UNIQUE INDEX ix_athlete_stats_group ON athlete_stats (category_id, training_center_id)'
+DROP_VIEW = 'DROP MATERIALIZED VIEW IF EXISTS athlete_stats'
+
+# created along with the tables by metadata.create_all. The migration
+# 3f7a9c2e1b84 holds its own copy of the statements, changing the view needs a
+# new migration
+event.listen(AthleteModel.__table__, 'after_create', DDL(CREATE_VIEW))
+event.listen(AthleteModel.__table__, 'after_create', DDL(CREATE_VIEW_INDEX))
+event.listen(AthleteModel.__table__, 'before_drop', DDL(DROP_VIEW))
+
+athlete_stats = table(
+    'athlete_stats',
+    column('category_id'),
+    column('training_center_id'),
+    column('athletes'),
+    column('age_sum'),
+    column('weight_sum'),
+    column('height_sum'),
+    *(column(f'bmi_{name}') for name in BMI_CLASSES),
+)
+
+
+def select_stats(group_by: Literal['category', 'training_center']) -> Select:
+    """
+    Adds up the rows of the view by category or by training center, named
+    `group`, with the averages and the number of athletes of each BMI class.
+    """
+    group = CategoryModel if group_by == 'category' else TrainingCenterModel
+    group_id = athlete_stats.c.category_id if group_by == 'category' else athlete_stats.c.training_center_id
+    athletes = func.sum(athlete_stats.c.athletes)
+
+    return (
+        select(
+            group.name.label('group'),
+            athletes.label('athletes'),
+            (func.sum(athlete_stats.c.age_sum) / athletes).label('average_age'),
+            (func.sum(athlete_stats.c.weight_sum) / athletes).label('average_weight'),
+            (func.sum(athlete_stats.c.height_sum) / athletes).label('average_height'),
+            *(func.sum(athlete_stats.c[f'bmi_{name}']).label(name) for name in BMI_CLASSES),
+        )
+        .join(group, group.pk_id == group_id)
+        .group_by(group.pk_id, group.name)
+        .order_by(group.name)
+    )
+
+
+async def refresh_stats(db_session: AsyncSession) -> None:
+    """
+    Computes the view again. Being concurrent, the refresh doesn't block the
+    reads of the view.
+    """
+    await db_session.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY athlete_stats'))
+
+
+class StatsRefresher:
+    """
+    Refreshes the view after athletes are registered, at most once every
+    `interval` seconds, so a burst of writes costs a single refresh.
+
+    Each worker refreshes after its own writes, the stats lag behind them by
+    up to `interval` seconds. Only the refreshes that lost the database are
+    retried.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def request(self) -> None:
+        self._requested.set()
+
+    def start(self, session_factory: Callable[[], AsyncSession]) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, session_factory: Callable[[], AsyncSession]) -> None:
+        while True:
+            await self._requested.wait()
+            self._requested.clear()
+            try:
+                async with session_factory() as db_session:
+                    await refresh_stats(db_session)
+                    await db_session.commit()
+            except (OSError, InterfaceError, OperationalError) as exc:
+                # the database may be back by the next attempt
+                logger.warning('Could not refresh athlete_stats: %s', exc)
+                self._requested.set()
+            except SQLAlchemyError:
+                # retrying would fail the same way, the next write tries again
+                logger.exception('Could not refresh athlete_stats')
+            await asyncio.sleep(self.interval)
+
+
+stats_refresher = StatsRefresher(settings.ATHLETE_STATS_REFRESH_INTERVAL)
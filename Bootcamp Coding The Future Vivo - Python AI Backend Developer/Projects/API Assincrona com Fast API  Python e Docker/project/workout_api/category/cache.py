@@ -0,0 +1,5 @@
+from workout_api.category.model import CategoryModel
+from workout_api.category.schema import CategoryOut
+from workout_api.generic.cache import ReferenceCache
+
+category_cache = ReferenceCache(CategoryModel, CategoryOut, CategoryModel.__tablename__)
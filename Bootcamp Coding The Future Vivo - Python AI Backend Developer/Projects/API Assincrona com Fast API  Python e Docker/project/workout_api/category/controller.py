@@ -1,8 +1,10 @@
+from typing import Annotated, Optional
 from uuid import uuid4
-from fastapi import APIRouter, Body, HTTPException, status
+from fastapi import APIRouter, Body, Header, HTTPException, Response, status
 from pydantic import UUID4
-from sqlalchemy import select
+from workout_api.generic.cache import notify_change
 from workout_api.generic.dependencies import DatabaseDependencies
+from workout_api.category.cache import category_cache
 from workout_api.category.schema import CategoryIn, CategoryOut
 from workout_api.category.model import CategoryModel
 
@@ -13,10 +15,12 @@ router = APIRouter()
         summary="Consult all categories",
         status_code=status.HTTP_200_OK,
         response_model=list[CategoryOut])
-async def get_all(db_session: DatabaseDependencies) -> list[CategoryOut]:
+async def get_all(
+    db_session: DatabaseDependencies,
+    if_none_match: Annotated[Optional[str], Header()] = None) -> Response:
 
-    categories: list[CategoryOut] = (await db_session.execute(select(CategoryModel))).scalars().all()
-    return categories
+    await category_cache.load(db_session)
+    return category_cache.response(if_none_match)
 
 @router.get(
         path='/{id}',
@@ -24,8 +28,8 @@ async def get_all(db_session: DatabaseDependencies) -> list[CategoryOut]:
         status_code=status.HTTP_200_OK,
         response_model=CategoryOut)
 async def get(id: UUID4, db_session: DatabaseDependencies) -> list[CategoryOut]:
-    category: CategoryOut = (await db_session.execute(
-        select(CategoryModel).filter_by(id=id))).scalars().first()
+    await category_cache.load(db_session)
+    category: CategoryOut = category_cache.by_id.get(id)
 
     if not category:
         raise HTTPException(
@@ -50,6 +54,8 @@ async def post(
 
 
     db_session.add(category_model)
+    await notify_change(db_session, CategoryModel.__tablename__)
     await db_session.commit()
+    category_cache.invalidate()
     
     return category_out
@@ -7,4 +7,4 @@ class CategoryModel(BaseModel):
 
     pk_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(10), unique=True, nullable=False)
-    athlete: Mapped['AthleteModel'] = relationship(back_populates='category')
+    athlete: Mapped[list['AthleteModel']] = relationship(back_populates='category')
@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import logging
+from typing import Any, Optional
+from uuid import UUID
+
+import asyncpg
+from fastapi import Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from workout_api.settings.database import PRIMARY
+
+logger = logging.getLogger(__name__)
+
+# Channel notified with the table name when reference data changes
+CHANNEL = 'reference_data'
+
+reference_caches: dict[str, 'ReferenceCache'] = {}
+
+
+class ReferenceCache:
+    """
+    Keeps a small, rarely changing table in memory, along with its serialized
+    listing and the ETag of the listing.
+
+    Every invalidation bumps `version`. A load only marks the cache fresh when
+    no invalidation happened meanwhile, so a change committed during a load
+    isn't lost. The table is read from the primary, since the notification of
+    a change may reach the cache before the replica has it.
+    """
+
+    def __init__(self, model: type, schema: type, table: str) -> None:
+        self.model = model
+        self.schema = schema
+        self.table = table
+        self.version = 0
+        self.items: list[Any] = []
+        self.by_id: dict[UUID, Any] = {}
+        self.pk_ids: dict[str, int] = {}
+        self.body = b'[]'
+        self.etag = ''
+        self._adapter = TypeAdapter(list[schema])
+        self._loaded_version: Optional[int] = None
+        self._lock = asyncio.Lock()
+        reference_caches[table] = self
+
+    @property
+    def fresh(self) -> bool:
+        return self._loaded_version == self.version
+
+    def invalidate(self) -> None:
+        self.version += 1
+
+    async def load(self, db_session: AsyncSession) -> None:
+        """
+        Reads the table again, unless the cache is fresh.
+        """
+        async with self._lock:
+            if self.fresh:
+                return
+
+            version = self.version
+            rows = (await db_session.execute(
+                select(self.model).order_by(self.model.pk_id), bind_arguments=PRIMARY
+            )).scalars().all()
+
+            self.items = [self.schema.model_validate(row) for row in rows]
+            self.by_id = {item.id: item for item in self.items}
+            self.pk_ids = {row.name: row.pk_id for row in rows}
+            self.body = self._adapter.dump_json(self.items)
+            # derived from the content, so every worker agrees on it
+            self.etag = f'"{hashlib.blake2b(self.body, digest_size=16).hexdigest()}"'
+            self._loaded_version = version
+
+    async def get_pk_ids(self, db_session: AsyncSession, names: set[str]) -> dict[str, int]:
+        """
+        Maps names to primary keys. Unknown names are looked up in the
+        database, in case they were created since the cache was loaded; only
+        those are read, so names that don't exist never reload the table.
+        """
+        await self.load(db_session)
+        missing = names - self.pk_ids.keys()
+        if missing:
+            rows = await db_session.execute(
+                select(self.model.name, self.model.pk_id).where(self.model.name.in_(missing)),
+                bind_arguments=PRIMARY,
+            )
+            # the listing is refreshed when the change is notified
+            self.pk_ids.update({name: pk_id for name, pk_id in rows})
+        return {name: self.pk_ids[name] for name in names if name in self.pk_ids}
+
+    def response(self, if_none_match: Optional[str]) -> Response:
+        """
+        The listing of the table, or a 304 when the client holds it already.
+        If-None-Match uses the weak comparison of RFC 9110, W/ is ignored.
+        """
+        headers = {'ETag': self.etag, 'Cache-Control': 'no-cache'}
+        if if_none_match and any(
+            tag.strip().removeprefix('W/') in ('*', self.etag) for tag in if_none_match.split(',')
+        ):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=self.body, media_type='application/json', headers=headers)
+
+
+async def notify_change(db_session: AsyncSession, table: str) -> None:
+    """
+    Tells every worker that the table changed, once the transaction commits.
+    """
+    await db_session.execute(text('SELECT pg_notify(:channel, :table)'), {'channel': CHANNEL, 'table': table})
+
+
+class ReferenceListener:
+    """
+    Invalidates the reference caches of this worker when any worker changes
+    their tables, listening on CHANNEL from a dedicated connection.
+
+    The connection is opened again when lost. Changes may have been missed
+    meanwhile, so all the caches are invalidated then.
+    """
+
+    def __init__(self, url: str, retry_delay: float = 1.0) -> None:
+        self.dsn = make_url(url).set(drivername='postgresql').render_as_string(hide_password=False)
+        self.retry_delay = retry_delay
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        reconnecting = False
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning('Could not listen to %s: %s', CHANNEL, exc)
+                await asyncio.sleep(self.retry_delay)
+                continue
+
+            closed = asyncio.Event()
+            try:
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, self._notified)
+                if reconnecting:
+                    _invalidate_all()
+                await closed.wait()
+            finally:
+                await connection.close()
+
+            logger.warning('Connection listening to %s lost', CHANNEL)
+            _invalidate_all()
+            reconnecting = True
+            await asyncio.sleep(self.retry_delay)
+
+    def _notified(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        cache = reference_caches.get(payload)
+        if cache is not None:
+            cache.invalidate()
+
+
+def _invalidate_all() -> None:
+    for cache in reference_caches.values():
+        cache.invalidate()
@@ -1,7 +1,9 @@
 from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from workout_api.settings.database import get_session
+from workout_api.settings.database import get_session, get_session_factory
 
 DatabaseDependencies = Annotated[AsyncSession, Depends(get_session)]
+SessionFactoryDependencies = Annotated[sessionmaker, Depends(get_session_factory)]
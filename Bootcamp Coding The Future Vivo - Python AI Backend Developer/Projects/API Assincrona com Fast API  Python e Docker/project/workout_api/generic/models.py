@@ -3,4 +3,4 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
 class BaseModel(DeclarativeBase):
-    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), nullable=False)
\ No newline at end of file
+    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), nullable=False, unique=True, index=True)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from workout_api.athlete.model import AtheleteModel
+from workout_api.athlete.model import AthleteModel
 from workout_api.category.model import CategoryModel
 from workout_api.training_center.model import TrainingCenterModel
 
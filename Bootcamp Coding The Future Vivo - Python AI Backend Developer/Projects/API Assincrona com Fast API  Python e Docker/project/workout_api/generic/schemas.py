@@ -1,11 +1,9 @@
 from datetime import datetime
 from typing import Annotated
-from pydantic import UUID4, BaseModel, Field
+from pydantic import UUID4, BaseModel, ConfigDict, Field
 
 class BaseSchema(BaseModel):
-    class config:
-        extra = 'forbid'
-        from_attributes = True
+    model_config = ConfigDict(extra='forbid', from_attributes=True)
 
 class BaseSchemaOut(BaseModel):
     id: Annotated[UUID4, Field(description="Identifier")]
@@ -1,6 +1,30 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from fastapi import FastAPI
+from workout_api.athlete.stats import stats_refresher
+from workout_api.generic.cache import ReferenceListener, reference_caches
 from workout_api.router import router
+from workout_api.settings.database import async_session
+from workout_api.settings.settings import settings
 
-app = FastAPI(title="Workout API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # reference data is served from memory, kept fresh by the listener
+    async with async_session() as db_session:
+        for cache in reference_caches.values():
+            await cache.load(db_session)
+
+    listener = ReferenceListener(settings.BD_URL)
+    listener.start()
+    stats_refresher.start(async_session)
+
+    yield
+
+    await stats_refresher.stop()
+    await listener.stop()
+
+
+app = FastAPI(title="Workout API", lifespan=lifespan)
 
 app.include_router(router)
@@ -1,16 +1,83 @@
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from fastapi import Request
+from sqlalchemy import Select
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from workout_api.settings.settings import settings
 
-engine = create_async_engine(settings.BD_URL, echo=False)
+READ_ONLY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+# bind arguments sending a query to the primary whatever the session
+PRIMARY = {'primary': True}
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    """
+    The pool and connection options of the engines, from the settings.
+    """
+    options: dict[str, Any] = {
+        'echo': False,
+        'pool_size': settings.BD_POOL_SIZE,
+        'max_overflow': settings.BD_MAX_OVERFLOW,
+        'pool_timeout': settings.BD_POOL_TIMEOUT,
+        'pool_recycle': settings.BD_POOL_RECYCLE,
+        'pool_pre_ping': settings.BD_POOL_PRE_PING,
+    }
+
+    if make_url(url).get_driver_name() == 'asyncpg':
+        server_settings = {}
+        if settings.BD_STATEMENT_TIMEOUT:
+            server_settings['statement_timeout'] = str(settings.BD_STATEMENT_TIMEOUT)
+        options['connect_args'] = {
+            # statements prepared by SQLAlchemy and by asyncpg itself
+            'prepared_statement_cache_size': settings.BD_STATEMENT_CACHE_SIZE,
+            'statement_cache_size': settings.BD_STATEMENT_CACHE_SIZE,
+            'server_settings': server_settings,
+        }
+
+    return options
+
+
+engine = create_async_engine(settings.BD_URL, **engine_options(settings.BD_URL))
+replica_engine: Optional[AsyncEngine] = (
+    create_async_engine(settings.BD_REPLICA_URL, **engine_options(settings.BD_REPLICA_URL))
+    if settings.BD_REPLICA_URL else None
+)
+
+
+class RoutingSession(Session):
+    """
+    Sends the queries of read-only sessions to the replica, when there is one,
+    and everything else to the primary. Flushes always go to the primary, as
+    do the queries executed with `bind_arguments=PRIMARY`, for reads that must
+    not lag behind.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw) -> Engine:
+        if (
+            replica_engine is not None
+            and self.info.get('read_only')
+            and not kw.get('primary')
+            and not self._flushing
+            and isinstance(clause, Select)
+        ):
+            return replica_engine.sync_engine
+        return engine.sync_engine
+
+
 async_session = sessionmaker(
-    engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False
     )
 
-async def get_session( ) -> AsyncGenerator:
-    async with async_session() as session:
+def get_session_factory() -> sessionmaker:
+    # for responses streamed after the request session is closed
+    return async_session
+
+async def get_session(request: Request) -> AsyncGenerator:
+    # replicas lag behind the primary, only requests that don't write read
+    # from them
+    async with async_session(info={'read_only': request.method in READ_ONLY_METHODS}) as session:
         yield session
@@ -0,0 +1,5 @@
+from workout_api.generic.cache import ReferenceCache
+from workout_api.training_center.model import TrainingCenterModel
+from workout_api.training_center.schema import TrainingCenterOut
+
+training_center_cache = ReferenceCache(TrainingCenterModel, TrainingCenterOut, TrainingCenterModel.__tablename__)
@@ -1,8 +1,10 @@
+from typing import Annotated, Optional
 from uuid import uuid4
-from fastapi import APIRouter, Body, HTTPException, status
+from fastapi import APIRouter, Body, Header, HTTPException, Response, status
 from pydantic import UUID4
-from sqlalchemy import select
+from workout_api.generic.cache import notify_change
 from workout_api.generic.dependencies import DatabaseDependencies
+from workout_api.training_center.cache import training_center_cache
 from workout_api.training_center.schema import TrainingCenterIn, TrainingCenterOut
 from workout_api.training_center.model import TrainingCenterModel
 
@@ -13,15 +15,17 @@ router = APIRouter()
         summary="Consult all training centers",
         status_code=status.HTTP_200_OK,
         response_model=list[TrainingCenterOut])
-async def get_all(db_session: DatabaseDependencies) -> list[TrainingCenterOut]:
+async def get_all(
+    db_session: DatabaseDependencies,
+    if_none_match: Annotated[Optional[str], Header()] = None) -> Response:
 
-    training_centers: list[TrainingCenterOut] = (await db_session.execute(select(TrainingCenterModel))).scalars().all()
-    return training_centers
+    await training_center_cache.load(db_session)
+    return training_center_cache.response(if_none_match)
 
 @router.get(path='/{id}',summary="Consult training center",status_code=status.HTTP_200_OK, response_model=TrainingCenterOut)
 async def get(id: UUID4, db_session: DatabaseDependencies) -> list[TrainingCenterOut]:
-    training_center: TrainingCenterOut = (await db_session.execute(
-        select(TrainingCenterModel).filter_by(id=id))).scalars().first()
+    await training_center_cache.load(db_session)
+    training_center: TrainingCenterOut = training_center_cache.by_id.get(id)
 
     if not training_center:
         raise HTTPException(
@@ -45,6 +49,8 @@ async def post(
 
 
     db_session.add(training_center_model)
+    await notify_change(db_session, TrainingCenterModel.__tablename__)
     await db_session.commit()
+    training_center_cache.invalidate()
     
     return training_center_out
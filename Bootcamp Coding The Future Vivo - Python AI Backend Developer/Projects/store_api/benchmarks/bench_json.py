@@ -0,0 +1,82 @@
+"""
+Compares the two ways product pages are serialized, on a raw BSON batch like
+the ones returned by MongoDB:
+
+* validation: decode, validate into `ProductOut`, serialize with Pydantic.
+* fast_json: decode in C, serialize with orjson (FAST_JSON_RESPONSES=true).
+
+Usage: python -m benchmarks.bench_json [--products 500] [--repeat 20]
+"""
+import argparse
+import json
+import timeit
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import bson
+from bson import Decimal128
+
+from src.core import fast_json
+from src.core.codecs import CODEC_OPTIONS
+from src.schemas.product import ProductOut
+
+
+def make_batch(products: int) -> bytes:
+    now = datetime.utcnow()
+    return b"".join(
+        bson.encode(
+            {
+                "id": uuid.uuid4(),
+                "created_at": now,
+                "updated_at": now,
+                "version": 1,
+                "name": f"Product {index}",
+                "quantity": index,
+                "price": Decimal128(Decimal(index) / 100),
+                "status": index % 2 == 0,
+            },
+            codec_options=fast_json.CODEC_OPTIONS,
+        )
+        for index in range(products)
+    )
+
+
+def with_validation(batch: bytes) -> bytes:
+    # decoded like the products collection does, Decimal128 to Decimal
+    products = [ProductOut(**item) for item in bson.decode_all(batch, CODEC_OPTIONS)]
+    return (
+        "[" + ",".join(product.model_dump_json() for product in products) + "]"
+    ).encode()
+
+
+def with_fast_json(batch: bytes) -> bytes:
+    return fast_json.dumps(fast_json.decode_batch(batch))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    batch = make_batch(args.products)
+    assert json.loads(with_validation(batch)) == json.loads(with_fast_json(batch))
+
+    results = {
+        name: min(timeit.repeat(lambda: function(batch), number=1, repeat=args.repeat))
+        for name, function in (
+            ("validation", with_validation),
+            ("fast_json", with_fast_json),
+        )
+    }
+    for name, seconds in results.items():
+        print(
+            f"{name:>10}: {seconds * 1000:8.2f} ms per page of {args.products} "
+            f"({seconds / args.products * 1e6:6.2f} us per product)"
+        )
+    print(f"   speedup: {results['validation'] / results['fast_json']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
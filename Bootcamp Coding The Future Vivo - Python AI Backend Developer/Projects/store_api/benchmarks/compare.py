@@ -0,0 +1,74 @@
+"""
+Compares two load test results saved by `benchmarks.load`, and fails when an
+endpoint got slower or served less requests than the allowed threshold.
+
+Usage: python -m benchmarks.compare baseline.json current.json [--threshold 0.1]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+# metric -> whether a higher value is better
+METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "throughput_rps": True}
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Lists the regressions of the current results relative to the baseline.
+
+    Args:
+        baseline (Dict[str, Any]): The reference results.
+        current (Dict[str, Any]): The results to check.
+        threshold (float): The relative change tolerated, e.g. 0.1 for 10%.
+
+    Returns:
+        List[str]: A description of each regression.
+    """
+    regressions = []
+    for endpoint, before in baseline["endpoints"].items():
+        after = current["endpoints"].get(endpoint)
+        if after is None:
+            regressions.append(f"{endpoint}: missing from the current results")
+            continue
+
+        if after["errors"] > before["errors"]:
+            regressions.append(
+                f"{endpoint}: errors {before['errors']} -> {after['errors']}"
+            )
+
+        for metric, higher_is_better in METRICS.items():
+            change = (after[metric] - before[metric]) / before[metric]
+            print(
+                f"{endpoint:>8} {metric:>14}: {before[metric]:>10} -> "
+                f"{after[metric]:>10} ({change:+.1%})"
+            )
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f"{endpoint}: {metric} {change:+.1%}")
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two load test results.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    regressions = compare(
+        json.loads(args.baseline.read_text()),
+        json.loads(args.current.read_text()),
+        args.threshold,
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
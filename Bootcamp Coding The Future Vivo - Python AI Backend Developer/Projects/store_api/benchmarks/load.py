@@ -0,0 +1,200 @@
+"""
+Load test of the product endpoints, driving the ASGI app in-process through
+httpx, against the in-memory stand-in or a real MongoDB.
+
+Each phase runs its requests with the given concurrency and reports the
+latency percentiles and the throughput of one endpoint: create (which seeds
+the products), get, query, patch and delete. The results are saved as JSON,
+to be compared between commits with `benchmarks.compare`.
+
+Usage: python -m benchmarks.load [--products 1000] [--requests 2000]
+    [--concurrency 32] [--mongo-url mongodb://...] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+async def run_phase(
+    client: httpx.AsyncClient, request: Request, count: int, concurrency: int
+) -> Dict[str, Any]:
+    """
+    Sends `count` requests with `concurrency` workers.
+
+    Args:
+        client (httpx.AsyncClient): The client bound to the app.
+        request (Request): Sends the request of the given index.
+        count (int): The number of requests to send.
+        concurrency (int): The number of requests in flight.
+
+    Returns:
+        Dict[str, Any]: The latency percentiles, in milliseconds, the
+        throughput and the number of failed requests of the phase.
+    """
+    latencies: List[float] = []
+    errors = 0
+    indexes = iter(range(count))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in indexes:
+            start = time.perf_counter()
+            response = await request(client, index)
+            latencies.append(time.perf_counter() - start)
+            if response.is_error:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": count,
+        "errors": errors,
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "throughput_rps": round(count / elapsed, 1),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from src.core.settings import settings
+    from src.database.indexes import sync_indexes
+    from src.database.mongo import db_client
+
+    if args.mongo_url:
+        settings.DATABASE_URL = args.mongo_url
+        db_client.connect()
+    else:
+        from benchmarks.standin import create_client
+
+        db_client.client = create_client()
+        # the stand-in has no raw batches nor change streams
+        settings.FAST_JSON_RESPONSES = False
+
+    from src.main import app
+
+    database = db_client.get().get_database()
+    await database.drop_collection("products")
+    await sync_indexes(database)
+
+    ids: List[str] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def create(client: httpx.AsyncClient, index: int) -> httpx.Response:
+            response = await client.post(
+                "/products/",
+                json={
+                    "name": f"Product {index}",
+                    "quantity": index % 100,
+                    "price": f"{index % 1000}.{index % 100:02d}",
+                    "status": index % 2 == 0,
+                },
+            )
+            if response.is_success:
+                ids.append(response.json()["id"])
+            return response
+
+        async def get(client: httpx.AsyncClient, index: int) -> httpx.Response:
+            return await client.get(f"/products/{random.choice(ids)}")
+
+        async def query(client: httpx.AsyncClient, index: int) -> httpx.Response:
+            return await client.get("/products/", params={"limit": args.page_size})
+
+        async def patch(client: httpx.AsyncClient, index: int) -> httpx.Response:
+            return await client.patch(
+                f"/products/{random.choice(ids)}", json={"quantity": index}
+            )
+
+        async def delete(client: httpx.AsyncClient, index: int) -> httpx.Response:
+            return await client.delete(f"/products/{ids[index]}")
+
+        phases = [
+            ("create", create, lambda: args.products),
+            ("get", get, lambda: args.requests),
+            ("query", query, lambda: args.requests),
+            ("patch", patch, lambda: args.requests),
+            # only the products the create phase managed to create are deleted
+            ("delete", delete, lambda: len(ids)),
+        ]
+        endpoints = {}
+        for name, request, count in phases:
+            endpoints[name] = await run_phase(
+                client, request, count(), args.concurrency
+            )
+            print(f"{name:>8}: {endpoints[name]}")
+
+    db_client.close()
+    return {
+        "meta": {
+            "commit": _commit(),
+            "date": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "database": "mongodb" if args.mongo_url else "standin",
+            "products": args.products,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "page_size": args.page_size,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the product endpoints.")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument(
+        "--mongo-url", help="run against this MongoDB instead of the in-memory stand-in"
+    )
+    parser.add_argument(
+        "--output", type=Path, help="file the JSON results are saved to"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = asyncio.run(run(args))
+
+    output = (
+        args.output or Path("benchmarks/results") / f"{results['meta']['commit']}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
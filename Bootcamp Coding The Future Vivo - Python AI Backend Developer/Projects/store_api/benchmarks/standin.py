@@ -0,0 +1,41 @@
+"""
+In-memory MongoDB stand-in for the benchmarks, based on mongomock-motor.
+
+mongomock validates documents with the default BSON codec, which refuses the
+native UUIDs stored with `uuidRepresentation=standard`, it only accepts the
+default codec options, and it doesn't accept the `sort` argument pymongo >= 4.9
+gives to bulk updates. These checks are relaxed here, which changes what the
+stand-in stores:
+
+- the codec options of the collections are dropped, so documents keep their
+  Python values: `Decimal` fields are stored as `Decimal` rather than BSON
+  Decimal128 and `DecimalCodec` is never used. The codec is tested on its own,
+  through `CODEC_OPTIONS`, in tests/test_codecs.py.
+- the `sort` of bulk updates is ignored.
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+
+
+def create_client(database: str = "store") -> AsyncIOMotorClient:
+    import mongomock.collection
+    from mongomock_motor import AsyncMongoMockClient
+
+    import mongomock.database
+
+    mongomock.collection.BSON = None
+
+    get_collection = mongomock.database.Database.get_collection
+
+    def _get_collection(self, name, codec_options=None, **kwargs):
+        return get_collection(self, name, **kwargs)
+
+    mongomock.database.Database.get_collection = _get_collection
+
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+
+    def _add_update(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+
+    mongomock.collection.BulkOperationBuilder.add_update = _add_update
+
+    return AsyncMongoMockClient(f"mongodb://localhost/{database}")
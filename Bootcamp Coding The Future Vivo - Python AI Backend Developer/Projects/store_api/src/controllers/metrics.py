@@ -0,0 +1,93 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, Response, status
+
+from src.core.metrics import render_samples
+from src.core.middleware import request_duration
+from src.database.monitoring import command_metrics, pool_metrics
+from src.dependencies import get_product_usecase
+from src.usecases.product import ProductUseCase
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get(path="", status_code=status.HTTP_200_OK, response_class=Response)
+async def metrics(usecase: ProductUseCase = Depends(get_product_usecase)) -> Response:
+    """
+    Expose the metrics of this worker in the Prometheus text format.
+
+    Args:
+        usecase (ProductUseCase): The use case holding the product cache and
+            the event subscribers.
+
+    Returns:
+        Response: The HTTP request, MongoDB command, connection pool, product
+        cache and product event metrics.
+    """
+    lines: List[str] = []
+    lines += request_duration.render()
+    lines += command_metrics.duration.render()
+    lines += command_metrics.documents.render()
+    lines += command_metrics.failures.render()
+
+    pools = pool_metrics.snapshot()
+    for name, field, kind, help in (
+        ("open_connections", "open_connections", "gauge", "Open connections."),
+        ("checked_out", "checked_out", "gauge", "Connections checked out."),
+        ("wait_queue", "wait_queue", "gauge", "Operations waiting for a connection."),
+        ("checkouts_total", "checkouts", "counter", "Connections checked out."),
+        (
+            "checkout_failures_total",
+            "checkout_failures",
+            "counter",
+            "Failed checkouts.",
+        ),
+        (
+            "checkout_seconds_total",
+            "checkout_seconds_total",
+            "counter",
+            "Checkout time.",
+        ),
+        ("clears_total", "pool_clears", "counter", "Times the pool was cleared."),
+    ):
+        lines += render_samples(
+            f"store_mongo_pool_{name}",
+            help,
+            {(address,): stats[field] for address, stats in pools.items()},
+            labels=("address",),
+            kind=kind,
+        )
+
+    for name, field, kind, help in (
+        ("hits_total", "hits", "counter", "Product cache hits."),
+        ("misses_total", "misses", "counter", "Product cache misses."),
+        ("evictions_total", "evictions", "counter", "Products evicted from the cache."),
+        ("size_bytes", "size", "gauge", "Estimated size of the cached products."),
+    ):
+        lines += render_samples(
+            f"store_product_cache_{name}",
+            help,
+            {(): getattr(usecase.cache, field)},
+            kind=kind,
+        )
+
+    lines += render_samples(
+        "store_product_event_subscribers",
+        "Clients subscribed to the product events.",
+        {(): usecase.events.subscribers},
+    )
+
+    return Response(content="\n".join(lines) + "\n", media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+@router.get(path="/pool", status_code=status.HTTP_200_OK)
+async def pool() -> Dict[str, Dict[str, Any]]:
+    """
+    Retrieve the MongoDB connection pool statistics of this worker.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The connection counts, wait queue depth and
+        checkout latency of the pool of each server.
+    """
+    return pool_metrics.snapshot()
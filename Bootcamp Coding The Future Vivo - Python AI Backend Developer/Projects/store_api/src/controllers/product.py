@@ -1,40 +1,444 @@
-from typing import List
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, status
+from typing import Any, Dict, FrozenSet, List, Literal, Optional
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from pydantic import UUID4
-from src.core.exceptions import NotFoundException
+from src.core.etag import etag_matches, make_etag, parse_if_match
+from src.core.exceptions import (
+    InvalidCursorException,
+    InsufficientStockException,
+    InvalidFieldsException,
+    NotFoundException,
+    PreconditionFailedException,
+)
+from src.core import fast_json
+from src.core.formats import csv_chunks, csv_rows, ndjson_rows
+from src.core.middleware import TimedRoute
+from src.core.settings import settings
+from src.dependencies import get_product_usecase
 
-from src.schemas.product import ProductIn, ProductOut, ProductUpdate, ProductUpdateOut
-from src.usecases.product import ProductUseCase
+from src.schemas.product import (
+    ProductBulkResult,
+    ProductFilter,
+    ProductImportReport,
+    ProductIn,
+    ProductOut,
+    ProductStatsOut,
+    ProductUpdate,
+    ProductUpdateOut,
+    StockIn,
+    parse_product_fields,
+)
+from src.usecases.product import DEFAULT_SORT, SORT_FIELDS, ProductUseCase
 
-router = APIRouter(tags=["products"])
+router = APIRouter(prefix="/products", tags=["products"], route_class=TimedRoute)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def use_fast_json() -> bool:
+    return settings.FAST_JSON_RESPONSES and fast_json.is_available()
+
+
+def product_fields(
+    fields: Optional[str] = Query(
+        None, description="Comma separated product fields to return"
+    )
+) -> Optional[FrozenSet[str]]:
+    """
+    Parses the sparse fieldset requested by the client.
+
+    Raises:
+        HTTPException: If a requested field doesn't exist.
+    """
+    try:
+        return parse_product_fields(fields)
+    except InvalidFieldsException as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
+
+
+def page_limit(
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Products per page, up to MAX_PAGE_SIZE (PAGE_SIZE by default)",
+    )
+) -> int:
+    """
+    Resolves the page size against the settings, read per request rather than
+    when the routes are declared.
+
+    Raises:
+        HTTPException: If the page size exceeds MAX_PAGE_SIZE.
+    """
+    if limit is None:
+        return settings.PAGE_SIZE
+    if limit > settings.MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"limit must be at most {settings.MAX_PAGE_SIZE}",
+        )
+    return limit
+
+
+def check_bulk_size(items: List[Any]) -> None:
+    """
+    Rejects the batches larger than MAX_BULK_SIZE.
+
+    Raises:
+        HTTPException: If the batch is too large.
+    """
+    if len(items) > settings.MAX_BULK_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A batch holds at most {settings.MAX_BULK_SIZE} items",
+        )
 
 
 @router.post(path="/", status_code=status.HTTP_201_CREATED)
 async def post(
-    body: ProductIn = Body(...), usecase: ProductUseCase = Depends()
+    response: Response,
+    body: ProductIn = Body(...),
+    usecase: ProductUseCase = Depends(get_product_usecase),
 ) -> ProductOut:
     """
     Create a new product.
 
     Args:
+        response (Response): The response used to set the ETag header.
         body (ProductIn): The product data to create.
         usecase (ProductUseCase): The use case instance to handle the product creation.
 
     Returns:
         ProductOut: The created product.
     """
-    return await usecase.create(body=body)
+    product = await usecase.create(body=body)
+    response.headers["ETag"] = make_etag(product.version)
+    return product
+
+
+@router.post(path="/bulk", status_code=status.HTTP_200_OK)
+async def bulk_post(
+    body: List[Dict[str, Any]] = Body(...),
+    usecase: ProductUseCase = Depends(get_product_usecase),
+) -> List[ProductBulkResult]:
+    """
+    Create a batch of products.
+
+    Args:
+        body (List[Dict[str, Any]]): The data of each product to create.
+        usecase (ProductUseCase): The use case instance to handle the product creation.
+
+    Returns:
+        List[ProductBulkResult]: The outcome of each item, in batch order.
+
+    Raises:
+        HTTPException: If the batch is larger than MAX_BULK_SIZE.
+    """
+    check_bulk_size(body)
+    return await usecase.bulk_create(items=body)
+
+
+@router.patch(path="/bulk", status_code=status.HTTP_200_OK)
+async def bulk_patch(
+    body: List[Dict[str, Any]] = Body(...),
+    usecase: ProductUseCase = Depends(get_product_usecase),
+) -> List[ProductBulkResult]:
+    """
+    Update a batch of products.
+
+    Args:
+        body (List[Dict[str, Any]]): The ID and the updated data of each product.
+        usecase (ProductUseCase): The use case instance to handle the product update.
+
+    Returns:
+        List[ProductBulkResult]: The outcome of each item, in batch order.
+
+    Raises:
+        HTTPException: If the batch is larger than MAX_BULK_SIZE.
+    """
+    check_bulk_size(body)
+    return await usecase.bulk_update(items=body)
+
+
+@router.delete(path="/bulk", status_code=status.HTTP_200_OK)
+async def bulk_delete(
+    body: List[UUID4] = Body(...),
+    usecase: ProductUseCase = Depends(get_product_usecase),
+) -> List[ProductBulkResult]:
+    """
+    Delete a batch of products by their IDs.
+
+    Args:
+        body (List[UUID4]): The IDs of the products to delete.
+        usecase (ProductUseCase): The use case instance to handle the product deletion.
+
+    Returns:
+        List[ProductBulkResult]: The outcome of each ID, in batch order.
+
+    Raises:
+        HTTPException: If the batch is larger than MAX_BULK_SIZE.
+    """
+    check_bulk_size(body)
+    return await usecase.bulk_delete(ids=body)
+
+
+@router.get(
+    path="/export", status_code=status.HTTP_200_OK, response_class=StreamingResponse
+)
+async def export(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    filter: ProductFilter = Depends(),
+    fields: Optional[FrozenSet[str]] = Depends(product_fields),
+    usecase: ProductUseCase = Depends(get_product_usecase),
+) -> StreamingResponse:
+    """
+    Stream every product matching the filter as NDJSON or CSV.
+
+    The products are read from the database cursor in batches of
+    STREAM_BATCH_SIZE and sent as they arrive, so the whole catalog is never
+    held in memory.
+
+    Args:
+        format (Literal["ndjson", "csv"]): The format of the export.
+        filter (ProductFilter): The filter the products must match.
+        fields (Optional[FrozenSet[str]]): The fields to export, all by default.
+        usecase (ProductUseCase): The use case instance to handle the export.
+
+    Returns:
+        StreamingResponse: The products, one per line.
+    """
+    if format == "csv":
+        columns = [
+            name for name in ProductOut.model_fields if not fields or name in fields
+        ]
+        chunks = csv_chunks(
+            usecase.stream(fields=fields, filter=filter),
+            columns,
+            batch_size=settings.STREAM_BATCH_SIZE,
+        )
+        media_type = f"{CSV_MEDIA_TYPE}; charset=utf-8"
+    else:
+        if use_fast_json():
+            chunks = usecase.stream_json(fields=fields, filter=filter)
+        else:
+            chunks = _ndjson(usecase.stream(fields=fields, filter=filter))
+        media_type = NDJSON_MEDIA_TYPE
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+
+@router.post(path="/import", status_code=status.HTTP_200_OK)
+async def import_products(
+    request: Request,
+    content_type: Optional[str] = Header(None),
+    usecase: ProductUseCase = Depends(get_product_usecase),
+) -> ProductImportReport:
+    """
+    Import the products of an NDJSON or CSV upload sent as the request body.
+
+    The body is read incrementally: each row is validated against `ProductIn`
+    and the valid ones are written in chunks of IMPORT_BATCH_SIZE, reading the
+    next chunk only once the previous one is stored. CSV uploads start with a
+    header naming the columns.
+
+    Args:
+        request (Request): The request streaming the upload.
+        content_type (Optional[str]): `application/x-ndjson` or `text/csv`.
+        usecase (ProductUseCase): The use case instance to handle the import.
+
+    Returns:
+        ProductImportReport: The outcome of the import, with the errors of the
+        failed rows.
+
+    Raises:
+        HTTPException: If the upload is neither NDJSON nor CSV.
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type == NDJSON_MEDIA_TYPE:
+        rows = ndjson_rows(request.stream())
+    elif media_type == CSV_MEDIA_TYPE:
+        rows = csv_rows(request.stream())
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Upload {NDJSON_MEDIA_TYPE} or {CSV_MEDIA_TYPE}",
+        )
+
+    return await usecase.import_products(rows)
+
+
+@router.get(path="/stats", status_code=status.HTTP_200_OK)
+async def stats(
+    filter: ProductFilter = Depends(),
+    usecase: ProductUseCase = Depends(get_product_usecase),
+) -> List[ProductStatsOut]:
+    """
+    Retrieve the count, stock and inventory value of the products by status.
+
+    Args:
+        filter (ProductFilter): The filter the aggregated products must match.
+        usecase (ProductUseCase): The use case instance to handle the aggregation.
+
+    Returns:
+        List[ProductStatsOut]: The statistics of each product status.
+    """
+    return await usecase.stats(filter=filter)
+
+
+@router.get(path="/search", status_code=status.HTTP_200_OK)
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    mode: Literal["text", "prefix"] = Query("text"),
+    limit: int = Depends(page_limit),
+    after: Optional[str] = Query(None),
+    fields: Optional[FrozenSet[str]] = Depends(product_fields),
+    usecase: ProductUseCase = Depends(get_product_usecase),
+) -> List[ProductOut]:
+    """
+    Search products by name.
+
+    The `text` mode returns the products matching the words of `q` by
+    relevance, the `prefix` mode (autocomplete) the products whose name starts
+    with `q`, ignoring case and accents, in alphabetical order. The cursor of
+    the next page is returned in the `X-Next-Cursor` header.
+
+    Args:
+        response (Response): The response used to set the pagination header.
+        q (str): The words or the name prefix to search for.
+        mode (Literal["text", "prefix"]): The search mode.
+        limit (int): The maximum number of products in the page.
+        after (Optional[str]): The cursor of the page to retrieve.
+        fields (Optional[FrozenSet[str]]): The fields to return, all by default.
+        usecase (ProductUseCase): The use case instance to handle the search.
+
+    Returns:
+        List[ProductOut]: A page of matching products.
+
+    Raises:
+        HTTPException: If the cursor is invalid.
+    """
+    try:
+        products, next_cursor = await usecase.search(
+            q=q, mode=mode, limit=limit, after=after, fields=fields
+        )
+    except InvalidCursorException as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
+
+    if fields:
+        # sparse products don't match the ProductOut response model
+        response = Response(
+            "[" + ",".join(product.model_dump_json() for product in products) + "]",
+            media_type="application/json",
+        )
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return response if fields else products
+
+
+@router.get(
+    path="/events", status_code=status.HTTP_200_OK, response_class=StreamingResponse
+)
+async def events(
+    id: Optional[List[UUID4]] = Query(
+        None, description="Products to follow, all by default"
+    ),
+    fields: Optional[FrozenSet[str]] = Depends(product_fields),
+    last_event_id: Optional[str] = Header(None),
+    usecase: ProductUseCase = Depends(get_product_usecase),
+) -> StreamingResponse:
+    """
+    Stream the changes of the products as server-sent events.
+
+    Each event is named after the change (`insert`, `update`, `replace` or
+    `delete`) and holds the product ID with its new field values. Its ID can be
+    sent back as `Last-Event-ID` to resume after it. A `reset` event means
+    changes were missed and the products must be reloaded. An `overflow`
+    event means the client fell behind; it is then disconnected and should
+    reconnect with its `Last-Event-ID`. The ID of deleted products is only
+    known with PRODUCT_EVENTS_PRE_IMAGES, so deletes aren't sent to
+    clients following specific products without it.
+
+    Args:
+        id (Optional[List[UUID4]]): The products to follow, all by default.
+        fields (Optional[FrozenSet[str]]): The fields whose updates are sent,
+            all by default.
+        last_event_id (Optional[str]): The ID of the last event received.
+        usecase (ProductUseCase): The use case holding the event subscribers.
+
+    Returns:
+        StreamingResponse: The event stream.
+
+    Raises:
+        HTTPException: If product changes are not watched.
+    """
+    if not usecase.events.available:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Product events are not available",
+        )
+
+    async def frames():
+        subscription = usecase.events.subscribe(
+            ids=frozenset(id) if id else None,
+            fields=fields,
+            last_event_id=last_event_id,
+        )
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                frame = await subscription.next_frame(settings.PRODUCT_EVENTS_HEARTBEAT)
+                if frame is None:
+                    return
+                yield frame or b": keep-alive\n\n"
+        finally:
+            usecase.events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get(path="/{id}", status_code=status.HTTP_200_OK)
 async def get(
-    id: UUID4 = Path(alias="id"), usecase: ProductUseCase = Depends()
+    response: Response,
+    id: UUID4 = Path(alias="id"),
+    fields: Optional[FrozenSet[str]] = Depends(product_fields),
+    if_none_match: Optional[str] = Header(None),
+    usecase: ProductUseCase = Depends(get_product_usecase),
 ) -> ProductOut:
     """
     Retrieve a product by its ID.
 
+    The product version is returned as ETag. When it matches the
+    `If-None-Match` header, an empty 304 response is returned instead.
+
     Args:
+        response (Response): The response used to set the ETag header.
         id (UUID4): The unique identifier of the product.
+        fields (Optional[FrozenSet[str]]): The fields to return, all by default.
+        if_none_match (Optional[str]): The ETags already held by the client.
         usecase (ProductUseCase): The use case instance to handle the product retrieval.
 
     Returns:
@@ -44,60 +448,240 @@ async def get(
         HTTPException: If the product is not found.
     """
     try:
-        return await usecase.get(id=id)
+        if use_fast_json():
+            content, version = await usecase.get_json(id=id, fields=fields)
+        else:
+            # the version is always fetched to build the ETag
+            product = await usecase.get(
+                id=id, fields=fields | {"version"} if fields else None
+            )
+            content, version = None, product.version
     except NotFoundException as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=exc.message)
 
+    etag = make_etag(version)
+    if etag_matches(if_none_match, version):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+    if fields and content is None:
+        content = product.model_dump_json(include=fields)
+    if content is not None:
+        # raw and sparse products skip the ProductOut response model
+        return Response(content, media_type="application/json", headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return product
+
 
 @router.get(path="/", status_code=status.HTTP_200_OK)
-async def query(usecase: ProductUseCase = Depends()) -> List[ProductOut]:
+async def query(
+    response: Response,
+    limit: int = Depends(page_limit),
+    after: Optional[str] = Query(None),
+    sort: str = Query(
+        DEFAULT_SORT,
+        pattern=f"^-?({'|'.join(SORT_FIELDS)})$",
+        description="Field to sort by, prefixed by - for a descending order",
+    ),
+    filter: ProductFilter = Depends(),
+    fields: Optional[FrozenSet[str]] = Depends(product_fields),
+    accept: Optional[str] = Header(None),
+    usecase: ProductUseCase = Depends(get_product_usecase),
+) -> List[ProductOut]:
     """
-    Retrieve a list of all products.
+    Retrieve a page of the products matching the filter, or stream all of
+    them as NDJSON.
+
+    Products are ordered by `sort`, then by ID. When there are more products,
+    the cursor of the next page is returned in the `X-Next-Cursor` header and
+    must be sent back as `after` with the same sort. Clients sending
+    `Accept: application/x-ndjson` receive every product after `after` as a
+    stream, one JSON per line.
 
     Args:
+        response (Response): The response used to set the pagination header.
+        limit (int): The maximum number of products in the page.
+        after (Optional[str]): The cursor of the page to retrieve.
+        sort (str): The field to sort by, prefixed by `-` for a descending order.
+        filter (ProductFilter): The filter the products must match.
+        fields (Optional[FrozenSet[str]]): The fields to return, all by default.
+        accept (Optional[str]): The Accept header of the request.
         usecase (ProductUseCase): The use case instance to handle the product query.
 
     Returns:
-        List[ProductOut]: A list of all products.
+        List[ProductOut]: A page of products.
+
+    Raises:
+        HTTPException: If the cursor is invalid.
     """
-    return await usecase.query()
+    try:
+        if accept and NDJSON_MEDIA_TYPE in accept:
+            if use_fast_json():
+                chunks = usecase.stream_json(
+                    after=after, fields=fields, filter=filter, sort=sort
+                )
+            else:
+                chunks = _ndjson(
+                    usecase.stream(after=after, fields=fields, filter=filter, sort=sort)
+                )
+            return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE)
+
+        if use_fast_json():
+            content, next_cursor = await usecase.query_json(
+                limit=limit, after=after, fields=fields, filter=filter, sort=sort
+            )
+            response = Response(content, media_type="application/json")
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+            return response
+
+        products, next_cursor = await usecase.query(
+            limit=limit, after=after, fields=fields, filter=filter, sort=sort
+        )
+    except InvalidCursorException as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
+
+    if fields:
+        # sparse products don't match the ProductOut response model
+        response = Response(
+            "[" + ",".join(product.model_dump_json() for product in products) + "]",
+            media_type="application/json",
+        )
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return response if fields else products
+
+
+async def _ndjson(products):
+    async for product in products:
+        yield product.model_dump_json() + "\n"
 
 
 @router.patch(path="/{id}", status_code=status.HTTP_200_OK)
 async def patch(
+    response: Response,
     id: UUID4 = Path(alias="id"),
     body: ProductUpdate = Body(...),
-    usecase: ProductUseCase = Depends(),
+    if_match: Optional[str] = Header(None),
+    usecase: ProductUseCase = Depends(get_product_usecase),
 ) -> ProductUpdateOut:
     """
     Update an existing product by its ID.
 
+    When the `If-Match` header is sent, the product is only updated if its
+    version still matches the ETag.
+
     Args:
+        response (Response): The response used to set the ETag header.
         id (UUID4): The unique identifier of the product.
         body (ProductUpdate): The updated product data.
+        if_match (Optional[str]): The ETag the product must match.
         usecase (ProductUseCase): The use case instance to handle the product update.
 
     Returns:
         ProductUpdateOut: The updated product.
+
+    Raises:
+        HTTPException: If the product is not found or doesn't match the ETag.
     """
-    return await usecase.update(id=id, body=body)
+    try:
+        product = await usecase.update(
+            id=id, body=body, version=parse_if_match(if_match)
+        )
+    except NotFoundException as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=exc.message)
+    except PreconditionFailedException as exc:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail=exc.message
+        )
+
+    response.headers["ETag"] = make_etag(product.version)
+    return product
 
 
 @router.delete(path="/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete(
-    id: UUID4 = Path(alias="id"), usecase: ProductUseCase = Depends()
+    id: UUID4 = Path(alias="id"),
+    if_match: Optional[str] = Header(None),
+    usecase: ProductUseCase = Depends(get_product_usecase),
 ) -> None:
     """
     Delete a product by its ID.
 
+    When the `If-Match` header is sent, the product is only deleted if its
+    version still matches the ETag.
+
     Args:
         id (UUID4): The unique identifier of the product.
+        if_match (Optional[str]): The ETag the product must match.
         usecase (ProductUseCase): The use case instance to handle the product deletion.
 
+    Raises:
+        HTTPException: If the product is not found or doesn't match the ETag.
+    """
+    try:
+        await usecase.delete(id=id, version=parse_if_match(if_match))
+    except NotFoundException as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=exc.message)
+    except PreconditionFailedException as exc:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail=exc.message
+        )
+
+
+@router.post(path="/{id}/reserve", status_code=status.HTTP_200_OK)
+async def reserve(
+    id: UUID4 = Path(alias="id"),
+    body: StockIn = Body(...),
+    usecase: ProductUseCase = Depends(get_product_usecase),
+) -> ProductOut:
+    """
+    Reserve a quantity of a product, if its stock holds enough.
+
+    Args:
+        id (UUID4): The unique identifier of the product.
+        body (StockIn): The quantity to reserve.
+        usecase (ProductUseCase): The use case instance to handle the reservation.
+
+    Returns:
+        ProductOut: The product after the reservation.
+
+    Raises:
+        HTTPException: If the product is not found or its stock is too low.
+    """
+    try:
+        return await usecase.reserve(id=id, quantity=body.quantity)
+    except NotFoundException as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=exc.message)
+    except InsufficientStockException as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=exc.message)
+
+
+@router.post(path="/{id}/release", status_code=status.HTTP_200_OK)
+async def release(
+    id: UUID4 = Path(alias="id"),
+    body: StockIn = Body(...),
+    usecase: ProductUseCase = Depends(get_product_usecase),
+) -> ProductOut:
+    """
+    Release a reserved quantity of a product back to its stock.
+
+    Args:
+        id (UUID4): The unique identifier of the product.
+        body (StockIn): The quantity to release.
+        usecase (ProductUseCase): The use case instance to handle the release.
+
+    Returns:
+        ProductOut: The product after the release.
+
     Raises:
         HTTPException: If the product is not found.
     """
     try:
-        await usecase.delete(id=id)
+        return await usecase.release(id=id, quantity=body.quantity)
     except NotFoundException as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=exc.message)
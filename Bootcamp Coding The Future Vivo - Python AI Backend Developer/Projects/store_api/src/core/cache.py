@@ -0,0 +1,113 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+    alias: Optional[Hashable]
+
+
+class LRUCache:
+    """
+    In-process LRU cache bounded by the total size of its values, whose entries
+    expire after a fixed time to live.
+
+    Entries may be registered under an alias, a second key used when the
+    invalidation source doesn't know the main one (e.g. the `_id` of a
+    document cached by its `id`).
+    """
+
+    def __init__(self, max_bytes: int, ttl: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._aliases: Dict[Hashable, Hashable] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Returns the value cached under the key, or None if it is missing or expired.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        size: int,
+        alias: Optional[Hashable] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Caches a value, evicting the least recently used entries to make room.
+
+        Args:
+            key (Hashable): The key of the value.
+            value (Any): The value to cache.
+            size (int): The size of the value, in bytes.
+            alias (Optional[Hashable]): A second key that invalidates the entry.
+            generation (Optional[int]): The `generation` read before loading the
+                value. The value is discarded if an invalidation happened since,
+                as it may be stale.
+        """
+        if size > self.max_bytes:
+            return
+        if generation is not None and generation != self.generation:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        while self.size + size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+        self._entries[key] = _Entry(value, size, time.monotonic() + self.ttl, alias)
+        self.size += size
+        if alias is not None:
+            self._aliases[alias] = key
+
+    def invalidate(self, key: Hashable) -> None:
+        self.generation += 1
+        if key in self._entries:
+            self._remove(key)
+
+    def invalidate_alias(self, alias: Hashable) -> None:
+        self.generation += 1
+        key = self._aliases.get(alias)
+        if key is not None:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self._aliases.clear()
+        self.size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+        if entry.alias is not None:
+            self._aliases.pop(entry.alias, None)
@@ -0,0 +1,47 @@
+import struct
+from decimal import Decimal
+
+from bson import Decimal128
+from bson.binary import UuidRepresentation
+from bson.codec_options import CodecOptions, TypeCodec, TypeRegistry
+
+_unpack_bid = struct.Struct("<QQ").unpack
+
+
+def decimal128_to_decimal(value: Decimal128) -> Decimal:
+    """
+    Converts a Decimal128 like `value.to_decimal()`, several times faster, by
+    reading the coefficient and the exponent straight from its bytes.
+    """
+    low, high = _unpack_bid(value.bid)
+    if high & 0x6000000000000000 == 0x6000000000000000:
+        # NaN, infinities and the rare large coefficient encoding
+        return value.to_decimal()
+
+    exponent = ((high & 0x7FFE000000000000) >> 49) - 6176
+    coefficient = ((high & 0x0001FFFFFFFFFFFF) << 64) | low
+    sign = "-" if high >> 63 else ""
+    return Decimal(f"{sign}{coefficient}E{exponent}")
+
+
+class DecimalCodec(TypeCodec):
+    """
+    Stores `Decimal` values as BSON Decimal128 and reads them back as
+    `Decimal`, so models and queries use `Decimal` only.
+    """
+
+    python_type = Decimal
+    bson_type = Decimal128
+
+    def transform_python(self, value: Decimal) -> Decimal128:
+        return Decimal128(value)
+
+    def transform_bson(self, value: Decimal128) -> Decimal:
+        return decimal128_to_decimal(value)
+
+
+# the codec options of the collections holding Decimal fields
+CODEC_OPTIONS = CodecOptions(
+    type_registry=TypeRegistry([DecimalCodec()]),
+    uuid_representation=UuidRepresentation.STANDARD,
+)
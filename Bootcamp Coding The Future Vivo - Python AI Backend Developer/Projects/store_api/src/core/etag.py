@@ -0,0 +1,48 @@
+from typing import Optional
+
+from src.core.exceptions import PreconditionFailedException
+
+
+def make_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def etag_matches(header: Optional[str], version: int) -> bool:
+    """
+    Checks whether an `If-None-Match` header matches the given version, using
+    the weak comparison of RFC 9110.
+    """
+    if not header:
+        return False
+
+    etag = make_etag(version)
+    return any(
+        candidate.strip().removeprefix("W/") in ("*", etag)
+        for candidate in header.split(",")
+    )
+
+
+def parse_if_match(header: Optional[str]) -> Optional[int]:
+    """
+    Parses the version expected by an `If-Match` header.
+
+    Args:
+        header (Optional[str]): The header sent by the client.
+
+    Returns:
+        Optional[int]: The expected version, or None when any version matches.
+
+    Raises:
+        PreconditionFailedException: If the header doesn't hold a single strong
+            ETag issued by this API.
+    """
+    if not header or header.strip() == "*":
+        return None
+
+    etag = header.strip()
+    try:
+        if not (etag.startswith('"') and etag.endswith('"')):
+            raise ValueError(etag)
+        return int(etag[1:-1])
+    except ValueError:
+        raise PreconditionFailedException(message=f"Invalid If-Match: {header}")
@@ -7,3 +7,23 @@ class BaseException(Exception):
 
 class NotFoundException(BaseException):
     message = "Not Found"
+
+
+class InvalidCursorException(BaseException):
+    message = "Invalid Cursor"
+
+
+class InvalidFieldsException(BaseException):
+    message = "Invalid Fields"
+
+
+class PreconditionFailedException(BaseException):
+    message = "Precondition Failed"
+
+
+class InsufficientStockException(BaseException):
+    message = "Insufficient Stock"
+
+
+class InvalidImportException(BaseException):
+    message = "Invalid Import"
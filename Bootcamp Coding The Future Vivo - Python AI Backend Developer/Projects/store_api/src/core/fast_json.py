@@ -0,0 +1,49 @@
+from decimal import Decimal
+from typing import Any, List
+
+import bson
+from bson import CodecOptions, Decimal128
+from bson.binary import UuidRepresentation
+from src.core.codecs import decimal128_to_decimal
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+CODEC_OPTIONS = CodecOptions(uuid_representation=UuidRepresentation.STANDARD)
+
+
+def is_available() -> bool:
+    return orjson is not None
+
+
+def decimal128_to_str(value: Decimal128) -> str:
+    """
+    Formats a Decimal128 like `str(value.to_decimal())`, the representation of
+    the Decimals serialized by Pydantic, several times faster.
+    """
+    return str(decimal128_to_decimal(value))
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, Decimal128):
+        return decimal128_to_str(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Serializes decoded BSON values to JSON in a single pass. UUIDs and dates
+    are handled by orjson, Decimal128 and Decimal values are written as strings.
+    """
+    return orjson.dumps(value, default=_default)
+
+
+def decode_batch(batch: bytes) -> List[dict]:
+    """
+    Decodes a raw batch of BSON documents, as returned by `find_raw_batches`.
+    """
+    return bson.decode_all(batch, CODEC_OPTIONS)
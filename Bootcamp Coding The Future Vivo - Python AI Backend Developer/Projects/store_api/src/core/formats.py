@@ -0,0 +1,150 @@
+import csv
+import io
+import json
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+from pydantic import BaseModel
+from src.core.exceptions import InvalidImportException
+
+# longest line (or quoted CSV record) kept in memory while parsing an upload
+MAX_LINE_BYTES = 1024 * 1024
+
+
+@dataclass
+class InvalidRow:
+    """
+    A row of an upload that couldn't be parsed, reported in its place.
+    """
+
+    detail: str
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Splits a byte stream into lines, holding at most one partial line.
+
+    Raises:
+        InvalidImportException: If a line is longer than MAX_LINE_BYTES.
+    """
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+        if len(pending) > MAX_LINE_BYTES:
+            raise InvalidImportException(
+                message=f"Lines are limited to {MAX_LINE_BYTES} bytes"
+            )
+    if pending:
+        yield pending
+
+
+async def ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Parses an NDJSON upload one line at a time, skipping the blank lines.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The body of the upload.
+
+    Returns:
+        AsyncIterator[Any]: The value of each line, or an `InvalidRow` for the
+        lines that aren't valid JSON.
+    """
+    async for line in _lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            yield InvalidRow(detail=f"Invalid JSON: {exc}")
+
+
+async def csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Parses a CSV upload one record at a time. The first record holds the
+    column names and the empty values are left out of the rows.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The body of the upload.
+
+    Returns:
+        AsyncIterator[Any]: The columns of each record, or an `InvalidRow` for
+        the records that don't match the header.
+
+    Raises:
+        InvalidImportException: If the upload isn't UTF-8 or a record is longer
+            than MAX_LINE_BYTES.
+    """
+    header: List[str] = []
+    record = ""
+    async for line in _lines(chunks):
+        try:
+            record += line.decode("utf-8-sig" if not header and not record else "utf-8")
+        except UnicodeDecodeError:
+            raise InvalidImportException(message="CSV uploads must be encoded in UTF-8")
+        # a quoted value holding a line break continues on the next line
+        if record.count('"') % 2:
+            record += "\n"
+            if len(record) > MAX_LINE_BYTES:
+                raise InvalidImportException(
+                    message=f"Records are limited to {MAX_LINE_BYTES} bytes"
+                )
+            continue
+        if not record.strip():
+            record = ""
+            continue
+
+        values = next(csv.reader([record]))
+        record = ""
+        if not header:
+            header = [name.strip() for name in values]
+        elif len(values) != len(header):
+            yield InvalidRow(
+                detail=f"Expected {len(header)} columns, found {len(values)}"
+            )
+        else:
+            yield {name: value for name, value in zip(header, values) if value != ""}
+
+    if record.strip():
+        yield InvalidRow(detail="Unterminated quoted value")
+
+
+async def csv_chunks(
+    products: AsyncIterator[BaseModel], columns: Sequence[str], batch_size: int
+) -> AsyncIterator[str]:
+    """
+    Encodes products as CSV, a header line first, in chunks of `batch_size`
+    records.
+
+    Args:
+        products (AsyncIterator[BaseModel]): The products to encode.
+        columns (Sequence[str]): The fields to write, in order.
+        batch_size (int): The number of records per chunk.
+
+    Returns:
+        AsyncIterator[str]: The CSV chunks.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    rows = 0
+
+    async for product in products:
+        item: Dict[str, Any] = product.model_dump(mode="json", include=set(columns))
+        writer.writerow([_csv_value(item.get(column)) for column in columns])
+        rows += 1
+        if rows % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def _csv_value(value: Any) -> Any:
+    # booleans are written the way JSON and the import spell them
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "" if value is None else value
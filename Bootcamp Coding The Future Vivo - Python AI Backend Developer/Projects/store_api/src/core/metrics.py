@@ -0,0 +1,112 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], **extra: str) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return (
+        "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+    )
+
+
+class Counter:
+    """
+    Prometheus counter, one value per combination of label values.
+    """
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """
+    Prometheus histogram with cumulative buckets, one per combination of label
+    values.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # bucket counts (the last one is +Inf), sum
+        self.values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *labels: str, value: float) -> None:
+        with self._lock:
+            counts, total = self.values.setdefault(
+                labels, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = bound if isinstance(bound, str) else f"{bound:g}"
+                bucket = _labels(self.labels, labels, le=le)
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {total[0]:g}")
+            lines.append(
+                f"{self.name}_count{_labels(self.labels, labels)} {cumulative}"
+            )
+        return lines
+
+
+def render_samples(
+    name: str,
+    help: str,
+    samples: Dict[Tuple[str, ...], float],
+    labels: Sequence[str] = (),
+    kind: str = "gauge",
+) -> List[str]:
+    """
+    Renders values kept outside of this module, read at scrape time.
+
+    Args:
+        name (str): The metric name.
+        help (str): The metric description.
+        samples (Dict[Tuple[str, ...], float]): The values by label values.
+        labels (Sequence[str]): The label names.
+        kind (str): The metric type, `gauge` or `counter`.
+
+    Returns:
+        List[str]: The lines of the metric in the Prometheus text format.
+    """
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for values, value in samples.items():
+        lines.append(f"{name}{_labels(labels, values)} {value:g}")
+    return lines
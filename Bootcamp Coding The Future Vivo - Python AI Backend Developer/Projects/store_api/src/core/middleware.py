@@ -0,0 +1,125 @@
+import functools
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, List, Optional
+
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics import Histogram
+from src.core.timing import RequestTimings, current_timings
+
+request_duration = Histogram(
+    "store_http_request_duration_seconds",
+    "Duration of the HTTP requests until the response headers are sent.",
+    labels=("method", "route", "status"),
+)
+
+
+class ServerTimingMiddleware:
+    """
+    Times each HTTP request, sending its timings in a `Server-Timing` header.
+
+    The timings are shared with the MongoDB command listener and the timed
+    blocks of the request through `current_timings`. The spans of a streamed
+    response only cover the work done before its headers were sent.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(f"{scope['method']} {scope['path']}")
+        token = current_timings.set(timings)
+
+        async def send_with_timings(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode()))
+                message = {**message, "headers": headers}
+
+                request_duration.observe(
+                    scope["method"],
+                    _route_template(scope),
+                    str(message["status"]),
+                    value=timings.elapsed(),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            current_timings.reset(token)
+
+
+def _route_template(scope: Scope) -> str:
+    # the path template of the matched route, keeping one series per route
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+# start and end of the endpoint call of the request being handled
+_endpoint_bounds: ContextVar[Optional[List[float]]] = ContextVar(
+    "endpoint_bounds", default=None
+)
+
+
+class TimedRoute(APIRoute):
+    """
+    Route timing its endpoint apart from the work FastAPI does around it: the
+    request parsing and dependency resolution before the call are reported as
+    the `parse` span, the response validation and rendering after it as the
+    `serialize` span.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            timings = current_timings.get()
+            if timings is None:
+                return await handler(request)
+
+            bounds: List[float] = []
+            token = _endpoint_bounds.set(bounds)
+            start = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                end = time.perf_counter()
+                _endpoint_bounds.reset(token)
+                if len(bounds) == 2:
+                    timings.add("parse", bounds[0] - start)
+                    timings.add("endpoint", bounds[1] - bounds[0])
+                    timings.add("serialize", end - bounds[1])
+                else:
+                    # the request was rejected before the endpoint was called
+                    timings.add("parse", end - start)
+
+        return timed_handler
+
+
+def _timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    # FastAPI reads the parameters of the endpoint through __wrapped__
+    @functools.wraps(endpoint)
+    async def timed_endpoint(*args: Any, **kwargs: Any) -> Any:
+        bounds = _endpoint_bounds.get()
+        if bounds is None:
+            return await endpoint(*args, **kwargs)
+
+        bounds.append(time.perf_counter())
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            bounds.append(time.perf_counter())
+
+    return timed_endpoint
@@ -0,0 +1,64 @@
+import base64
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from bson import Decimal128, json_util
+from bson.binary import UuidRepresentation
+from bson.json_util import JSONOptions, JSONMode
+
+from src.core.exceptions import InvalidCursorException
+
+# canonical extended JSON keeps the BSON type of the sort value (dates,
+# Decimal128, UUIDs), so it is compared exactly as stored. Decimals are
+# written as the Decimal128 they are stored as.
+_JSON_OPTIONS = JSONOptions(
+    json_mode=JSONMode.CANONICAL, uuid_representation=UuidRepresentation.STANDARD
+)
+
+
+def encode_cursor(sort: str, value: Any, id: UUID) -> str:
+    """
+    Encodes the keyset position of a document into an opaque cursor token.
+
+    Args:
+        sort (str): The sort the cursor belongs to.
+        value (Any): The sort field value of the last returned document.
+        id (UUID): The ID of the last returned document.
+
+    Returns:
+        str: An URL-safe token to be sent back as the `after` parameter.
+    """
+    if isinstance(value, Decimal):
+        value = Decimal128(value)
+    payload = json_util.dumps(
+        {"s": sort, "v": value, "i": id}, json_options=_JSON_OPTIONS
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort: str) -> tuple[Any, UUID]:
+    """
+    Decodes a cursor token produced by `encode_cursor`.
+
+    Args:
+        token (str): The opaque cursor token.
+        sort (str): The sort of the current request.
+
+    Returns:
+        tuple[Any, UUID]: The keyset position encoded in the token.
+
+    Raises:
+        InvalidCursorException: If the token is malformed or was issued for
+            another sort.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json_util.loads(
+            base64.urlsafe_b64decode(padded.encode()), json_options=_JSON_OPTIONS
+        )
+        if payload["s"] != sort:
+            raise ValueError(sort)
+        return payload["v"], payload["i"]
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursorException(message=f"Invalid cursor: {token}")
@@ -1,3 +1,5 @@
+from functools import lru_cache
+from typing import Any, Literal, Optional, cast
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,7 +8,79 @@ class Settings(BaseSettings):
     ROOT_PATH: str = "/"
     DATABASE_URL: str
 
+    # options given to the MongoDB client, overriding the ones of DATABASE_URL
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    # comma separated, in order of preference: zstd (requires zstandard),
+    # snappy (requires python-snappy) and zlib
+    MONGO_COMPRESSORS: str = ""
+    MONGO_READ_PREFERENCE: str = "primary"
+    MONGO_WRITE_CONCERN: Optional[str] = None
+    MONGO_JOURNAL: Optional[bool] = None
+
+    # log the MongoDB commands taking at least this long, 0 disables the log
+    SLOW_COMMAND_MS: float = 100
+
+    PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 500
+    STREAM_BATCH_SIZE: int = 500
+    MAX_BULK_SIZE: int = 1000
+
+    # products written per insert_many by the catalog import, and failed rows
+    # listed in its report
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_ERRORS: int = 1000
+
+    # merge the stock reservations of a product received within this window
+    # into a single update, 0 applies each reservation on its own
+    STOCK_COALESCE_WINDOW_MS: float = 0
+
+    # serialize read responses straight from BSON with orjson, skipping the
+    # ProductOut validation of documents read from our own database
+    FAST_JSON_RESPONSES: bool = False
+
+    PRODUCT_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    PRODUCT_CACHE_TTL: float = 30.0
+    PRODUCT_CACHE_WATCH: bool = True
+
+    # /products/events: frames queued per client before it is disconnected,
+    # events kept for the clients reconnecting with a Last-Event-ID, and
+    # seconds between keep-alive comments
+    PRODUCT_EVENTS: bool = True
+    PRODUCT_EVENTS_QUEUE_SIZE: int = 1000
+    PRODUCT_EVENTS_BUFFER_SIZE: int = 10000
+    PRODUCT_EVENTS_HEARTBEAT: float = 15.0
+    # send the product ID of deletes, requires MongoDB 6.0 and
+    # changeStreamPreAndPostImages enabled on the products collection
+    PRODUCT_EVENTS_PRE_IMAGES: bool = False
+
+    # "create" builds missing indexes at startup, "check" only reports the
+    # drift (use `make indexes` on large collections) and "off" skips both.
+    INDEXES_ON_STARTUP: Literal["create", "check", "off"] = "create"
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Reads the settings from the environment and the .env file, once.
+    """
+    return Settings()
+
+
+class LazySettings:
+    """
+    Stand-in for the settings read on the first attribute access, so that
+    importing the application doesn't read the environment.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(get_settings(), name, value)
+
+
+settings = cast(Settings, LazySettings())
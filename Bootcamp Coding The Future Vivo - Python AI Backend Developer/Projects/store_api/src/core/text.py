@@ -0,0 +1,9 @@
+import unicodedata
+
+
+def normalize_text(value: str) -> str:
+    """
+    Lowercases a text and strips its accents, so "Café" and "cafe" match.
+    """
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
@@ -0,0 +1,78 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+
+class RequestTimings:
+    """
+    Time spent by the current request, grouped by span name.
+
+    The MongoDB commands are counted on their own since they are reported by
+    the driver from its executor threads rather than measured around a block,
+    which is also why the spans are updated under a lock.
+    """
+
+    def __init__(self, path: str = "") -> None:
+        self.path = path
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.commands = 0
+        self.documents = 0
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def add_command(self, seconds: float, documents: int) -> None:
+        with self._lock:
+            self.spans["db"] = self.spans.get("db", 0.0) + seconds
+            self.commands += 1
+            self.documents += documents
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """
+        Renders the spans as a `Server-Timing` header value, in milliseconds.
+
+        Returns:
+            str: The header value, the total time of the request coming last.
+        """
+        metrics = []
+        with self._lock:
+            spans = list(self.spans.items())
+        for name, seconds in spans:
+            metric = f"{name};dur={seconds * 1000:.2f}"
+            if name == "db":
+                metric += f';desc="{self.commands} commands, {self.documents} docs"'
+            metrics.append(metric)
+        metrics.append(f"total;dur={self.elapsed() * 1000:.2f}")
+
+        return ", ".join(metrics)
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "current_timings", default=None
+)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """
+    Adds the time spent in the block to the given span of the current request,
+    doing nothing outside of a request.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from typing import Any, List, Mapping, Optional, Protocol
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import OperationFailure, PyMongoError
+
+from src.core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Raised by servers that don't support change streams (standalone mongod) and
+# when the resume token fell out of the oplog.
+_UNSUPPORTED_CODES = {40573}
+_HISTORY_LOST_CODES = {260, 280, 286}
+
+
+class ChangeListener(Protocol):
+    def on_change(self, change: Mapping[str, Any]) -> None:
+        """
+        Handles a change event. Called from the feed task, must not block.
+        """
+
+    def reset(self, lost: bool) -> None:
+        """
+        Called after the stream failed. `lost` tells whether the feed couldn't
+        resume where it stopped, so changes were missed.
+        """
+
+    def close(self) -> None:
+        """
+        Called when change streams are not available, no change will follow.
+        """
+
+
+class ChangeFeed:
+    """
+    Watches a collection through a single change stream and hands every change
+    to its listeners, so one database cursor serves the whole worker.
+
+    The stream resumes after failures from the last token it saw. When change
+    streams are not available the feed stops and the listeners are closed.
+    """
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        listeners: List[ChangeListener],
+        full_document: Optional[str] = None,
+        full_document_before_change: Optional[str] = None,
+        retry_delay: float = 1.0,
+    ) -> None:
+        self.collection = collection
+        self.listeners = listeners
+        self.full_document = full_document
+        self.full_document_before_change = full_document_before_change
+        self.retry_delay = retry_delay
+        self.resume_token: Optional[Mapping[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None and self.listeners:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        pipeline = [
+            {
+                "$match": {
+                    "operationType": {"$in": ["insert", "update", "replace", "delete"]}
+                }
+            }
+        ]
+
+        while True:
+            lost = False
+            try:
+                async with self.collection.watch(
+                    pipeline,
+                    resume_after=self.resume_token,
+                    full_document=self.full_document,
+                    full_document_before_change=self.full_document_before_change,
+                ) as stream:
+                    async for change in stream:
+                        self.resume_token = stream.resume_token
+                        for listener in self.listeners:
+                            listener.on_change(change)
+            except OperationFailure as exc:
+                if exc.code in _UNSUPPORTED_CODES:
+                    logger.warning(
+                        "Change streams unavailable on %s, not watching changes",
+                        self.collection.name,
+                    )
+                    for listener in self.listeners:
+                        listener.close()
+                    return
+                if exc.code in _HISTORY_LOST_CODES:
+                    self.resume_token = None
+                    lost = True
+                logger.warning(
+                    "Change stream on %s failed: %s", self.collection.name, exc
+                )
+            except PyMongoError as exc:
+                logger.warning(
+                    "Change stream on %s failed: %s", self.collection.name, exc
+                )
+
+            for listener in self.listeners:
+                listener.reset(lost)
+            await asyncio.sleep(self.retry_delay)
+
+
+class CacheInvalidator:
+    """
+    Invalidates the cache entries of the documents changed by any worker.
+
+    The cache entries must be registered with the document `_id` as alias.
+    Without change streams the cache relies on its time to live only.
+    """
+
+    def __init__(self, cache: LRUCache) -> None:
+        self.cache = cache
+
+    def on_change(self, change: Mapping[str, Any]) -> None:
+        if change["operationType"] != "insert":
+            self.cache.invalidate_alias(change["documentKey"]["_id"])
+
+    def reset(self, lost: bool) -> None:
+        # changes may have been missed while the stream was down
+        self.cache.clear()
+
+    def close(self) -> None:
+        self.cache.clear()
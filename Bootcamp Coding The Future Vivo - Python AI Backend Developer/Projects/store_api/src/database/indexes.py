@@ -0,0 +1,191 @@
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping
+
+import pymongo
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import IndexModel
+
+logger = logging.getLogger(__name__)
+
+# Indexes each collection must have. Every query pattern added to a use case
+# should be backed by one of the entries below.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "products": [
+        IndexModel([("id", pymongo.ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("status", pymongo.ASCENDING), ("price", pymongo.ASCENDING)],
+            name="status_price",
+        ),
+        IndexModel(
+            [("created_at", pymongo.ASCENDING), ("id", pymongo.ASCENDING)],
+            name="created_at_id",
+        ),
+        IndexModel(
+            [("price", pymongo.ASCENDING), ("id", pymongo.ASCENDING)], name="price_id"
+        ),
+        IndexModel(
+            [("name", pymongo.ASCENDING), ("id", pymongo.ASCENDING)], name="name_id"
+        ),
+        IndexModel(
+            [("quantity", pymongo.ASCENDING), ("id", pymongo.ASCENDING)],
+            name="quantity_id",
+        ),
+        IndexModel([("name", pymongo.TEXT)], name="name_text"),
+        IndexModel(
+            [("name_normalized", pymongo.ASCENDING), ("id", pymongo.ASCENDING)],
+            name="name_normalized_id",
+        ),
+    ],
+}
+
+# Options compared between the declared and the existing indexes.
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "weights")
+
+
+@dataclass
+class IndexDrift:
+    """
+    Differences between the declared and the existing indexes of a collection.
+    """
+
+    collection: str
+    missing: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    extra: List[str] = field(default_factory=list)
+    created: List[str] = field(default_factory=list)
+
+    @property
+    def has_drift(self) -> bool:
+        return bool(self.missing or self.changed or self.extra)
+
+
+def _spec(index: Mapping[str, Any]) -> dict:
+    key = index["key"]
+    spec = {
+        "key": list(key.items()) if isinstance(key, Mapping) else list(key),
+        **{option: index[option] for option in _COMPARED_OPTIONS if option in index},
+    }
+    text_fields = [field for field, kind in spec["key"] if kind == pymongo.TEXT]
+    if text_fields and text_fields != ["_fts"]:
+        # mongod reports the text fields of a text index as `_fts`/`_ftsx`
+        # and their weights, the declared index is put in the same form
+        position = [kind for _, kind in spec["key"]].index(pymongo.TEXT)
+        others = [item for item in spec["key"] if item[1] != pymongo.TEXT]
+        spec["key"] = (
+            others[:position]
+            + [("_fts", pymongo.TEXT), ("_ftsx", 1)]
+            + others[position:]
+        )
+        spec["weights"] = {
+            **{field: 1 for field in text_fields},
+            **spec.get("weights", {}),
+        }
+    return spec
+
+
+async def sync_collection_indexes(
+    collection: AsyncIOMotorCollection, indexes: List[IndexModel], create: bool = True
+) -> IndexDrift:
+    """
+    Compares the declared indexes of a collection with the existing ones and
+    creates the missing indexes.
+
+    Indexes with a different definition and undeclared indexes are only
+    reported, since rebuilding or dropping them must be a deliberate decision.
+
+    Args:
+        collection (AsyncIOMotorCollection): The collection to reconcile.
+        indexes (List[IndexModel]): The declared indexes of the collection.
+        create (bool): Whether missing indexes must be created or only reported.
+
+    Returns:
+        IndexDrift: The differences found and the indexes created.
+    """
+    drift = IndexDrift(collection=collection.name)
+    existing = {
+        name: _spec(info)
+        for name, info in (await collection.index_information()).items()
+        if name != "_id_"
+    }
+    existing_by_key = {tuple(spec["key"]): name for name, spec in existing.items()}
+
+    to_create = []
+    for index in indexes:
+        declared = _spec(index.document)
+        name = index.document["name"]
+        current_name = existing_by_key.get(tuple(declared["key"]), name)
+        current = existing.pop(current_name, None)
+
+        if current is None:
+            drift.missing.append(name)
+            to_create.append(index)
+        elif current != declared or current_name != name:
+            drift.changed.append(name)
+
+    drift.extra = sorted(existing)
+
+    if create and to_create:
+        drift.created = await collection.create_indexes(to_create)
+        drift.missing = []
+
+    return drift
+
+
+async def sync_indexes(
+    database: AsyncIOMotorDatabase, create: bool = True
+) -> List[IndexDrift]:
+    """
+    Reconciles the indexes of every collection declared in `INDEXES`.
+
+    Args:
+        database (AsyncIOMotorDatabase): The database holding the collections.
+        create (bool): Whether missing indexes must be created or only reported.
+
+    Returns:
+        List[IndexDrift]: The reconciliation result of each collection.
+    """
+    results = []
+    for name, indexes in INDEXES.items():
+        drift = await sync_collection_indexes(
+            database.get_collection(name), indexes, create=create
+        )
+        if drift.created:
+            logger.info("Created indexes on %s: %s", name, drift.created)
+        if drift.has_drift:
+            logger.warning(
+                "Index drift on %s: missing=%s changed=%s extra=%s",
+                name,
+                drift.missing,
+                drift.changed,
+                drift.extra,
+            )
+        results.append(drift)
+
+    return results
+
+
+async def main(check: bool) -> int:
+    from src.database.mongo import db_client
+
+    results = await sync_indexes(db_client.get().get_database(), create=not check)
+    for drift in results:
+        print(
+            f"{drift.collection}: created={drift.created} missing={drift.missing} "
+            f"changed={drift.changed} extra={drift.extra}"
+        )
+
+    return 1 if any(drift.has_drift for drift in results) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile MongoDB indexes.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only report the drift, without creating the missing indexes",
+    )
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(asyncio.run(main(check=parser.parse_args().check)))
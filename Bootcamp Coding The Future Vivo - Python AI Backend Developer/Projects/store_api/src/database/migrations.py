@@ -0,0 +1,64 @@
+import asyncio
+import logging
+
+import pymongo
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from src.core.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill_normalized_names(
+    collection: AsyncIOMotorCollection, batch_size: int = 1000
+) -> int:
+    """
+    Sets the `name_normalized` field of the products created before the prefix
+    search, so they can be found by it.
+
+    Args:
+        collection (AsyncIOMotorCollection): The products collection.
+        batch_size (int): The number of products updated by each bulk write.
+
+    Returns:
+        int: The number of updated products.
+    """
+    cursor = collection.find(
+        {"name_normalized": {"$exists": False}}, projection={"name": True}
+    ).batch_size(batch_size)
+
+    operations = []
+    updated = 0
+    async for product in cursor:
+        operations.append(
+            pymongo.UpdateOne(
+                {"_id": product["_id"]},
+                {"$set": {"name_normalized": normalize_text(product["name"])}},
+            )
+        )
+        if len(operations) == batch_size:
+            updated += (
+                await collection.bulk_write(operations, ordered=False)
+            ).modified_count
+            operations = []
+
+    if operations:
+        updated += (
+            await collection.bulk_write(operations, ordered=False)
+        ).modified_count
+
+    return updated
+
+
+async def main() -> None:
+    from src.database.mongo import db_client
+
+    collection = db_client.get().get_database().get_collection("products")
+    logger.info(
+        "Backfilled %s product names", await backfill_normalized_names(collection)
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
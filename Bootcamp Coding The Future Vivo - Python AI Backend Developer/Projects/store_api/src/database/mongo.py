@@ -1,13 +1,48 @@
+from typing import Any, Dict, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from src.core.settings import settings
+from src.database.monitoring import command_metrics, pool_metrics
 
 
 class MongoClient:
     def __init__(self) -> None:
-        self.client: AsyncIOMotorClient = AsyncIOMotorClient(settings.DATABASE_URL)
+        self.client: Optional[AsyncIOMotorClient] = None
 
-    def get(self) -> AsyncIOMotorClient:
+    def connect(self) -> AsyncIOMotorClient:
+        if self.client is None:
+            self.client = AsyncIOMotorClient(
+                settings.DATABASE_URL,
+                event_listeners=[pool_metrics, command_metrics],
+                **self._options(),
+            )
         return self.client
 
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+    def get(self) -> AsyncIOMotorClient:
+        return self.connect()
+
+    @staticmethod
+    def _options() -> Dict[str, Any]:
+        options: Dict[str, Any] = {
+            "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+            "readPreference": settings.MONGO_READ_PREFERENCE,
+        }
+        if settings.MONGO_WAIT_QUEUE_TIMEOUT_MS is not None:
+            options["waitQueueTimeoutMS"] = settings.MONGO_WAIT_QUEUE_TIMEOUT_MS
+        if settings.MONGO_COMPRESSORS:
+            options["compressors"] = settings.MONGO_COMPRESSORS
+        if settings.MONGO_WRITE_CONCERN is not None:
+            w = settings.MONGO_WRITE_CONCERN
+            options["w"] = int(w) if w.isdigit() else w
+        if settings.MONGO_JOURNAL is not None:
+            options["journal"] = settings.MONGO_JOURNAL
+
+        return options
+
 
 db_client = MongoClient()
@@ -0,0 +1,179 @@
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, Mapping
+
+from pymongo import monitoring
+from src.core.metrics import Counter, Histogram
+from src.core.settings import settings
+from src.core.timing import current_timings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    open_connections: int = 0
+    checked_out: int = 0
+    wait_queue: int = 0
+    checkouts: int = 0
+    checkout_failures: int = 0
+    checkout_seconds_total: float = 0.0
+    checkout_seconds_max: float = 0.0
+    pool_clears: int = 0
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener keeping the connection counts, the wait queue
+    depth and the checkout latency of each server the client talks to.
+
+    The driver publishes the pool events from the threads of Motor's executor
+    and from its background monitors, so the counters are updated under a
+    lock.
+    """
+
+    def __init__(self) -> None:
+        self.pools: Dict[str, PoolStats] = defaultdict(PoolStats)
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {address: asdict(stats) for address, stats in self.pools.items()}
+
+    @contextmanager
+    def _stats(self, event) -> Iterator[PoolStats]:
+        host, port = event.address
+        with self._lock:
+            yield self.pools[f"{host}:{port}"]
+
+    def pool_created(self, event) -> None:
+        with self._stats(event):
+            pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        with self._stats(event) as stats:
+            stats.pool_clears += 1
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        with self._stats(event) as stats:
+            stats.open_connections += 1
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        with self._stats(event) as stats:
+            stats.open_connections -= 1
+
+    def connection_check_out_started(self, event) -> None:
+        with self._stats(event) as stats:
+            stats.wait_queue += 1
+
+    def connection_check_out_failed(self, event) -> None:
+        with self._stats(event) as stats:
+            stats.wait_queue -= 1
+            stats.checkout_failures += 1
+
+    def connection_checked_out(self, event) -> None:
+        # the checkout duration is reported since pymongo 4.7
+        duration = getattr(event, "duration", None)
+        with self._stats(event) as stats:
+            stats.wait_queue -= 1
+            stats.checked_out += 1
+            stats.checkouts += 1
+            if duration is not None:
+                stats.checkout_seconds_total += duration
+                stats.checkout_seconds_max = max(stats.checkout_seconds_max, duration)
+
+    def connection_checked_in(self, event) -> None:
+        with self._stats(event) as stats:
+            stats.checked_out -= 1
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Command listener timing every command sent to MongoDB.
+
+    The duration and the number of documents returned are added to the
+    timings of the request the command was sent for, to the Prometheus
+    command metrics, and the commands slower than `SLOW_COMMAND_MS` are
+    logged.
+    """
+
+    def __init__(self) -> None:
+        self.duration = Histogram(
+            "store_mongo_command_duration_seconds",
+            "Duration of the MongoDB commands.",
+            labels=("command",),
+        )
+        self.documents = Counter(
+            "store_mongo_command_documents_total",
+            "Documents returned or affected by the MongoDB commands.",
+            labels=("command",),
+        )
+        self.failures = Counter(
+            "store_mongo_command_failures_total",
+            "MongoDB commands that failed.",
+            labels=("command",),
+        )
+        # the collection of each command in flight, for the slow command log
+        self._targets: Dict[int, str] = {}
+
+    def started(self, event) -> None:
+        target = event.command.get(event.command_name)
+        if isinstance(target, str):
+            self._targets[event.request_id] = f"{event.database_name}.{target}"
+
+    def succeeded(self, event) -> None:
+        documents = _documents(event.reply)
+        self._record(event, documents)
+        self.documents.inc(event.command_name, amount=documents)
+
+    def failed(self, event) -> None:
+        self._record(event, 0)
+        self.failures.inc(event.command_name)
+
+    def _record(self, event, documents: int) -> None:
+        seconds = event.duration_micros / 1_000_000
+        target = self._targets.pop(event.request_id, event.database_name)
+        self.duration.observe(event.command_name, value=seconds)
+
+        timings = current_timings.get()
+        if timings is not None:
+            timings.add_command(seconds, documents)
+
+        if settings.SLOW_COMMAND_MS and seconds * 1000 >= settings.SLOW_COMMAND_MS:
+            logger.warning(
+                "Slow MongoDB command %s on %s took %.1f ms, %d documents (%s)",
+                event.command_name,
+                target,
+                seconds * 1000,
+                documents,
+                timings.path if timings is not None else "no request",
+            )
+
+
+def _documents(reply: Mapping[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, Mapping):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch", ()))
+        return len(batch)
+    # writes report the matched or inserted documents, findAndModify its value
+    if "n" in reply:
+        return int(reply["n"])
+    if "value" in reply:
+        return int(reply["value"] is not None)
+    return 0
+
+
+pool_metrics = PoolMetrics()
+command_metrics = CommandMetrics()
@@ -0,0 +1,19 @@
+from fastapi import Request
+
+from src.usecases.product import ProductUseCase
+
+
+def get_product_usecase(request: Request) -> ProductUseCase:
+    """
+    Provides the product use case shared by the requests of the application.
+
+    The use case is created by the application lifespan, or on the first
+    request when the application runs without one (e.g. under a test client).
+
+    Returns:
+        ProductUseCase: The shared product use case.
+    """
+    usecase = getattr(request.app.state, "product_usecase", None)
+    if usecase is None:
+        usecase = request.app.state.product_usecase = ProductUseCase()
+    return usecase
@@ -1,7 +1,53 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List
 from fastapi import FastAPI
 
+from src.core.middleware import ServerTimingMiddleware
 from src.core.settings import settings
+from src.database.change_stream import CacheInvalidator, ChangeFeed, ChangeListener
+from src.database.indexes import sync_indexes
+from src.database.mongo import db_client
 from src.routers import api_router
+from src.usecases.product import ProductUseCase
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    db_client.connect()
+
+    if settings.INDEXES_ON_STARTUP != "off":
+        await sync_indexes(
+            db_client.get().get_database(),
+            create=settings.INDEXES_ON_STARTUP == "create",
+        )
+
+    usecase = app.state.product_usecase = ProductUseCase()
+
+    # a single change stream serves the cache and the event subscribers
+    listeners: List[ChangeListener] = []
+    if settings.PRODUCT_CACHE_WATCH:
+        listeners.append(CacheInvalidator(usecase.cache))
+    if settings.PRODUCT_EVENTS:
+        listeners.append(usecase.events)
+        usecase.events.available = True
+    feed = ChangeFeed(
+        usecase.collection,
+        listeners,
+        full_document="updateLookup" if settings.PRODUCT_EVENTS else None,
+        full_document_before_change=(
+            "whenAvailable" if settings.PRODUCT_EVENTS_PRE_IMAGES else None
+        ),
+    )
+    feed.start()
+
+    yield
+
+    await feed.stop()
+    usecase.events.close()
+    if usecase.coalescer is not None:
+        await usecase.coalescer.close()
+    del app.state.product_usecase
+    db_client.close()
 
 
 class App(FastAPI):
@@ -11,9 +57,28 @@ class App(FastAPI):
             **kwargs,
             version="0.0.1",
             title=settings.PROJECT_NAME,
-            root_path=settings.ROOT_PATH
+            root_path=settings.ROOT_PATH,
+            lifespan=lifespan,
         )
 
 
-app = App()
-app.include_router(api_router)
+def create_app() -> App:
+    """
+    Builds the application. The settings are read here, while the MongoDB
+    client and the use cases are created by its lifespan.
+
+    Returns:
+        App: The application, to serve with `uvicorn --factory src.main:create_app`.
+    """
+    app = App()
+    app.add_middleware(ServerTimingMiddleware)
+    app.include_router(api_router)
+    return app
+
+
+def __getattr__(name: str) -> Any:
+    # `src.main:app` is built on first access rather than on import
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
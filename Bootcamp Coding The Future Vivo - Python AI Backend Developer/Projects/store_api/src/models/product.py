@@ -1,6 +1,14 @@
+from pydantic import Field, model_validator
+from src.core.text import normalize_text
 from src.models.base import CreateBaseModel
 from src.schemas.product import ProductIn
 
 
 class ProductModel(ProductIn, CreateBaseModel):
-    ...
+    # lowercased name without accents, range scanned by the prefix search
+    name_normalized: str = Field(default="")
+
+    @model_validator(mode="after")
+    def set_name_normalized(self) -> "ProductModel":
+        self.name_normalized = normalize_text(self.name)
+        return self
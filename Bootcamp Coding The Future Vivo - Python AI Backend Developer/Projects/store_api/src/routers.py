@@ -1,5 +1,8 @@
 from fastapi import APIRouter
+from src.controllers.metrics import router as metrics
 from src.controllers.product import router as product
 
+# the routers carry their prefix, so that their routes hold the whole path
 api_router = APIRouter()
-api_router.include_router(product, prefix="/products")
+api_router.include_router(product)
+api_router.include_router(metrics)
@@ -1,7 +1,9 @@
+import re
 from decimal import Decimal
-from typing import Annotated, Optional
-from bson import Decimal128
-from pydantic import AfterValidator, Field
+from functools import lru_cache
+from typing import Any, FrozenSet, List, Literal, Optional, Type
+from pydantic import UUID4, BaseModel, Field, create_model
+from src.core.exceptions import InvalidFieldsException
 from src.schemas.base import BaseSchemaMixin, OutMixin
 
 
@@ -20,18 +22,61 @@ class ProductOut(ProductIn, OutMixin):
     ...
 
 
-def convert_decimal_128(value):
-    return Decimal128(str(value))
+def parse_product_fields(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    Parses a comma separated list of `ProductOut` fields.
 
+    Args:
+        value (Optional[str]): The fields requested by the client.
 
-_Decimal = Annotated[Decimal, AfterValidator(convert_decimal_128)]
+    Returns:
+        Optional[FrozenSet[str]]: The requested fields and `id`, or None for all
+        of them.
+
+    Raises:
+        InvalidFieldsException: If a field is not a `ProductOut` field.
+    """
+    if not value:
+        return None
+
+    fields = frozenset(field.strip() for field in value.split(",") if field.strip())
+    unknown = fields - ProductOut.model_fields.keys()
+    if unknown:
+        raise InvalidFieldsException(
+            message=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+
+    # the ID is always returned, it tells the products of a response apart
+    return fields | {"id"} if fields else None
+
+
+@lru_cache(maxsize=128)
+def product_fields_model(fields: FrozenSet[str]) -> Type[BaseModel]:
+    """
+    Builds a response model holding only the given `ProductOut` fields.
+
+    Args:
+        fields (FrozenSet[str]): The fields of the model.
+
+    Returns:
+        Type[BaseModel]: A model validating only the given fields.
+    """
+    return create_model(
+        "ProductFieldsOut",
+        __base__=BaseModel,
+        **{
+            name: (field.annotation, field)
+            for name, field in ProductOut.model_fields.items()
+            if name in fields
+        },
+    )
 
 
 class ProductUpdate(BaseSchemaMixin):
     # only allows to update these fields
 
     quantity: Optional[int] = Field(None, description="Product quantity")
-    price: Optional[_Decimal] = Field(None, description="Product price")
+    price: Optional[Decimal] = Field(None, description="Product price")
     status: Optional[bool] = Field(None, description="Product status")
 
     ...
@@ -39,3 +84,75 @@ class ProductUpdate(BaseSchemaMixin):
 
 class ProductUpdateOut(ProductOut):
     ...
+
+
+class ProductFilter(BaseModel):
+    status: Optional[bool] = Field(None, description="Product status")
+    min_price: Optional[Decimal] = Field(None, description="Minimum product price")
+    max_price: Optional[Decimal] = Field(None, description="Maximum product price")
+    name: Optional[str] = Field(None, description="Product name prefix")
+
+    def to_mongo(self) -> dict[str, Any]:
+        """
+        Builds the MongoDB filter matching the products of this filter.
+        """
+        filter: dict[str, Any] = {}
+
+        if self.status is not None:
+            filter["status"] = self.status
+        if self.min_price is not None:
+            filter.setdefault("price", {})["$gte"] = self.min_price
+        if self.max_price is not None:
+            filter.setdefault("price", {})["$lte"] = self.max_price
+        if self.name:
+            # an anchored, case sensitive regex is answered by the name index
+            filter["name"] = {"$regex": f"^{re.escape(self.name)}"}
+
+        return filter
+
+
+class ProductStatsOut(BaseModel):
+    status: bool = Field(..., description="Product status")
+    count: int = Field(..., description="Number of products")
+    total_quantity: int = Field(..., description="Sum of the product quantities")
+    inventory_value: Decimal = Field(
+        ..., description="Sum of the product prices times their quantities"
+    )
+    average_price: Decimal = Field(..., description="Average product price")
+
+
+class StockIn(BaseModel):
+    quantity: int = Field(..., gt=0, description="Quantity to reserve or release")
+
+
+class ProductBulkUpdate(ProductUpdate):
+    id: UUID4 = Field(..., description="Product identifier")
+
+
+class ProductBulkResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the batch")
+    id: Optional[UUID4] = Field(None, description="Product identifier")
+    status: Literal[
+        "created", "updated", "deleted", "not_found", "invalid", "error"
+    ] = Field(..., description="Outcome of the item")
+    detail: Optional[Any] = Field(None, description="Validation or write errors")
+
+
+class ProductImportError(BaseModel):
+    row: int = Field(..., description="Position of the row in the upload, from 1")
+    detail: Any = Field(..., description="Parsing, validation or write errors")
+
+
+class ProductImportReport(BaseModel):
+    rows: int = Field(..., description="Rows read from the upload")
+    created: int = Field(..., description="Products created")
+    failed: int = Field(..., description="Rows that were not imported")
+    errors: List[ProductImportError] = Field(
+        ..., description="Errors of the failed rows, up to IMPORT_MAX_ERRORS"
+    )
+    errors_truncated: bool = Field(
+        ..., description="Whether some failed rows are missing from the errors"
+    )
+    aborted: Optional[str] = Field(
+        None, description="Why the rest of the upload couldn't be read"
+    )
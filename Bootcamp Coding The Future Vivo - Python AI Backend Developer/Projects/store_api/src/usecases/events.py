@@ -0,0 +1,250 @@
+import asyncio
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, FrozenSet, List, Mapping, Optional, Set
+from uuid import UUID
+
+import pydantic_core
+from src.schemas.product import ProductOut
+
+PRODUCT_FIELDS = frozenset(ProductOut.model_fields)
+
+# tells the client that events were missed and it must reload the products
+RESET_FRAME = b"event: reset\ndata: {}\n\n"
+# tells the client it fell behind, it should reconnect with its Last-Event-ID
+OVERFLOW_FRAME = b"event: overflow\ndata: {}\n\n"
+
+
+class ProductEvent:
+    """
+    A change of a product, identified by the resume token of its change event.
+    """
+
+    __slots__ = ("token", "op", "id", "fields", "removed", "_frames")
+
+    def __init__(
+        self,
+        token: str,
+        op: str,
+        id: Optional[UUID],
+        fields: Dict[str, Any],
+        removed: List[str],
+    ) -> None:
+        self.token = token
+        self.op = op
+        self.id = id
+        self.fields = fields
+        self.removed = removed
+        self._frames: Dict[Optional[FrozenSet[str]], bytes] = {}
+
+    def matches(self, fields: Optional[FrozenSet[str]]) -> bool:
+        if not fields or self.op != "update":
+            return True
+        return not fields.isdisjoint(self.fields) or not fields.isdisjoint(self.removed)
+
+    def frame(self, fields: Optional[FrozenSet[str]]) -> bytes:
+        """
+        Encodes the event as a server-sent event holding the given fields,
+        once per set of fields.
+        """
+        frame = self._frames.get(fields)
+        if frame is None:
+            data = pydantic_core.to_json(
+                {
+                    "id": self.id,
+                    "fields": {
+                        name: value
+                        for name, value in self.fields.items()
+                        if not fields or name in fields
+                    },
+                    "removed": [
+                        name for name in self.removed if not fields or name in fields
+                    ],
+                }
+            )
+            frame = self._frames[fields] = (
+                f"id: {self.token}\nevent: {self.op}\ndata: ".encode() + data + b"\n\n"
+            )
+        return frame
+
+
+class Subscription:
+    """
+    The events a client waits for, queued up to `queue_size` frames.
+
+    A client that lets its queue fill up is sent an overflow frame and
+    disconnected, rather than holding an unbounded backlog.
+    """
+
+    def __init__(
+        self,
+        ids: Optional[FrozenSet[UUID]],
+        fields: Optional[FrozenSet[str]],
+        queue_size: int,
+    ) -> None:
+        self.ids = ids
+        self.fields = fields
+        self.backlog: Deque[ProductEvent] = deque()
+        self.queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue(queue_size)
+        self.closed = False
+
+    def deliver(self, event: ProductEvent) -> None:
+        if event.matches(self.fields):
+            self.push(event.frame(self.fields))
+
+    def push(self, frame: Optional[bytes]) -> None:
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            # the subscription ends once the overflow frame is sent, which
+            # leaves room for it even in a queue of a single frame
+            self.queue.put_nowait(OVERFLOW_FRAME)
+            self.closed = True
+
+    async def next_frame(self, timeout: float) -> Optional[bytes]:
+        """
+        Waits for the next frame to send.
+
+        Args:
+            timeout (float): The seconds to wait for.
+
+        Returns:
+            Optional[bytes]: The frame, an empty frame if none came in time, or
+            None once the subscription is over.
+        """
+        while self.backlog:
+            event = self.backlog.popleft()
+            if event.matches(self.fields):
+                return event.frame(self.fields)
+        if self.closed and self.queue.empty():
+            return None
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return b""
+
+
+class ProductEventBroker:
+    """
+    Fans the product changes of the shared change feed out to the subscribed
+    clients, keeping the last `buffer_size` events for the clients resuming
+    with the token of the last event they received.
+    """
+
+    def __init__(self, queue_size: int, buffer_size: int) -> None:
+        self.queue_size = queue_size
+        self.buffer: Deque[ProductEvent] = deque(maxlen=buffer_size)
+        self.available = False
+        self._all: Set[Subscription] = set()
+        self._by_id: Dict[UUID, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(
+        self,
+        ids: Optional[FrozenSet[UUID]] = None,
+        fields: Optional[FrozenSet[str]] = None,
+        last_event_id: Optional[str] = None,
+    ) -> Subscription:
+        """
+        Registers a client for the changes of the given products and fields.
+
+        Args:
+            ids (Optional[FrozenSet[UUID]]): The products to follow, all of them
+                by default.
+            fields (Optional[FrozenSet[str]]): The fields to follow, all of them
+                by default. Inserts, replacements and deletes are always sent.
+            last_event_id (Optional[str]): The token of the last event the
+                client received, to resume after it.
+
+        Returns:
+            Subscription: The subscription, to unsubscribe once the client is gone.
+        """
+        subscription = Subscription(ids, fields, self.queue_size)
+
+        if last_event_id is not None:
+            tokens = [event.token for event in self.buffer]
+            if last_event_id in tokens:
+                subscription.backlog.extend(
+                    event
+                    for event in list(self.buffer)[tokens.index(last_event_id) + 1 :]
+                    if ids is None or event.id in ids
+                )
+            else:
+                subscription.push(RESET_FRAME)
+
+        if ids is None:
+            self._all.add(subscription)
+        else:
+            for id in ids:
+                self._by_id[id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._all.discard(subscription)
+        for id in subscription.ids or ():
+            subscribers = self._by_id.get(id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_id[id]
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions())
+
+    def on_change(self, change: Mapping[str, Any]) -> None:
+        event = _event(change)
+        self.buffer.append(event)
+
+        for subscription in self._all:
+            subscription.deliver(event)
+        for subscription in self._by_id.get(event.id, ()):
+            subscription.deliver(event)
+
+    def reset(self, lost: bool) -> None:
+        if lost:
+            self.buffer.clear()
+            for subscription in self._subscriptions():
+                subscription.push(RESET_FRAME)
+
+    def close(self) -> None:
+        self.available = False
+        for subscription in self._subscriptions():
+            subscription.push(None)
+
+    def _subscriptions(self) -> Set[Subscription]:
+        return self._all.union(*self._by_id.values())
+
+
+def _event(change: Mapping[str, Any]) -> ProductEvent:
+    op = change["operationType"]
+    # the product ID of deletes is only known from the pre-image, if enabled
+    document = (
+        change.get("fullDocument") or change.get("fullDocumentBeforeChange") or {}
+    )
+
+    removed: List[str] = []
+    if op == "update":
+        description = change["updateDescription"]
+        fields = description.get("updatedFields", {})
+        removed = [
+            name
+            for name in description.get("removedFields", ())
+            if name in PRODUCT_FIELDS
+        ]
+    elif op == "delete":
+        fields = {}
+    else:
+        fields = document
+
+    return ProductEvent(
+        token=change["_id"]["_data"],
+        op=op,
+        id=document.get("id"),
+        fields={
+            name: value for name, value in fields.items() if name in PRODUCT_FIELDS
+        },
+        removed=removed,
+    )
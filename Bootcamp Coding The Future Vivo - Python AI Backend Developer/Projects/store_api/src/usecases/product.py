@@ -1,13 +1,48 @@
-from typing import List
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, FrozenSet, List, Optional
 from uuid import UUID
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError
 from src.models.product import ProductModel
-from src.schemas.product import ProductIn, ProductOut, ProductUpdate, ProductUpdateOut
+from src.schemas.product import (
+    ProductBulkResult,
+    ProductBulkUpdate,
+    ProductFilter,
+    ProductImportError,
+    ProductImportReport,
+    ProductIn,
+    ProductOut,
+    ProductStatsOut,
+    ProductUpdate,
+    ProductUpdateOut,
+    product_fields_model,
+)
 from src.database.mongo import db_client
-from src.core.exceptions import NotFoundException
+from src.core import fast_json
+from src.core.cache import LRUCache
+from src.core.codecs import CODEC_OPTIONS
+from src.core.exceptions import (
+    InsufficientStockException,
+    InvalidImportException,
+    NotFoundException,
+    PreconditionFailedException,
+)
+from src.core.formats import InvalidRow
+from src.core.pagination import decode_cursor, encode_cursor
+from src.core.settings import settings
+from src.core.text import normalize_text
+from src.core.timing import timed
+from src.usecases.events import ProductEventBroker
+from src.usecases.stock import StockCoalescer
 
 import pymongo
 
+# the fields products can be sorted by, each backed by a `<field>_id` index
+SORT_FIELDS = ("created_at", "price", "name", "quantity")
+DEFAULT_SORT = "created_at"
+PRODUCT_FIELDS = frozenset(ProductOut.model_fields)
+
 
 class ProductUseCase:
     """
@@ -17,10 +52,29 @@ class ProductUseCase:
     def __init__(self) -> None:
         """
         Initializes the ProductUseCase with a MongoDB client, database, and collection.
+
+        The use case is meant to be shared by the requests of a worker, since
+        it holds the product cache, the stock reservation coalescer and the
+        subscribers of the product events.
         """
         self.client: AsyncIOMotorClient = db_client.get()
         self.database: AsyncIOMotorDatabase = self.client.get_database()
-        self.collection = self.database.get_collection("products")
+        # Decimal fields are converted by the BSON codec of the collection
+        self.collection = self.database.get_collection(
+            "products", codec_options=CODEC_OPTIONS
+        )
+        self.cache = LRUCache(
+            max_bytes=settings.PRODUCT_CACHE_MAX_BYTES, ttl=settings.PRODUCT_CACHE_TTL
+        )
+        self.coalescer: Optional[StockCoalescer] = (
+            StockCoalescer(window=settings.STOCK_COALESCE_WINDOW_MS / 1000)
+            if settings.STOCK_COALESCE_WINDOW_MS > 0
+            else None
+        )
+        self.events = ProductEventBroker(
+            queue_size=settings.PRODUCT_EVENTS_QUEUE_SIZE,
+            buffer_size=settings.PRODUCT_EVENTS_BUFFER_SIZE,
+        )
 
     async def create(self, body: ProductIn) -> ProductOut:
         """
@@ -39,75 +93,781 @@ class ProductUseCase:
 
         return product
 
-    async def get(self, id: UUID) -> ProductOut:
+    async def get(
+        self, id: UUID, fields: Optional[FrozenSet[str]] = None
+    ) -> ProductOut | BaseModel:
         """
-        Retrieves a product from the database by its ID.
+        Retrieves a product by its ID, from the cache when it holds the product.
 
         Args:
             id (UUID): The ID of the product to retrieve.
+            fields (Optional[FrozenSet[str]]): The fields to retrieve, or None
+                for the whole product.
 
         Returns:
-            ProductOut: The retrieved product data.
+            ProductOut | BaseModel: The retrieved product data, holding only the
+            requested fields when `fields` is given.
 
         Raises:
             NotFoundException: If the product with the given ID is not found.
         """
+        product = self.cache.get(id)
+        if product is not None:
+            if fields:
+                return product_fields_model(fields).model_construct(
+                    **product.model_dump(include=fields)
+                )
+            return product
+
+        if fields:
+            result = await self.collection.find_one(
+                {"id": id}, projection=_projection(fields)
+            )
+            if not result:
+                raise NotFoundException(message=f"Product Not Found with id: {id}")
+            return product_fields_model(fields)(**result)
+
+        generation = self.cache.generation
         result = await self.collection.find_one({"id": id})
 
         if not result:
             raise NotFoundException(message=f"Product Not Found with id: {id}")
-        return ProductOut(**result)
 
-    async def query(self) -> List[ProductOut]:
+        with timed("validation"):
+            product = ProductOut(**result)
+        self.cache.set(
+            id,
+            product,
+            size=len(product.model_dump_json()),
+            alias=result["_id"],
+            generation=generation,
+        )
+        return product
+
+    async def query(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        fields: Optional[FrozenSet[str]] = None,
+        filter: Optional[ProductFilter] = None,
+        sort: str = DEFAULT_SORT,
+    ) -> tuple[List[ProductOut | BaseModel], Optional[str]]:
         """
-        Retrieves all products from the database.
+        Retrieves a page of the products matching a filter, in the given order.
+
+        Args:
+            limit (int): The maximum number of products to return.
+            after (Optional[str]): The cursor returned by the previous page.
+            fields (Optional[FrozenSet[str]]): The fields to retrieve, or None
+                for the whole products.
+            filter (Optional[ProductFilter]): The filter the products must match.
+            sort (str): The field to sort by, prefixed by `-` for a descending
+                order. The product ID breaks the ties.
 
         Returns:
-            List[ProductOut]: A list of all products.
+            tuple[List[ProductOut | BaseModel], Optional[str]]: The products of
+            the page and the cursor of the next page, or None if this is the
+            last one.
+
+        Raises:
+            InvalidCursorException: If the cursor token is malformed.
         """
-        return [ProductOut(**item) async for item in self.collection.find()]
+        sort_field = sort.lstrip("-")
+        # the keyset fields are always fetched to build the next cursor
+        projection = _projection(fields | {sort_field, "id"}) if fields else None
+        cursor = self._find(after, projection, filter, sort).limit(limit + 1)
+        items, next_cursor = _page(await cursor.to_list(length=None), limit, sort)
 
-    async def update(self, id: UUID, body: ProductUpdate) -> ProductUpdateOut:
+        model = product_fields_model(fields) if fields else ProductOut
+        with timed("validation"):
+            products = [model(**item) for item in items]
+        return products, next_cursor
+
+    async def search(
+        self,
+        q: str,
+        mode: str,
+        limit: int,
+        after: Optional[str] = None,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> tuple[List[ProductOut | BaseModel], Optional[str]]:
         """
-        Updates a product in the database by its ID.
+        Searches products by name.
+
+        The `text` mode ranks the products matching any word of the query by
+        relevance, using the name text index. The `prefix` mode returns, in
+        alphabetical order, the products whose name starts with the query,
+        ignoring case and accents, with a range scan of the normalized name index.
+
+        Args:
+            q (str): The words or the name prefix to search for.
+            mode (str): The search mode, `text` or `prefix`.
+            limit (int): The maximum number of products to return.
+            after (Optional[str]): The cursor returned by the previous page.
+            fields (Optional[FrozenSet[str]]): The fields to retrieve, or None
+                for the whole products.
+
+        Returns:
+            tuple[List[ProductOut | BaseModel], Optional[str]]: The products of
+            the page and the cursor of the next page, or None if this is the
+            last one.
+
+        Raises:
+            InvalidCursorException: If the cursor token is malformed.
+        """
+        projection = _projection((fields or PRODUCT_FIELDS) | {"id"})
+
+        if mode == "prefix":
+            sort = "name_normalized"
+            prefix = normalize_text(q)
+            conditions = [{sort: {"$gte": prefix, "$lt": prefix + "\U0010ffff"}}]
+            keyset, sort_spec = _keyset(after, sort)
+            if keyset:
+                conditions.append(keyset)
+
+            cursor = self.collection.find(
+                {"$and": conditions}, projection={**projection, sort: True}
+            ).sort(sort_spec)
+            items = await cursor.limit(limit + 1).to_list(length=None)
+        else:
+            sort = "-score"
+            keyset, sort_spec = _keyset(after, sort)
+            pipeline = [
+                {"$match": {"$text": {"$search": q}}},
+                {"$set": {"score": {"$meta": "textScore"}}},
+                *([{"$match": keyset}] if keyset else []),
+                {"$sort": dict(sort_spec)},
+                {"$limit": limit + 1},
+                {"$project": {**projection, "score": True}},
+            ]
+            items = await self.collection.aggregate(pipeline).to_list(length=None)
+
+        items, next_cursor = _page(items, limit, sort)
+        model = product_fields_model(fields) if fields else ProductOut
+        with timed("validation"):
+            products = [model(**item) for item in items]
+        return products, next_cursor
+
+    def stream(
+        self,
+        after: Optional[str] = None,
+        fields: Optional[FrozenSet[str]] = None,
+        filter: Optional[ProductFilter] = None,
+        sort: str = DEFAULT_SORT,
+    ) -> AsyncIterator[ProductOut | BaseModel]:
+        """
+        Streams the products matching a filter one by one as the database
+        cursor returns them.
+
+        The cursor token is validated before the stream starts, so an invalid
+        token is reported before any product is sent.
+
+        Args:
+            after (Optional[str]): The cursor to resume the stream from.
+            fields (Optional[FrozenSet[str]]): The fields to retrieve, or None
+                for the whole products.
+            filter (Optional[ProductFilter]): The filter the products must match.
+            sort (str): The field to sort by, prefixed by `-` for a descending order.
+
+        Returns:
+            AsyncIterator[ProductOut | BaseModel]: The products in the given order.
+
+        Raises:
+            InvalidCursorException: If the cursor token is malformed.
+        """
+        projection = _projection(fields) if fields else None
+        cursor = self._find(after, projection, filter, sort).batch_size(
+            settings.STREAM_BATCH_SIZE
+        )
+        model = product_fields_model(fields) if fields else ProductOut
+
+        async def products() -> AsyncIterator[ProductOut | BaseModel]:
+            async for item in cursor:
+                yield model(**item)
+
+        return products()
+
+    async def stats(
+        self, filter: Optional[ProductFilter] = None
+    ) -> List[ProductStatsOut]:
+        """
+        Aggregates the products matching a filter by status.
+
+        Args:
+            filter (Optional[ProductFilter]): The filter the products must match.
+
+        Returns:
+            List[ProductStatsOut]: The count, stock and inventory value of the
+            products of each status.
+        """
+        pipeline = [
+            {"$match": filter.to_mongo() if filter else {}},
+            {
+                "$group": {
+                    "_id": "$status",
+                    "count": {"$sum": 1},
+                    "total_quantity": {"$sum": "$quantity"},
+                    "inventory_value": {"$sum": {"$multiply": ["$price", "$quantity"]}},
+                    "average_price": {"$avg": "$price"},
+                }
+            },
+            {"$set": {"status": "$_id"}},
+            {"$sort": {"status": pymongo.DESCENDING}},
+        ]
+
+        return [
+            ProductStatsOut(**item)
+            async for item in self.collection.aggregate(pipeline)
+        ]
+
+    async def get_json(
+        self, id: UUID, fields: Optional[FrozenSet[str]] = None
+    ) -> tuple[bytes, int]:
+        """
+        Retrieves a product by its ID as JSON, without validating it into
+        `ProductOut`. Products read from the database are cached by `get` only.
+
+        Args:
+            id (UUID): The ID of the product to retrieve.
+            fields (Optional[FrozenSet[str]]): The fields to retrieve, or None
+                for the whole product.
+
+        Returns:
+            tuple[bytes, int]: The product serialized as JSON and its version.
+
+        Raises:
+            NotFoundException: If the product with the given ID is not found.
+        """
+        product = self.cache.get(id)
+        if product is not None:
+            return product.model_dump_json(include=fields).encode(), product.version
+
+        fields = fields or PRODUCT_FIELDS
+        result = await self.collection.find_one(
+            {"id": id}, projection=_projection(fields | {"version"})
+        )
+        if not result:
+            raise NotFoundException(message=f"Product Not Found with id: {id}")
+
+        version = result.setdefault("version", 0)
+        if "version" not in fields:
+            del result["version"]
+
+        return fast_json.dumps(result), version
+
+    async def query_json(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        fields: Optional[FrozenSet[str]] = None,
+        filter: Optional[ProductFilter] = None,
+        sort: str = DEFAULT_SORT,
+    ) -> tuple[bytes, Optional[str]]:
+        """
+        Retrieves a page of products like `query`, serialized straight from the
+        raw BSON batches to a JSON array.
+
+        Returns:
+            tuple[bytes, Optional[str]]: The JSON array of the products of the
+            page and the cursor of the next page, or None if this is the last one.
+
+        Raises:
+            InvalidCursorException: If the cursor token is malformed.
+        """
+        fields = fields or PRODUCT_FIELDS
+        keyset = {sort.lstrip("-"), "id"}
+        cursor = self._find(
+            after, _projection(fields | keyset), filter, sort, raw=True
+        ).limit(limit + 1)
+
+        items = []
+        async for batch in cursor:
+            items.extend(fast_json.decode_batch(batch))
+
+        items, next_cursor = _page(items, limit, sort)
+        for field in keyset - fields:
+            for item in items:
+                del item[field]
+        _default_version(items, fields)
+
+        return fast_json.dumps(items), next_cursor
+
+    def stream_json(
+        self,
+        after: Optional[str] = None,
+        fields: Optional[FrozenSet[str]] = None,
+        filter: Optional[ProductFilter] = None,
+        sort: str = DEFAULT_SORT,
+    ) -> AsyncIterator[bytes]:
+        """
+        Streams products like `stream`, as NDJSON chunks encoded straight from
+        the raw BSON batches.
+
+        Returns:
+            AsyncIterator[bytes]: One NDJSON chunk per database batch.
+
+        Raises:
+            InvalidCursorException: If the cursor token is malformed.
+        """
+        fields = fields or PRODUCT_FIELDS
+        cursor = self._find(
+            after, _projection(fields), filter, sort, raw=True
+        ).batch_size(settings.STREAM_BATCH_SIZE)
+
+        async def chunks() -> AsyncIterator[bytes]:
+            async for batch in cursor:
+                items = fast_json.decode_batch(batch)
+                _default_version(items, fields)
+                yield b"".join(fast_json.dumps(item) + b"\n" for item in items)
+
+        return chunks()
+
+    def _find(
+        self,
+        after: Optional[str],
+        projection: Optional[dict] = None,
+        filter: Optional[ProductFilter] = None,
+        sort: str = DEFAULT_SORT,
+        raw: bool = False,
+    ):
+        """
+        Builds a cursor over the products matching a filter, placed after the
+        given keyset position. Raw cursors return batches of BSON bytes.
+
+        Raises:
+            InvalidCursorException: If the cursor token is malformed.
+        """
+        conditions = [filter.to_mongo()] if filter else []
+        keyset, sort_spec = _keyset(after, sort)
+        if keyset:
+            conditions.append(keyset)
+
+        find = self.collection.find_raw_batches if raw else self.collection.find
+        return find(
+            {"$and": conditions} if conditions else {}, projection=projection
+        ).sort(sort_spec)
+
+    async def update(
+        self, id: UUID, body: ProductUpdate, version: Optional[int] = None
+    ) -> ProductUpdateOut:
+        """
+        Updates a product in the database by its ID, in a single round trip,
+        and increments its version.
 
         Args:
             id (UUID): The ID of the product to update.
             body (ProductUpdate): The updated product data.
+            version (Optional[int]): The version the product must have to be
+                updated, or None to update any version.
 
         Returns:
             ProductUpdateOut: The updated product data.
+
+        Raises:
+            NotFoundException: If the product with the given ID is not found.
+            PreconditionFailedException: If the product has another version.
         """
         product = ProductUpdate(**body.model_dump(exclude_none=True))
         result = await self.collection.find_one_and_update(
-            filter={"id": id},
-            update={"$set": product.model_dump(exclude_none=True)},
+            filter=_versioned({"id": id}, version),
+            update=_update(product.model_dump(exclude_none=True)),
             return_document=pymongo.ReturnDocument.AFTER,
         )
+        self.cache.invalidate(id)
+
+        if not result:
+            await self._raise_write_failure(id, version)
 
         return ProductUpdateOut(**result)
 
-    async def delete(self, id: UUID) -> bool:
+    async def delete(self, id: UUID, version: Optional[int] = None) -> bool:
         """
-        Deletes a product from the database by its ID.
+        Deletes a product from the database by its ID, in a single round trip.
 
         Args:
             id (UUID): The ID of the product to delete.
+            version (Optional[int]): The version the product must have to be
+                deleted, or None to delete any version.
+
+        Returns:
+            bool: True if the product was successfully deleted.
+
+        Raises:
+            NotFoundException: If the product with the given ID is not found.
+            PreconditionFailedException: If the product has another version.
+        """
+        result = await self.collection.find_one_and_delete(
+            _versioned({"id": id}, version), projection={"_id": True}
+        )
+        self.cache.invalidate(id)
+
+        if not result:
+            await self._raise_write_failure(id, version)
+
+        return True
+
+    async def reserve(self, id: UUID, quantity: int) -> ProductOut:
+        """
+        Reserves a quantity of a product, decrementing its stock only if it
+        holds enough, in a single round trip.
+
+        Concurrent reservations of the same product are merged into a single
+        update when STOCK_COALESCE_WINDOW_MS is set.
+
+        Args:
+            id (UUID): The ID of the product.
+            quantity (int): The quantity to reserve.
+
+        Returns:
+            ProductOut: The product after the reservation.
+
+        Raises:
+            NotFoundException: If the product with the given ID is not found.
+            InsufficientStockException: If the stock is lower than the quantity.
+        """
+        if self.coalescer is not None:
+            result = await self.coalescer.submit(self._reserve, id, quantity)
+        else:
+            result = await self._reserve(id, quantity)
+
+        if not result:
+            if await self.collection.find_one({"id": id}, projection={"_id": True}):
+                raise InsufficientStockException(
+                    message=f"Not enough stock to reserve {quantity} of product {id}"
+                )
+            raise NotFoundException(message=f"Product Not Found with id: {id}")
+
+        return ProductOut(**result)
+
+    async def release(self, id: UUID, quantity: int) -> ProductOut:
+        """
+        Releases a reserved quantity of a product back to its stock.
+
+        Args:
+            id (UUID): The ID of the product.
+            quantity (int): The quantity to release.
 
         Returns:
-            bool: True if the product was successfully deleted, False otherwise.
+            ProductOut: The product after the release.
 
         Raises:
             NotFoundException: If the product with the given ID is not found.
         """
-        product = await self.collection.find_one({"id": id})
+        result = await self.collection.find_one_and_update(
+            filter={"id": id},
+            update=_increment(quantity),
+            return_document=pymongo.ReturnDocument.AFTER,
+        )
+        self.cache.invalidate(id)
 
-        if not product:
+        if not result:
             raise NotFoundException(message=f"Product Not Found with id: {id}")
 
-        result = await self.collection.delete_one({"id": id})
+        return ProductOut(**result)
+
+    async def _reserve(self, id: UUID, quantity: int) -> Optional[Dict[str, Any]]:
+        result = await self.collection.find_one_and_update(
+            filter={"id": id, "quantity": {"$gte": quantity}},
+            update=_increment(-quantity),
+            return_document=pymongo.ReturnDocument.AFTER,
+        )
+        self.cache.invalidate(id)
+
+        return result
+
+    async def _raise_write_failure(self, id: UUID, version: Optional[int]) -> None:
+        """
+        Tells apart a missing product from a version mismatch once a write
+        matched no document. Only failed writes pay this extra round trip.
+        """
+        if version is not None and await self.collection.find_one(
+            {"id": id}, projection={"_id": True}
+        ):
+            raise PreconditionFailedException(
+                message=f"Product with id {id} is not at version {version}"
+            )
+
+        raise NotFoundException(message=f"Product Not Found with id: {id}")
+
+    async def bulk_create(self, items: List[Dict[str, Any]]) -> List[ProductBulkResult]:
+        """
+        Creates a batch of products with a single unordered insert.
+
+        Invalid items are reported and skipped, the valid ones are written even
+        if some of them fail.
+
+        Args:
+            items (List[Dict[str, Any]]): The raw data of the products to create.
+
+        Returns:
+            List[ProductBulkResult]: The outcome of each item, in batch order.
+        """
+        results: List[ProductBulkResult] = []
+        documents: List[Dict[str, Any]] = []
+        positions: List[int] = []
+
+        for index, item in enumerate(items):
+            try:
+                product_in = ProductIn.model_validate(item)
+            except ValidationError as exc:
+                results.append(_invalid(index, exc))
+                continue
+
+            product_model = ProductModel(**product_in.model_dump())
+            documents.append(product_model.model_dump())
+            positions.append(len(results))
+            results.append(
+                ProductBulkResult(index=index, id=product_model.id, status="created")
+            )
+
+        if documents:
+            try:
+                await self.collection.insert_many(documents, ordered=False)
+            except BulkWriteError as exc:
+                for error in exc.details["writeErrors"]:
+                    result = results[positions[error["index"]]]
+                    result.status, result.detail = "error", error["errmsg"]
+
+        return results
+
+    async def bulk_update(self, items: List[Dict[str, Any]]) -> List[ProductBulkResult]:
+        """
+        Updates a batch of products with a single unordered bulk write.
+
+        Args:
+            items (List[Dict[str, Any]]): The ID and the fields to update of
+                each product.
+
+        Returns:
+            List[ProductBulkResult]: The outcome of each item, in batch order.
+        """
+        results: List[ProductBulkResult] = []
+        operations: List[pymongo.UpdateOne] = []
+        positions: List[int] = []
+
+        for index, item in enumerate(items):
+            try:
+                product = ProductBulkUpdate.model_validate(item)
+            except ValidationError as exc:
+                results.append(_invalid(index, exc))
+                continue
+
+            fields = product.model_dump(exclude={"id"}, exclude_none=True)
+            if not fields:
+                results.append(
+                    ProductBulkResult(
+                        index=index,
+                        id=product.id,
+                        status="invalid",
+                        detail="No fields to update",
+                    )
+                )
+                continue
+
+            operations.append(pymongo.UpdateOne({"id": product.id}, _update(fields)))
+            positions.append(len(results))
+            results.append(
+                ProductBulkResult(index=index, id=product.id, status="updated")
+            )
+
+        if not operations:
+            return results
+
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            matched_count = result.matched_count
+        except BulkWriteError as exc:
+            for error in exc.details["writeErrors"]:
+                failed = results[positions[error["index"]]]
+                failed.status, failed.detail = "error", error["errmsg"]
+            matched_count = exc.details["nMatched"]
+
+        updated = [results[position] for position in positions]
+        for result in updated:
+            self.cache.invalidate(result.id)
+
+        if matched_count < len(updated):
+            found = await self._existing_ids([result.id for result in updated])
+            for result in updated:
+                if result.status == "updated" and result.id not in found:
+                    result.status = "not_found"
+
+        return results
+
+    async def bulk_delete(self, ids: List[UUID]) -> List[ProductBulkResult]:
+        """
+        Deletes a batch of products by their IDs.
+
+        A product is only reported as deleted when the batch removed it. When
+        other requests delete some of the products between the lookup and the
+        delete, the deleted count can't tell which ones, and none of them is
+        reported as deleted by the batch.
+
+        Args:
+            ids (List[UUID]): The IDs of the products to delete.
+
+        Returns:
+            List[ProductBulkResult]: The outcome of each ID, in batch order.
+        """
+        found = await self._existing_ids(ids)
+        if found:
+            result = await self.collection.delete_many({"id": {"$in": list(found)}})
+            for id in found:
+                self.cache.invalidate(id)
+            if result.deleted_count != len(found):
+                found = set()
+
+        return [
+            ProductBulkResult(
+                index=index, id=id, status="deleted" if id in found else "not_found"
+            )
+            for index, id in enumerate(ids)
+        ]
+
+    async def import_products(self, rows: AsyncIterator[Any]) -> ProductImportReport:
+        """
+        Imports a stream of products in unordered inserts of IMPORT_BATCH_SIZE
+        products.
+
+        The rows are pulled one chunk at a time and the next chunk is only read
+        once the previous one is written, so an upload is consumed at the pace
+        of the database whatever its size.
+
+        Args:
+            rows (AsyncIterator[Any]): The raw data of each product, or an
+                `InvalidRow` for the rows that couldn't be parsed.
+
+        Returns:
+            ProductImportReport: The number of rows read, created and failed,
+            with the errors of the failed rows, and why the upload was only
+            partly read if it couldn't be parsed any further.
+        """
+        report = ProductImportReport(
+            rows=0, created=0, failed=0, errors=[], errors_truncated=False
+        )
+        batch: List[tuple[int, Any]] = []
+
+        try:
+            async for row in rows:
+                report.rows += 1
+                if isinstance(row, InvalidRow):
+                    _import_failed(report, report.rows, row.detail)
+                    continue
+
+                batch.append((report.rows, row))
+                if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                    await self._import_batch(batch, report)
+                    batch = []
+        except InvalidImportException as exc:
+            # the rows read so far are still imported
+            report.aborted = exc.message
+
+        if batch:
+            await self._import_batch(batch, report)
+
+        return report
+
+    async def _import_batch(
+        self, batch: List[tuple[int, Any]], report: ProductImportReport
+    ) -> None:
+        results = await self.bulk_create([item for _, item in batch])
+        for result in results:
+            if result.status == "created":
+                report.created += 1
+            else:
+                _import_failed(report, batch[result.index][0], result.detail)
+
+    async def _existing_ids(self, ids: List[UUID]) -> set[UUID]:
+        cursor = self.collection.find({"id": {"$in": ids}}, projection={"id": True})
+        return {item["id"] async for item in cursor}
+
+
+def _keyset(
+    after: Optional[str], sort: str
+) -> tuple[Optional[Dict[str, Any]], List[tuple[str, int]]]:
+    """
+    Builds the condition selecting the documents placed after a cursor, and
+    the matching sort, the ID breaking the ties.
+
+    Raises:
+        InvalidCursorException: If the cursor token is malformed.
+    """
+    sort_field = sort.lstrip("-")
+    direction = pymongo.DESCENDING if sort.startswith("-") else pymongo.ASCENDING
+    sort_spec = [(sort_field, direction), ("id", direction)]
+
+    if not after:
+        return None, sort_spec
+
+    value, id = decode_cursor(after, sort)
+    operator = "$lt" if direction == pymongo.DESCENDING else "$gt"
+    condition = {
+        "$or": [
+            {sort_field: {operator: value}},
+            {sort_field: value, "id": {operator: id}},
+        ]
+    }
+    return condition, sort_spec
+
+
+def _page(
+    items: List[Dict[str, Any]], limit: int, sort: str
+) -> tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Trims the `limit + 1` documents fetched for a page, and builds the cursor
+    of the next page when the extra document shows there is one.
+    """
+    if len(items) <= limit:
+        return items, None
+
+    items = items[:limit]
+    return items, encode_cursor(sort, items[-1][sort.lstrip("-")], items[-1]["id"])
+
+
+def _versioned(filter: Dict[str, Any], version: Optional[int]) -> Dict[str, Any]:
+    if version is None:
+        return filter
+    if version == 0:
+        return {**filter, "version": {"$exists": False}}
+    return {**filter, "version": version}
+
+
+def _default_version(items: List[dict], fields: FrozenSet[str]) -> None:
+    # products written before versioning have no version field, they are at 0
+    if "version" in fields:
+        for item in items:
+            item.setdefault("version", 0)
+
+
+def _update(fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "$set": {**fields, "updated_at": datetime.utcnow()},
+        "$inc": {"version": 1},
+    }
+
+
+def _increment(quantity: int) -> Dict[str, Any]:
+    return {
+        "$inc": {"quantity": quantity, "version": 1},
+        "$set": {"updated_at": datetime.utcnow()},
+    }
+
+
+def _projection(fields: FrozenSet[str]) -> Dict[str, bool]:
+    return {"_id": False, **{field: True for field in fields}}
+
 
-        return True if result.deleted_count > 0 else False
+def _import_failed(report: ProductImportReport, row: int, detail: Any) -> None:
+    report.failed += 1
+    if len(report.errors) < settings.IMPORT_MAX_ERRORS:
+        report.errors.append(ProductImportError(row=row, detail=detail))
+    else:
+        report.errors_truncated = True
 
 
-product_usecase = ProductUseCase()
+def _invalid(index: int, exc: ValidationError) -> ProductBulkResult:
+    return ProductBulkResult(
+        index=index,
+        status="invalid",
+        detail=exc.errors(include_url=False, include_context=False),
+    )
@@ -0,0 +1,106 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+Apply = Callable[[UUID, int], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class StockCoalescer:
+    """
+    Merges the reservations of the same product received within a short window
+    into a single guarded update of their total quantity.
+
+    When the stock can't cover the total, the reservations of that product are
+    applied one by one, in arrival order, so each one still gets the answer it
+    would have had alone. Reservations cancelled while waiting are left out.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._pending: Dict[UUID, List[Tuple[int, asyncio.Future]]] = defaultdict(list)
+        self._apply: Optional[Apply] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(
+        self, apply: Apply, id: UUID, quantity: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Queues a reservation and waits for the update applying it.
+
+        Args:
+            apply (Apply): Applies a guarded reservation of a quantity of a
+                product, returning the updated product or None if it failed.
+            id (UUID): The ID of the product.
+            quantity (int): The quantity to reserve.
+
+        Returns:
+            Optional[Dict[str, Any]]: The updated product, or None if the
+            reservation failed.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[id].append((quantity, future))
+        self._apply = apply
+
+        if self._timer is None:
+            self._timer = loop.call_later(self.window, self._start_flush)
+
+        return await future
+
+    async def close(self) -> None:
+        """
+        Applies the reservations still waiting for their window, then waits
+        for every update in flight.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._start_flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    def _start_flush(self) -> None:
+        # the loop only keeps weak references to its tasks
+        task = asyncio.get_running_loop().create_task(self._flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self) -> None:
+        pending, self._pending = self._pending, defaultdict(list)
+        self._timer = None
+
+        # one find_one_and_update per product rather than a single bulk_write,
+        # whose result doesn't tell which guarded updates matched nor return
+        # the updated products
+        await asyncio.gather(
+            *(self._flush_product(id, requests) for id, requests in pending.items())
+        )
+
+    async def _flush_product(
+        self, id: UUID, requests: List[Tuple[int, asyncio.Future]]
+    ) -> None:
+        requests = [
+            (quantity, future) for quantity, future in requests if not future.done()
+        ]
+        if not requests:
+            return
+
+        try:
+            result = await self._apply(id, sum(quantity for quantity, _ in requests))
+            if result is not None or len(requests) == 1:
+                for _, future in requests:
+                    if not future.done():
+                        future.set_result(result)
+                return
+
+            for quantity, future in requests:
+                if future.done():
+                    continue
+                result = await self._apply(id, quantity)
+                if not future.done():
+                    future.set_result(result)
+        except Exception as exc:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(exc)
@@ -0,0 +1,57 @@
+import os
+from typing import AsyncIterator
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmarks.standin import create_client
+from src.database.mongo import db_client
+from src.main import create_app
+from src.usecases.product import ProductUseCase
+
+
+# The tests run on the in-memory stand-in, or on the MongoDB server of
+# TEST_DATABASE_URL when it is set. mongomock can't aggregate Decimal128
+# values, the tests of such pipelines need the server.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+requires_mongodb = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="needs the MongoDB server of TEST_DATABASE_URL"
+)
+
+
+@pytest.fixture
+async def usecase(monkeypatch) -> AsyncIterator[ProductUseCase]:
+    """
+    A product use case over an empty database of its own.
+    """
+    database = f"store_{uuid4().hex}"
+    if not TEST_DATABASE_URL:
+        monkeypatch.setattr(db_client, "client", create_client(database))
+        yield ProductUseCase()
+        return
+
+    url = urlsplit(TEST_DATABASE_URL)._replace(path=f"/{database}").geturl()
+    client = AsyncIOMotorClient(url, uuidRepresentation="standard")
+    monkeypatch.setattr(db_client, "client", client)
+    yield ProductUseCase()
+    await client.drop_database(database)
+    client.close()
+
+
+@pytest.fixture
+async def client(usecase: ProductUseCase) -> AsyncIterator[AsyncClient]:
+    # the lifespan isn't run, the routes use the use case of the fixture
+    app = create_app()
+    app.state.product_usecase = usecase
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+def product(name: str = "Iphone 14 Pro Max", **fields) -> dict:
+    return {"name": name, "quantity": 10, "price": "8500.00", "status": True, **fields}
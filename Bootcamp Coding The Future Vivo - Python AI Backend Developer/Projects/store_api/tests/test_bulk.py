@@ -0,0 +1,45 @@
+from uuid import uuid4
+
+from src.schemas.product import ProductIn
+from tests.conftest import product
+
+
+async def _create(usecase, count: int) -> list:
+    return [
+        (await usecase.create(ProductIn(**product(f"Product {index}")))).id
+        for index in range(count)
+    ]
+
+
+async def test_bulk_delete(client, usecase):
+    ids = await _create(usecase, 2)
+    missing = uuid4()
+
+    response = await client.request(
+        "DELETE", "/products/bulk", json=[str(ids[0]), str(missing), str(ids[1])]
+    )
+
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()] == [
+        "deleted",
+        "not_found",
+        "deleted",
+    ]
+    assert await usecase.collection.count_documents({}) == 0
+
+
+async def test_bulk_delete_does_not_claim_products_deleted_meanwhile(usecase):
+    ids = await _create(usecase, 2)
+    delete_many = usecase.collection.delete_many
+
+    async def delete_many_after_another_request(*args, **kwargs):
+        # another request deletes a product between the lookup and the delete
+        await usecase.delete(ids[0])
+        return await delete_many(*args, **kwargs)
+
+    usecase.collection.delete_many = delete_many_after_another_request
+    results = await usecase.bulk_delete(ids)
+    usecase.collection.delete_many = delete_many
+
+    assert [result.status for result in results] == ["not_found", "not_found"]
+    assert await usecase.collection.count_documents({}) == 0
@@ -0,0 +1,171 @@
+import pytest
+
+from src.core import cache as cache_module
+from src.core.cache import LRUCache
+from src.schemas.product import ProductIn, ProductUpdate
+from tests.conftest import product
+
+
+@pytest.fixture
+def clock(monkeypatch) -> list:
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_counts_hits_and_misses():
+    cache = LRUCache(max_bytes=100, ttl=60)
+    cache.set("a", 1, size=10)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = LRUCache(max_bytes=30, ttl=60)
+    cache.set("a", 1, size=10)
+    cache.set("b", 2, size=10)
+    cache.set("c", 3, size=10)
+    cache.get("a")
+
+    cache.set("d", 4, size=10)
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == [1, 3, 4]
+    assert (cache.size, cache.evictions, len(cache)) == (30, 1, 3)
+
+
+def test_entries_are_evicted_until_the_value_fits():
+    cache = LRUCache(max_bytes=30, ttl=60)
+    cache.set("a", 1, size=10)
+    cache.set("b", 2, size=10)
+
+    cache.set("c", 3, size=25)
+
+    assert (len(cache), cache.size, cache.evictions) == (1, 25, 2)
+
+
+def test_value_larger_than_the_cache_is_not_cached():
+    cache = LRUCache(max_bytes=30, ttl=60)
+    cache.set("a", 1, size=10)
+
+    cache.set("b", 2, size=31)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+
+def test_replacing_a_value_updates_the_size():
+    cache = LRUCache(max_bytes=30, ttl=60)
+    cache.set("a", 1, size=10)
+
+    cache.set("a", 2, size=20)
+
+    assert (cache.get("a"), cache.size, len(cache)) == (2, 20, 1)
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = LRUCache(max_bytes=100, ttl=60)
+    cache.set("a", 1, size=10)
+
+    clock[0] += 59
+    assert cache.get("a") == 1
+
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert (cache.size, len(cache)) == (0, 0)
+
+
+def test_invalidate_alias_removes_the_entry():
+    cache = LRUCache(max_bytes=100, ttl=60)
+    cache.set("a", 1, size=10, alias="alias")
+
+    cache.invalidate_alias("alias")
+
+    assert cache.get("a") is None
+    assert cache.size == 0
+
+
+def test_alias_of_an_evicted_entry_is_forgotten():
+    cache = LRUCache(max_bytes=10, ttl=60)
+    cache.set("a", 1, size=10, alias="alias")
+    cache.set("b", 2, size=10)
+
+    cache.invalidate_alias("alias")
+
+    assert cache.get("b") == 2
+
+
+def test_value_loaded_before_an_invalidation_is_not_cached():
+    cache = LRUCache(max_bytes=100, ttl=60)
+    generation = cache.generation
+
+    cache.invalidate("a")
+    cache.set("a", 1, size=10, generation=generation)
+
+    assert cache.get("a") is None
+
+
+@pytest.mark.parametrize(
+    "invalidate",
+    [
+        lambda cache: cache.invalidate("other"),
+        lambda cache: cache.invalidate_alias("other"),
+        lambda cache: cache.clear(),
+    ],
+)
+def test_every_invalidation_bumps_the_generation(invalidate):
+    cache = LRUCache(max_bytes=100, ttl=60)
+    generation = cache.generation
+
+    invalidate(cache)
+
+    assert cache.generation == generation + 1
+
+
+async def test_get_caches_the_product(usecase):
+    created = await usecase.create(ProductIn(**product()))
+
+    first = await usecase.get(created.id)
+    second = await usecase.get(created.id)
+
+    assert second is first
+    assert (usecase.cache.hits, len(usecase.cache)) == (1, 1)
+
+
+async def test_update_invalidates_the_cached_product(usecase):
+    created = await usecase.create(ProductIn(**product()))
+    await usecase.get(created.id)
+
+    await usecase.update(created.id, ProductUpdate(quantity=3))
+
+    assert (await usecase.get(created.id)).quantity == 3
+
+
+async def test_delete_invalidates_the_cached_product(usecase):
+    created = await usecase.create(ProductIn(**product()))
+    await usecase.get(created.id)
+
+    await usecase.delete(created.id)
+
+    assert usecase.cache.get(created.id) is None
+
+
+async def test_get_racing_an_update_does_not_cache_the_stale_product(usecase):
+    created = await usecase.create(ProductIn(**product()))
+    find_one = usecase.collection.find_one
+
+    async def find_one_then_update(*args, **kwargs):
+        # the update lands after the read, before the product is cached
+        result = await find_one(*args, **kwargs)
+        await usecase.update(created.id, ProductUpdate(quantity=3))
+        return result
+
+    usecase.collection.find_one = find_one_then_update
+    stale = await usecase.get(created.id)
+    usecase.collection.find_one = find_one
+
+    assert stale.quantity == 10
+    assert usecase.cache.get(created.id) is None
+    assert (await usecase.get(created.id)).quantity == 3
@@ -0,0 +1,73 @@
+import struct
+from decimal import Decimal
+from uuid import uuid4
+
+import bson
+import pytest
+from bson import Decimal128
+
+from src.core.codecs import CODEC_OPTIONS, decimal128_to_decimal
+
+VALUES = [
+    "0",
+    "-0",
+    "0E-6176",
+    "-0E-6176",
+    "0E+6111",
+    "-0E+6111",
+    "1",
+    "-1.5",
+    "0.10",
+    "8500.00",
+    "1234567.89",
+    "1E-6176",
+    "-1E-6176",
+    "1E+6144",
+    "9999999999999999999999999999999999E+6111",
+    "-9999999999999999999999999999999999E-6176",
+    "1.000000000000000000000000000000000",
+    "NaN",
+    "-NaN",
+    "sNaN",
+    "Infinity",
+    "-Infinity",
+]
+
+
+def _same(value: Decimal, expected: Decimal) -> bool:
+    # str tells signed zeros, exponents and NaNs apart, which == doesn't
+    return str(value) == str(expected)
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_decimal128_to_decimal_matches_to_decimal(value):
+    decimal128 = Decimal128(value)
+
+    assert _same(decimal128_to_decimal(decimal128), decimal128.to_decimal())
+
+
+@pytest.mark.parametrize(
+    "high",
+    [0x6000000000000000, 0xE800000000000000 | 1 << 49],
+    ids=["large coefficient", "negative large coefficient"],
+)
+def test_large_coefficient_encoding_matches_to_decimal(high):
+    decimal128 = Decimal128.from_bid(struct.pack("<QQ", 5, high))
+
+    assert _same(decimal128_to_decimal(decimal128), decimal128.to_decimal())
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_decimals_round_trip_through_the_codec(value):
+    document = {"price": Decimal(value), "id": uuid4()}
+
+    data = bson.encode(document, codec_options=CODEC_OPTIONS)
+    decoded = bson.decode(data, codec_options=CODEC_OPTIONS)
+
+    # the value is stored as Decimal128 and read back as Decimal
+    assert isinstance(bson.decode(data)["price"], Decimal128)
+    assert isinstance(decoded["price"], Decimal)
+    # Decimal128 clamps exponents above its range, 1E+6144 is kept as
+    # 1.000000000000000000000000000000000E+6144
+    assert _same(decoded["price"], Decimal128(document["price"]).to_decimal())
+    assert decoded["id"] == document["id"]
@@ -0,0 +1,93 @@
+import pytest
+
+from tests.conftest import product
+
+
+@pytest.fixture
+async def created(client) -> dict:
+    return (await client.post("/products/", json=product())).json()
+
+
+async def _etag(client, id) -> str:
+    return (await client.get(f"/products/{id}")).headers["ETag"]
+
+
+@pytest.mark.parametrize("header", ['"{version}"', 'W/"{version}"', "*"])
+async def test_get_matching_if_none_match_is_not_modified(client, created, header):
+    etag = await _etag(client, created["id"])
+
+    response = await client.get(
+        f"/products/{created['id']}",
+        headers={"If-None-Match": header.format(version=etag.strip('"'))},
+    )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+async def test_get_after_an_update_is_modified(client, created):
+    etag = await _etag(client, created["id"])
+    await client.patch(f"/products/{created['id']}", json={"quantity": 3})
+
+    response = await client.get(
+        f"/products/{created['id']}", headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 3
+    assert response.headers["ETag"] != etag
+
+
+async def test_patch_with_the_current_etag(client, created):
+    etag = await _etag(client, created["id"])
+
+    response = await client.patch(
+        f"/products/{created['id']}", json={"quantity": 3}, headers={"If-Match": etag}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_patch_with_a_stale_etag_fails(client, created):
+    etag = await _etag(client, created["id"])
+    await client.patch(f"/products/{created['id']}", json={"quantity": 3})
+
+    response = await client.patch(
+        f"/products/{created['id']}", json={"quantity": 5}, headers={"If-Match": etag}
+    )
+
+    assert response.status_code == 412
+    assert (await client.get(f"/products/{created['id']}")).json()["quantity"] == 3
+
+
+async def test_delete_with_a_stale_etag_fails(client, created):
+    etag = await _etag(client, created["id"])
+    await client.patch(f"/products/{created['id']}", json={"quantity": 3})
+
+    response = await client.delete(
+        f"/products/{created['id']}", headers={"If-Match": etag}
+    )
+
+    assert response.status_code == 412
+    assert (await client.get(f"/products/{created['id']}")).status_code == 200
+
+
+async def test_delete_with_the_current_etag(client, created):
+    etag = await _etag(client, created["id"])
+
+    response = await client.delete(
+        f"/products/{created['id']}", headers={"If-Match": etag}
+    )
+
+    assert response.status_code == 204
+    assert (await client.get(f"/products/{created['id']}")).status_code == 404
+
+
+async def test_invalid_if_match_fails(client, created):
+    response = await client.delete(
+        f"/products/{created['id']}", headers={"If-Match": 'W/"0"'}
+    )
+
+    assert response.status_code == 412
@@ -0,0 +1,165 @@
+import json
+from typing import Optional
+from uuid import UUID, uuid4
+
+from src.controllers.product import events
+from src.usecases.events import (
+    OVERFLOW_FRAME,
+    RESET_FRAME,
+    ProductEventBroker,
+    Subscription,
+)
+
+IPHONE = uuid4()
+GALAXY = uuid4()
+
+
+def _change(token: str, op: str, id: UUID, **fields) -> dict:
+    """
+    A change event of the product change stream.
+    """
+    change = {"_id": {"_data": token}, "operationType": op}
+    if op == "update":
+        change["updateDescription"] = {"updatedFields": fields}
+        change["fullDocument"] = {"id": id, **fields}
+    elif op == "delete":
+        change["fullDocumentBeforeChange"] = {"id": id}
+    else:
+        change["fullDocument"] = {"id": id, "name": "Iphone", **fields}
+    return change
+
+
+def _parse(frame: bytes) -> tuple:
+    lines = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return lines["id"], lines["event"], json.loads(lines["data"])
+
+
+async def _next(subscription: Subscription) -> Optional[bytes]:
+    return await subscription.next_frame(timeout=0.01)
+
+
+async def test_subscribers_are_counted_until_they_unsubscribe():
+    broker = ProductEventBroker(queue_size=10, buffer_size=10)
+    everything = broker.subscribe()
+    iphone = broker.subscribe(ids=frozenset({IPHONE, GALAXY}))
+
+    assert broker.subscribers == 2
+
+    broker.unsubscribe(everything)
+    broker.unsubscribe(iphone)
+    broker.on_change(_change("1", "insert", IPHONE))
+
+    assert broker.subscribers == 0
+    assert await _next(everything) == b""
+    assert await _next(iphone) == b""
+
+
+async def test_changes_are_fanned_out_to_the_matching_subscribers():
+    broker = ProductEventBroker(queue_size=10, buffer_size=10)
+    first, second = broker.subscribe(), broker.subscribe()
+    iphone = broker.subscribe(ids=frozenset({IPHONE}))
+
+    broker.on_change(_change("1", "insert", IPHONE, price="8500.00"))
+    broker.on_change(_change("2", "insert", GALAXY))
+
+    for subscription in (first, second):
+        assert _parse(await _next(subscription))[:2] == ("1", "insert")
+        assert _parse(await _next(subscription))[:2] == ("2", "insert")
+    token, op, data = _parse(await _next(iphone))
+    assert (token, op, data["id"]) == ("1", "insert", str(IPHONE))
+    assert data["fields"]["price"] == "8500.00"
+    assert await _next(iphone) == b""
+
+
+async def test_updates_are_only_sent_for_the_followed_fields():
+    broker = ProductEventBroker(queue_size=10, buffer_size=10)
+    prices = broker.subscribe(fields=frozenset({"id", "price"}))
+
+    broker.on_change(_change("1", "update", IPHONE, quantity=3))
+    broker.on_change(_change("2", "update", IPHONE, quantity=2, price="10.00"))
+    broker.on_change(_change("3", "delete", IPHONE))
+
+    token, _, data = _parse(await _next(prices))
+    assert (token, data["fields"]) == ("2", {"price": "10.00"})
+    assert _parse(await _next(prices))[:2] == ("3", "delete")
+
+
+async def test_slow_subscriber_is_sent_an_overflow_and_dropped():
+    broker = ProductEventBroker(queue_size=2, buffer_size=10)
+    slow, fast = broker.subscribe(), broker.subscribe()
+
+    for token in "123":
+        broker.on_change(_change(token, "insert", IPHONE))
+        assert _parse(await _next(fast))[0] == token
+
+    # the backlog of the slow subscriber is dropped, the fast one is unaffected
+    assert await _next(slow) == OVERFLOW_FRAME
+    assert await _next(slow) is None
+    broker.on_change(_change("4", "insert", IPHONE))
+    assert slow.queue.empty()
+    assert _parse(await _next(fast))[0] == "4"
+
+
+async def test_subscribers_resume_after_their_last_event():
+    broker = ProductEventBroker(queue_size=10, buffer_size=2)
+    for token in "123":
+        broker.on_change(_change(token, "insert", IPHONE))
+
+    resumed = broker.subscribe(last_event_id="2")
+    expired = broker.subscribe(last_event_id="1")
+
+    assert _parse(await _next(resumed))[0] == "3"
+    assert await _next(resumed) == b""
+    assert await _next(expired) == RESET_FRAME
+
+
+async def test_lost_changes_and_closing_reach_every_subscriber():
+    broker = ProductEventBroker(queue_size=10, buffer_size=10)
+    subscriptions = [broker.subscribe(), broker.subscribe(ids=frozenset({IPHONE}))]
+
+    broker.reset(lost=True)
+    broker.close()
+
+    for subscription in subscriptions:
+        assert await _next(subscription) == RESET_FRAME
+        assert await _next(subscription) is None
+
+
+class _UseCase:
+    def __init__(self) -> None:
+        self.events = ProductEventBroker(queue_size=10, buffer_size=10)
+        self.events.available = True
+
+
+async def test_disconnected_clients_are_unsubscribed():
+    usecase = _UseCase()
+    response = await events(id=None, fields=None, last_event_id=None, usecase=usecase)
+    stream = response.body_iterator
+
+    assert await stream.__anext__() == b"retry: 3000\n\n"
+    usecase.events.on_change(_change("1", "insert", IPHONE))
+    assert _parse(await stream.__anext__())[0] == "1"
+    assert usecase.events.subscribers == 1
+
+    # the server closes the stream of a client that went away
+    await stream.aclose()
+
+    assert usecase.events.subscribers == 0
+
+
+async def test_overflowing_clients_are_unsubscribed():
+    usecase = _UseCase()
+    usecase.events.queue_size = 1
+    response = await events(
+        id=[IPHONE], fields=None, last_event_id=None, usecase=usecase
+    )
+    frames = []
+
+    async for frame in response.body_iterator:
+        frames.append(frame)
+        if len(frames) == 1:
+            for token in "12":
+                usecase.events.on_change(_change(token, "insert", IPHONE))
+
+    assert frames[-1] == OVERFLOW_FRAME
+    assert usecase.events.subscribers == 0
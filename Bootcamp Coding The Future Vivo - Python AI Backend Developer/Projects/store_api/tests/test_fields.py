@@ -0,0 +1,61 @@
+import pytest
+
+from src.core.exceptions import InvalidFieldsException
+from src.schemas.product import ProductOut, parse_product_fields
+from tests.conftest import product
+
+
+@pytest.fixture
+async def created(client) -> dict:
+    return (await client.post("/products/", json=product())).json()
+
+
+async def test_get_returns_the_requested_fields(client, created):
+    response = await client.get(
+        f"/products/{created['id']}", params={"fields": "name,price"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": created["id"],
+        "name": "Iphone 14 Pro Max",
+        "price": "8500.00",
+    }
+
+
+async def test_list_returns_the_requested_fields(client, created):
+    response = await client.get("/products/", params={"fields": "status"})
+
+    assert response.json() == [{"id": created["id"], "status": True}]
+
+
+async def test_id_alone(client, created):
+    response = await client.get(f"/products/{created['id']}", params={"fields": "id"})
+
+    assert response.json() == {"id": created["id"]}
+
+
+@pytest.mark.parametrize("fields", ["", " , "])
+async def test_no_fields_returns_the_whole_product(client, created, fields):
+    response = await client.get(f"/products/{created['id']}", params={"fields": fields})
+
+    assert response.json().keys() == ProductOut.model_fields.keys()
+
+
+@pytest.mark.parametrize("fields", ["name,secret", "_id", "name_normalized"])
+async def test_unknown_fields_are_rejected(client, created, fields):
+    response = await client.get(f"/products/{created['id']}", params={"fields": fields})
+
+    assert response.status_code == 400
+    assert "Unknown fields" in response.json()["detail"]
+
+
+def test_fields_are_parsed_with_the_id():
+    assert parse_product_fields(" name , price ,") == {"id", "name", "price"}
+
+
+def test_unknown_fields_are_listed():
+    with pytest.raises(InvalidFieldsException) as exc:
+        parse_product_fields("b,name,a")
+
+    assert exc.value.message == "Unknown fields: a, b"
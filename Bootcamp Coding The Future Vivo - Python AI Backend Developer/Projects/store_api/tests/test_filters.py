@@ -0,0 +1,91 @@
+from decimal import Decimal
+
+import pytest
+
+from src.schemas.product import ProductFilter
+from tests.conftest import product, requires_mongodb
+
+PRODUCTS = [
+    product("Iphone 13", quantity=1, price="5000.00", status=True),
+    product("Iphone 14", quantity=2, price="7000.00", status=True),
+    product("Iphone 14 Pro", quantity=3, price="9000.00", status=False),
+    product("Galaxy S23", quantity=4, price="6000.00", status=False),
+]
+
+
+@pytest.fixture
+async def products(client):
+    for item in PRODUCTS:
+        await client.post("/products/", json=item)
+
+
+async def _names(client, **params) -> list:
+    response = await client.get("/products/", params={**params, "fields": "name"})
+    assert response.status_code == 200, response.text
+    return sorted(item["name"] for item in response.json())
+
+
+@pytest.mark.parametrize(
+    ("params", "names"),
+    [
+        ({}, ["Galaxy S23", "Iphone 13", "Iphone 14", "Iphone 14 Pro"]),
+        ({"status": True}, ["Iphone 13", "Iphone 14"]),
+        ({"min_price": "6000"}, ["Galaxy S23", "Iphone 14", "Iphone 14 Pro"]),
+        ({"max_price": "6000"}, ["Galaxy S23", "Iphone 13"]),
+        ({"min_price": "6000", "max_price": "7000"}, ["Galaxy S23", "Iphone 14"]),
+        ({"name": "Iphone 14"}, ["Iphone 14", "Iphone 14 Pro"]),
+        ({"name": "iphone"}, []),
+        ({"status": False, "name": "Iphone"}, ["Iphone 14 Pro"]),
+        ({"status": True, "min_price": "6000", "name": "Iphone"}, ["Iphone 14"]),
+    ],
+)
+async def test_filters(client, products, params, names):
+    assert await _names(client, **params) == names
+
+
+async def test_name_prefix_is_matched_literally(client, products):
+    await client.post("/products/", json=product("Iphone 14 (refurbished)"))
+
+    assert await _names(client, name="Iphone 14 (") == ["Iphone 14 (refurbished)"]
+    assert await _names(client, name=".*") == []
+
+
+def test_price_bounds_share_the_price_condition():
+    filter = ProductFilter(min_price=Decimal("1"), max_price=Decimal("2"))
+
+    assert filter.to_mongo() == {"price": {"$gte": Decimal("1"), "$lte": Decimal("2")}}
+
+
+def test_empty_filter_matches_everything():
+    assert ProductFilter().to_mongo() == {}
+
+
+@requires_mongodb
+async def test_stats(client, products):
+    response = await client.get("/products/stats")
+
+    assert response.status_code == 200
+    stats = [
+        (
+            item["status"],
+            item["count"],
+            item["total_quantity"],
+            Decimal(item["inventory_value"]),
+            Decimal(item["average_price"]),
+        )
+        for item in response.json()
+    ]
+    assert stats == [
+        (True, 2, 3, Decimal("19000"), Decimal("6000")),
+        (False, 2, 7, Decimal("51000"), Decimal("7500")),
+    ]
+
+
+@requires_mongodb
+async def test_stats_of_filtered_products(client, products):
+    response = await client.get("/products/stats", params={"name": "Iphone"})
+
+    assert [(item["status"], item["count"]) for item in response.json()] == [
+        (True, 2),
+        (False, 1),
+    ]
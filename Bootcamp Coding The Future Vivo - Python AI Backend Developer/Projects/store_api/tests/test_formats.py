@@ -0,0 +1,110 @@
+from decimal import Decimal
+from typing import AsyncIterator, List
+
+import pytest
+
+from src.core import formats
+from src.core.exceptions import InvalidImportException
+from src.core.formats import InvalidRow, csv_chunks, csv_rows, ndjson_rows
+from src.schemas.product import ProductOut
+
+
+async def _chunks(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def _list(rows: AsyncIterator) -> List:
+    return [row async for row in rows]
+
+
+async def test_ndjson_lines_are_parsed_across_chunks():
+    rows = await _list(ndjson_rows(_chunks(b'{"a": 1}\n{"b"', b": 2}\n\n  \n[3]")))
+
+    assert rows == [{"a": 1}, {"b": 2}, [3]]
+
+
+async def test_malformed_ndjson_lines_are_reported_in_place():
+    rows = await _list(ndjson_rows(_chunks(b'{"a": 1}\n{"a": \n{"a": 3}\n')))
+
+    assert rows[0] == {"a": 1}
+    assert isinstance(rows[1], InvalidRow)
+    assert rows[1].detail.startswith("Invalid JSON")
+    assert rows[2] == {"a": 3}
+
+
+async def test_csv_columns_are_mapped_by_the_header():
+    upload = "\ufeff price , name,status\n8500.00,Iphone,true\n,Galaxy,\n".encode()
+
+    rows = await _list(csv_rows(_chunks(upload)))
+
+    assert rows == [
+        {"price": "8500.00", "name": "Iphone", "status": "true"},
+        {"name": "Galaxy"},
+    ]
+
+
+async def test_csv_quoted_values_span_lines_and_chunks():
+    rows = await _list(
+        csv_rows(_chunks(b'name,note\nIphone,"first', b' line\nsecond, line"\n'))
+    )
+
+    assert rows == [{"name": "Iphone", "note": "first line\nsecond, line"}]
+
+
+async def test_csv_records_not_matching_the_header_are_reported():
+    rows = await _list(csv_rows(_chunks(b"name,price\nIphone\nGalaxy,1,2\nMoto,3\n")))
+
+    assert [row.detail for row in rows[:2]] == [
+        "Expected 2 columns, found 1",
+        "Expected 2 columns, found 3",
+    ]
+    assert rows[2] == {"name": "Moto", "price": "3"}
+
+
+async def test_csv_unterminated_quoted_value_is_reported():
+    rows = await _list(csv_rows(_chunks(b'name\n"Iphone\n')))
+
+    assert [row.detail for row in rows] == ["Unterminated quoted value"]
+
+
+async def test_csv_must_be_utf8():
+    with pytest.raises(InvalidImportException) as exc:
+        await _list(csv_rows(_chunks(b"name\nCaf\xe9\n")))
+
+    assert exc.value.message == "CSV uploads must be encoded in UTF-8"
+
+
+async def test_long_lines_abort_the_parsing(monkeypatch):
+    monkeypatch.setattr(formats, "MAX_LINE_BYTES", 8)
+
+    with pytest.raises(InvalidImportException):
+        await _list(ndjson_rows(_chunks(b"{}\n", b'{"name": "Iphone"}')))
+
+
+async def test_products_are_encoded_as_csv_in_batches():
+    products = [
+        ProductOut.model_validate(
+            {
+                "id": "b0b7c40c-8d2b-4f43-a1a8-7c65ffb0c4b6",
+                "name": f"Iphone, {index}",
+                "quantity": index,
+                "price": Decimal("0.10"),
+                "status": index == 0,
+                "created_at": "2024-01-01T00:00:00",
+                "updated_at": "2024-01-01T00:00:00",
+            }
+        )
+        for index in range(3)
+    ]
+
+    async def stream():
+        for product in products:
+            yield product
+
+    chunks = await _list(csv_chunks(stream(), ["name", "price", "status"], 2))
+
+    assert chunks == [
+        'name,price,status\n"Iphone, 0",0.10,true\n"Iphone, 1",0.10,false\n',
+        '"Iphone, 2",0.10,false\n',
+    ]
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+from src.core import formats
+from tests.conftest import product
+
+PRICES = {"Iphone 13": "0.10", "Iphone 14": "1234567.89", "Galaxy S23": "6000.00"}
+
+
+async def _import(client, body: str, content_type: str):
+    return await client.post(
+        "/products/import", content=body, headers={"Content-Type": content_type}
+    )
+
+
+async def _prices(client) -> dict:
+    response = await client.get("/products/", params={"fields": "name,price"})
+    return {item["name"]: Decimal(item["price"]) for item in response.json()}
+
+
+async def test_ndjson_import_reports_the_failed_rows(client):
+    body = "\n".join(
+        [
+            json.dumps(product("Iphone 13")),
+            '{"name": ',
+            json.dumps(product("Iphone 14", price="expensive")),
+            json.dumps(product("Galaxy S23")),
+        ]
+    )
+
+    response = await _import(client, body, "application/x-ndjson")
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["rows"], report["created"], report["failed"]) == (4, 2, 2)
+    assert [error["row"] for error in report["errors"]] == [2, 3]
+    assert report["errors"][0]["detail"].startswith("Invalid JSON")
+    assert report["errors"][1]["detail"][0]["loc"] == ["price"]
+    assert (await _prices(client)).keys() == {"Iphone 13", "Galaxy S23"}
+
+
+async def test_csv_import_maps_the_columns_by_name(client):
+    body = (
+        "status,price,name,quantity,unknown\n"
+        "true,5000.00,Iphone 13,1,ignored\n"
+        "false,6000.00,Galaxy S23\n"
+    )
+
+    response = await _import(client, body, "text/csv; charset=utf-8")
+
+    report = response.json()
+    assert (report["created"], report["failed"]) == (1, 1)
+    assert report["errors"][0] == {"row": 2, "detail": "Expected 5 columns, found 3"}
+    assert await _prices(client) == {"Iphone 13": Decimal("5000.00")}
+
+
+async def test_unreadable_upload_keeps_the_rows_read_before(client, monkeypatch):
+    monkeypatch.setattr(formats, "MAX_LINE_BYTES", 100)
+    body = json.dumps(product("Iphone 13")) + "\n" + json.dumps(product("x" * 200))
+
+    response = await _import(client, body, "application/x-ndjson")
+
+    report = response.json()
+    assert report["created"] == 1
+    assert report["aborted"] == "Lines are limited to 100 bytes"
+
+
+@pytest.mark.parametrize("content_type", [None, "application/json"])
+async def test_unsupported_uploads_are_rejected(client, content_type):
+    headers = {"Content-Type": content_type} if content_type else {}
+
+    response = await client.post("/products/import", content="{}", headers=headers)
+
+    assert response.status_code == 415
+    assert response.json() == {"detail": "Upload application/x-ndjson or text/csv"}
+
+
+@pytest.mark.parametrize("format", ["ndjson", "csv"])
+async def test_export_then_import_keeps_the_values(client, usecase, format):
+    for name, price in PRICES.items():
+        await client.post("/products/", json=product(name, price=price))
+
+    response = await client.get("/products/export", params={"format": format})
+    assert response.status_code == 200
+    if format == "csv":
+        exported = list(csv.DictReader(io.StringIO(response.text)))
+        content_type = "text/csv"
+    else:
+        exported = [json.loads(line) for line in response.text.splitlines()]
+        content_type = "application/x-ndjson"
+
+    assert {item["name"]: item["price"] for item in exported} == PRICES
+    assert all(UUID(item["id"]).version == 4 for item in exported)
+
+    await usecase.collection.delete_many({})
+    response = await _import(client, response.text, content_type)
+
+    assert response.json()["created"] == len(PRICES)
+    prices = await _prices(client)
+    assert prices == {name: Decimal(price) for name, price in PRICES.items()}
+    # the exact values are kept, not only equal ones
+    assert {name: str(price) for name, price in prices.items()} == PRICES
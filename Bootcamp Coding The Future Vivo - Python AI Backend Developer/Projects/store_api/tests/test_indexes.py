@@ -0,0 +1,156 @@
+from uuid import uuid4
+
+import pymongo
+import pytest
+from pymongo import IndexModel
+
+from benchmarks.standin import create_client
+from src.database import indexes
+from src.database.indexes import INDEXES, sync_collection_indexes, sync_indexes
+from src.database.mongo import db_client
+
+DECLARED = [index.document["name"] for index in INDEXES["products"]]
+
+
+@pytest.fixture
+def database(monkeypatch):
+    monkeypatch.setattr(db_client, "client", create_client(f"store_{uuid4().hex}"))
+    return db_client.get().get_database()
+
+
+async def _names(collection) -> set:
+    return set(await collection.index_information()) - {"_id_"}
+
+
+async def test_missing_indexes_are_created(database):
+    (drift,) = await sync_indexes(database)
+
+    assert sorted(drift.created) == sorted(DECLARED)
+    assert not drift.has_drift
+    assert await _names(database.products) == set(DECLARED)
+
+
+async def test_reconciling_twice_changes_nothing(database):
+    await sync_indexes(database)
+
+    (drift,) = await sync_indexes(database)
+
+    assert drift.created == []
+    assert not drift.has_drift
+
+
+async def test_missing_indexes_are_only_reported_without_create(database):
+    (drift,) = await sync_indexes(database, create=False)
+
+    assert sorted(drift.missing) == sorted(DECLARED)
+    assert drift.created == []
+    assert await _names(database.products) == set()
+
+
+async def test_index_with_other_options_is_reported_as_changed(database):
+    await database.products.create_index(
+        [("status", pymongo.ASCENDING), ("price", pymongo.ASCENDING)],
+        name="status_price",
+        unique=True,
+    )
+
+    (drift,) = await sync_indexes(database)
+
+    assert drift.changed == ["status_price"]
+    assert "status_price" not in drift.created
+    # rebuilding it is left to the operator
+    assert (await database.products.index_information())["status_price"]["unique"]
+
+
+async def test_index_with_another_name_is_reported_as_changed(database):
+    await database.products.create_index(
+        [("price", pymongo.ASCENDING), ("id", pymongo.ASCENDING)], name="price_1_id_1"
+    )
+
+    drift = await sync_collection_indexes(
+        database.products,
+        [
+            IndexModel(
+                [("price", pymongo.ASCENDING), ("id", pymongo.ASCENDING)],
+                name="price_id",
+            )
+        ],
+    )
+
+    assert (drift.changed, drift.missing, drift.extra) == (["price_id"], [], [])
+
+
+async def test_undeclared_index_is_reported_but_not_dropped(database):
+    await database.products.create_index([("legacy", pymongo.ASCENDING)], name="legacy")
+
+    (drift,) = await sync_indexes(database)
+
+    assert drift.extra == ["legacy"]
+    assert "legacy" in await _names(database.products)
+
+
+async def test_check_mode_reports_the_drift_without_creating(database, capsys):
+    assert await indexes.main(check=True) == 1
+    assert await _names(database.products) == set()
+
+    assert await indexes.main(check=False) == 0
+    assert await indexes.main(check=True) == 0
+    assert "missing=[] changed=[] extra=[]" in capsys.readouterr().out
+
+
+class ServerCollection:
+    """
+    A collection reporting its indexes the way mongod does, text indexes
+    keyed by `_fts`/`_ftsx` with the weights of their fields.
+    """
+
+    name = "products"
+
+    def __init__(self) -> None:
+        self.indexes = {"_id_": {"v": 2, "key": [("_id", 1)]}}
+
+    async def index_information(self) -> dict:
+        return self.indexes
+
+    async def create_indexes(self, indexes: list) -> list:
+        for index in indexes:
+            key = list(index.document["key"].items())
+            info = {"v": 2, "key": key}
+            if key[-1][1] == pymongo.TEXT:
+                info = {
+                    "v": 2,
+                    "key": [("_fts", "text"), ("_ftsx", 1)],
+                    "weights": {field: 1 for field, _ in key},
+                    "default_language": "english",
+                    "language_override": "language",
+                    "textIndexVersion": 3,
+                }
+            self.indexes[index.document["name"]] = info
+        return [index.document["name"] for index in indexes]
+
+
+async def test_reconciling_a_text_index_twice_changes_nothing():
+    collection = ServerCollection()
+    declared = [IndexModel([("name", pymongo.TEXT)], name="name_text")]
+
+    assert (await sync_collection_indexes(collection, declared)).created == [
+        "name_text"
+    ]
+
+    drift = await sync_collection_indexes(collection, declared)
+    assert drift.created == []
+    assert not drift.has_drift
+
+
+async def test_text_index_with_other_weights_is_reported_as_changed():
+    collection = ServerCollection()
+    await sync_collection_indexes(
+        collection, [IndexModel([("name", pymongo.TEXT)], name="name_text")]
+    )
+
+    drift = await sync_collection_indexes(
+        collection,
+        [IndexModel([("name", pymongo.TEXT)], name="name_text", weights={"name": 5})],
+    )
+
+    assert drift.changed == ["name_text"]
@@ -0,0 +1,75 @@
+import json
+
+import bson
+import pytest
+
+from src.core.codecs import CODEC_OPTIONS
+from src.models.product import ProductModel
+from tests.conftest import product
+
+
+class _RawBatches:
+    """
+    The stand-in has no `find_raw_batches`, its documents are encoded back to
+    BSON one batch each.
+    """
+
+    def __init__(self, cursor) -> None:
+        self.cursor = cursor
+
+    def sort(self, *args) -> "_RawBatches":
+        self.cursor = self.cursor.sort(*args)
+        return self
+
+    def limit(self, limit: int) -> "_RawBatches":
+        self.cursor = self.cursor.limit(limit)
+        return self
+
+    def batch_size(self, size: int) -> "_RawBatches":
+        return self
+
+    async def __aiter__(self):
+        async for document in self.cursor:
+            yield bson.encode(document, codec_options=CODEC_OPTIONS)
+
+
+@pytest.fixture
+async def legacy_id(usecase, monkeypatch):
+    find = usecase.collection.find
+    monkeypatch.setattr(
+        usecase.collection,
+        "find_raw_batches",
+        lambda *args, **kwargs: _RawBatches(find(*args, **kwargs)),
+        raising=False,
+    )
+
+    # written before products were versioned
+    document = ProductModel(**product()).model_dump()
+    del document["version"]
+    await usecase.collection.insert_one(document)
+    return document["id"]
+
+
+async def test_query_json_defaults_the_version(usecase, legacy_id):
+    body, _ = await usecase.query_json(limit=10)
+
+    assert [item["version"] for item in json.loads(body)] == [0]
+
+
+async def test_stream_json_defaults_the_version(usecase, legacy_id):
+    chunks = [chunk async for chunk in usecase.stream_json()]
+
+    lines = b"".join(chunks).splitlines()
+    assert [json.loads(line)["version"] for line in lines] == [0]
+
+
+async def test_version_is_not_added_to_other_fields(usecase, legacy_id):
+    body, _ = await usecase.query_json(limit=10, fields=frozenset({"name"}))
+
+    assert json.loads(body) == [{"name": "Iphone 14 Pro Max"}]
+
+
+async def test_get_json_defaults_the_version(usecase, legacy_id):
+    body, version = await usecase.get_json(legacy_id)
+
+    assert version == json.loads(body)["version"] == 0
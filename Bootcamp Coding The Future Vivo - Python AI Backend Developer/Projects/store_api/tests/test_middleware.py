@@ -0,0 +1,63 @@
+import threading
+from uuid import uuid4
+
+import pytest
+
+from src.core.middleware import request_duration
+from src.core.timing import RequestTimings
+from tests.conftest import product
+
+
+async def test_requests_are_labelled_with_the_route_template(client):
+    await client.get(f"/products/{uuid4()}")
+    await client.post(f"/products/{uuid4()}/reserve", json={"quantity": 1})
+
+    assert ("GET", "/products/{id}", "404") in request_duration.values
+    assert ("POST", "/products/{id}/reserve", "404") in request_duration.values
+
+
+async def test_unmatched_requests_share_a_label(client):
+    await client.get(f"/{uuid4()}")
+
+    assert ("GET", "unmatched", "404") in request_duration.values
+
+
+def _spans(response) -> dict:
+    header = response.headers["server-timing"]
+    return {
+        metric.split(";")[0]: float(metric.split("dur=")[1].split(";")[0])
+        for metric in header.split(", ")
+    }
+
+
+async def test_the_endpoint_is_timed_apart_from_parsing_and_serialization(client):
+    response = await client.post("/products/", json=product())
+
+    spans = _spans(response)
+    assert {"parse", "endpoint", "serialize", "total"} <= spans.keys()
+    assert spans["parse"] + spans["endpoint"] + spans["serialize"] <= spans["total"]
+
+
+async def test_rejected_requests_are_only_parsed(client):
+    response = await client.post("/products/", json={"name": "Iphone"})
+
+    assert response.status_code == 422
+    assert "parse" in _spans(response)
+    assert "endpoint" not in _spans(response)
+
+
+def test_spans_added_from_threads_are_not_lost():
+    timings = RequestTimings()
+
+    def add_commands() -> None:
+        for _ in range(1000):
+            timings.add_command(0.001, 1)
+
+    threads = [threading.Thread(target=add_commands) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert (timings.commands, timings.documents) == (8000, 8000)
+    assert timings.spans["db"] == pytest.approx(8.0)
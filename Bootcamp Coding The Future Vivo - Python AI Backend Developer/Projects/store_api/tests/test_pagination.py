@@ -0,0 +1,111 @@
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from bson import Decimal128
+
+from src.core.exceptions import InvalidCursorException
+from src.core.pagination import decode_cursor, encode_cursor
+from tests.conftest import product
+
+
+async def _create(client, *products) -> list:
+    return [(await client.post("/products/", json=item)).json() for item in products]
+
+
+async def _pages(client, **params) -> list:
+    pages = []
+    after = None
+    while True:
+        response = await client.get(
+            "/products/", params={**params, **({"after": after} if after else {})}
+        )
+        assert response.status_code == 200, response.text
+        pages.append([item["id"] for item in response.json()])
+        after = response.headers.get("X-Next-Cursor")
+        if after is None:
+            return pages
+
+
+async def test_cursor_pages_through_every_product(client):
+    created = await _create(
+        client, *(product(f"Product {index}") for index in range(5))
+    )
+
+    pages = await _pages(client, limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    # products created within the same millisecond are ordered by ID
+    assert sorted(id for page in pages for id in page) == sorted(
+        item["id"] for item in created
+    )
+
+
+async def test_ties_are_broken_by_id(client):
+    created = await _create(
+        client, *(product(f"Product {index}", quantity=10) for index in range(4))
+    )
+    ids = sorted(item["id"] for item in created)
+
+    ascending = await _pages(client, limit=1, sort="quantity")
+    descending = await _pages(client, limit=1, sort="-quantity")
+
+    assert [id for page in ascending for id in page] == ids
+    assert [id for page in descending for id in page] == ids[::-1]
+
+
+async def test_cursor_keeps_the_sort_value(client):
+    await _create(
+        client, *(product(f"Product {index}", quantity=index) for index in range(5))
+    )
+
+    pages = await _pages(client, limit=2, sort="-quantity")
+    quantities = [
+        (await client.get(f"/products/{id}")).json()["quantity"]
+        for page in pages
+        for id in page
+    ]
+
+    assert quantities == [4, 3, 2, 1, 0]
+
+
+async def test_last_page_has_no_cursor(client):
+    await _create(client, product("Product 0"), product("Product 1"))
+
+    response = await client.get("/products/", params={"limit": 2})
+
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+
+async def test_invalid_cursor(client):
+    response = await client.get("/products/", params={"after": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+async def test_cursor_of_another_sort(client):
+    await _create(client, product("Product 0"), product("Product 1"))
+    cursor = (await client.get("/products/", params={"limit": 1})).headers[
+        "X-Next-Cursor"
+    ]
+
+    response = await client.get("/products/", params={"after": cursor, "sort": "name"})
+
+    assert response.status_code == 400
+
+
+def test_cursor_round_trip_keeps_bson_types():
+    id = uuid4()
+
+    value, decoded_id = decode_cursor(
+        encode_cursor("price", Decimal("3.50"), id), "price"
+    )
+
+    assert value == Decimal128("3.50")
+    assert decoded_id == id
+
+
+def test_cursor_of_another_sort_is_rejected():
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(encode_cursor("price", Decimal("3.50"), uuid4()), "-price")
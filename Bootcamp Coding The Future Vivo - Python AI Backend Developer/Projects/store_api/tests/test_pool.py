@@ -0,0 +1,131 @@
+import pytest
+from pymongo import ReadPreference, monitoring
+
+from src.core.settings import settings
+from src.database.mongo import MongoClient
+from src.database.monitoring import PoolMetrics, command_metrics, pool_metrics
+
+ADDRESS = ("db", 27017)
+
+
+@pytest.fixture
+def pool_settings(monkeypatch):
+    for name, value in {
+        "MONGO_MAX_POOL_SIZE": 7,
+        "MONGO_MIN_POOL_SIZE": 2,
+        "MONGO_WAIT_QUEUE_TIMEOUT_MS": 500,
+        "MONGO_COMPRESSORS": "zlib",
+        "MONGO_READ_PREFERENCE": "secondaryPreferred",
+        "MONGO_WRITE_CONCERN": "2",
+        "MONGO_JOURNAL": True,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+
+
+def test_settings_are_passed_to_the_client(monkeypatch, pool_settings):
+    calls = []
+    monkeypatch.setattr(
+        "src.database.mongo.AsyncIOMotorClient",
+        lambda *args, **kwargs: calls.append((args, kwargs)),
+    )
+
+    MongoClient().connect()
+
+    assert calls == [
+        (
+            (settings.DATABASE_URL,),
+            {
+                "event_listeners": [pool_metrics, command_metrics],
+                "maxPoolSize": 7,
+                "minPoolSize": 2,
+                "readPreference": "secondaryPreferred",
+                "waitQueueTimeoutMS": 500,
+                "compressors": "zlib",
+                "w": 2,
+                "journal": True,
+            },
+        )
+    ]
+
+
+def test_unset_settings_keep_the_driver_defaults(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_WAIT_QUEUE_TIMEOUT_MS", None)
+    monkeypatch.setattr(settings, "MONGO_COMPRESSORS", "")
+    monkeypatch.setattr(settings, "MONGO_WRITE_CONCERN", "majority")
+    monkeypatch.setattr(settings, "MONGO_JOURNAL", None)
+
+    options = MongoClient._options()
+
+    assert options.keys() == {"maxPoolSize", "minPoolSize", "readPreference", "w"}
+    assert options["w"] == "majority"
+
+
+def test_the_driver_accepts_the_options(pool_settings):
+    mongo = MongoClient()
+    options = mongo.connect().options
+    mongo.close()
+
+    assert options.pool_options.max_pool_size == 7
+    assert options.pool_options.min_pool_size == 2
+    assert options.pool_options.wait_queue_timeout == 0.5
+    assert options.read_preference == ReadPreference.SECONDARY_PREFERRED
+    assert options.write_concern.document == {"w": 2, "j": True}
+
+
+def test_counters_move_on_checkout_and_checkin():
+    metrics = PoolMetrics()
+
+    metrics.pool_created(monitoring.PoolCreatedEvent(ADDRESS, {}))
+    for connection_id in (1, 2):
+        metrics.connection_created(
+            monitoring.ConnectionCreatedEvent(ADDRESS, connection_id)
+        )
+        metrics.connection_check_out_started(
+            monitoring.ConnectionCheckOutStartedEvent(ADDRESS)
+        )
+    assert metrics.snapshot()["db:27017"]["wait_queue"] == 2
+
+    metrics.connection_checked_out(
+        monitoring.ConnectionCheckedOutEvent(ADDRESS, 1, 0.25)
+    )
+    metrics.connection_checked_out(
+        monitoring.ConnectionCheckedOutEvent(ADDRESS, 2, 0.5)
+    )
+    stats = metrics.snapshot()["db:27017"]
+    assert (stats["wait_queue"], stats["checked_out"], stats["checkouts"]) == (0, 2, 2)
+    assert stats["checkout_seconds_total"] == 0.75
+    assert stats["checkout_seconds_max"] == 0.5
+
+    metrics.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 1))
+    metrics.connection_closed(monitoring.ConnectionClosedEvent(ADDRESS, 1, "idle"))
+    stats = metrics.snapshot()["db:27017"]
+    assert (stats["checked_out"], stats["open_connections"]) == (1, 1)
+
+
+def test_failed_checkouts_and_clears_are_counted():
+    metrics = PoolMetrics()
+
+    metrics.connection_check_out_started(
+        monitoring.ConnectionCheckOutStartedEvent(ADDRESS)
+    )
+    metrics.connection_check_out_failed(
+        monitoring.ConnectionCheckOutFailedEvent(ADDRESS, "timeout", 0.5)
+    )
+    metrics.pool_cleared(monitoring.PoolClearedEvent(ADDRESS))
+
+    stats = metrics.snapshot()["db:27017"]
+    assert (stats["wait_queue"], stats["checked_out"]) == (0, 0)
+    assert (stats["checkout_failures"], stats["pool_clears"]) == (1, 1)
+
+
+async def test_pool_endpoints(client, monkeypatch):
+    metrics = PoolMetrics()
+    metrics.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, 1))
+    monkeypatch.setattr("src.controllers.metrics.pool_metrics", metrics)
+
+    response = await client.get("/metrics/pool")
+    assert response.status_code == 200
+    assert response.json()["db:27017"]["open_connections"] == 1
+
+    response = await client.get("/metrics")
+    assert 'store_mongo_pool_open_connections{address="db:27017"} 1' in response.text
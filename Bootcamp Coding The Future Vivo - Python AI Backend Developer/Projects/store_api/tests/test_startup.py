@@ -0,0 +1,65 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+
+# cumulative import time of src.main, override on slower machines
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", 1000))
+
+
+def _run(*args: str) -> subprocess.CompletedProcess:
+    env = {key: value for key, value in os.environ.items() if key != "DATABASE_URL"}
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=PROJECT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _import_times(module: str) -> Dict[str, int]:
+    # the first run writes the bytecode caches
+    _run("-c", f"import {module}")
+    stderr = _run("-X", "importtime", "-c", f"import {module}").stderr
+
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_time_within_budget():
+    times = _import_times("src.main")
+
+    elapsed_ms = times["src.main"] / 1000
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:10]
+    assert elapsed_ms <= IMPORT_BUDGET_MS, (
+        f"importing src.main took {elapsed_ms:.0f} ms "
+        f"(budget {IMPORT_BUDGET_MS:.0f} ms), "
+        f"slowest imports: {slowest}"
+    )
+
+
+def test_import_creates_no_resources():
+    code = (
+        "import json, src.main\n"
+        "from src.core.settings import get_settings\n"
+        "from src.database.mongo import db_client\n"
+        "print(json.dumps({\n"
+        "    'settings': get_settings.cache_info().currsize,\n"
+        "    'client': db_client.client is not None,\n"
+        "    'app': 'app' in vars(src.main),\n"
+        "}))\n"
+    )
+    created = json.loads(_run("-c", code).stdout)
+
+    assert created == {"settings": 0, "client": False, "app": False}
@@ -0,0 +1,115 @@
+import asyncio
+from typing import Callable, List, Optional
+from uuid import uuid4
+
+import pytest
+
+from src.usecases.stock import StockCoalescer
+
+
+class _Stock:
+    """
+    The guarded update of a single product, recording the quantities applied.
+    """
+
+    def __init__(self, quantity: int) -> None:
+        self.quantity = quantity
+        self.calls: List[int] = []
+        self.on_call: Optional[Callable[[], None]] = None
+
+    async def apply(self, id, quantity: int) -> Optional[dict]:
+        self.calls.append(quantity)
+        if self.on_call is not None:
+            self.on_call()
+        await asyncio.sleep(0)
+        if quantity > self.quantity:
+            return None
+        self.quantity -= quantity
+        return {"id": id, "quantity": self.quantity}
+
+
+def _submit(coalescer: StockCoalescer, stock: _Stock, *quantities: int) -> list:
+    id = uuid4()
+    return [
+        asyncio.create_task(coalescer.submit(stock.apply, id, quantity))
+        for quantity in quantities
+    ]
+
+
+async def test_reservations_are_merged():
+    stock = _Stock(10)
+    tasks = _submit(StockCoalescer(window=0.01), stock, 1, 2, 3)
+
+    results = await asyncio.gather(*tasks)
+
+    assert stock.calls == [6]
+    assert [result["quantity"] for result in results] == [4, 4, 4]
+
+
+async def test_reservations_are_applied_one_by_one_when_the_stock_is_short():
+    stock = _Stock(4)
+    tasks = _submit(StockCoalescer(window=0.01), stock, 3, 2, 1)
+
+    results = await asyncio.gather(*tasks)
+
+    assert stock.calls == [6, 3, 2, 1]
+    assert [result and result["quantity"] for result in results] == [1, None, 0]
+
+
+async def test_reservation_cancelled_before_the_flush_is_left_out():
+    stock = _Stock(10)
+    tasks = _submit(StockCoalescer(window=0.01), stock, 1, 2, 3)
+    await asyncio.sleep(0)
+
+    tasks[1].cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert stock.calls == [4]
+    assert stock.quantity == 6
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert [results[0]["quantity"], results[2]["quantity"]] == [6, 6]
+
+
+async def test_reservation_cancelled_mid_batch_is_left_out():
+    stock = _Stock(4)
+    tasks = _submit(StockCoalescer(window=0.01), stock, 3, 2, 1)
+
+    def cancel_second():
+        # cancelled while the merged update is in flight, before its own update
+        if stock.calls == [6]:
+            tasks[1].cancel()
+
+    stock.on_call = cancel_second
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert stock.calls == [6, 3, 1]
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert [results[0]["quantity"], results[2]["quantity"]] == [1, 0]
+
+
+async def test_close_applies_the_waiting_reservations():
+    stock = _Stock(10)
+    coalescer = StockCoalescer(window=60)
+    tasks = _submit(coalescer, stock, 1, 2)
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(coalescer.close(), timeout=1)
+
+    assert [task.result()["quantity"] for task in tasks] == [7, 7]
+    assert not coalescer._tasks
+
+
+async def test_failure_is_raised_to_every_reservation():
+    async def apply(id, quantity):
+        raise RuntimeError("database unavailable")
+
+    coalescer = StockCoalescer(window=0.01)
+    tasks = [
+        asyncio.create_task(coalescer.submit(apply, uuid4(), quantity))
+        for quantity in (1, 2)
+    ]
+
+    for task in tasks:
+        with pytest.raises(RuntimeError):
+            await task